@@ -0,0 +1,396 @@
+"""
+성능 벤치마크 스크립트 - 세그멘테이션 처리량 비교
+"""
+import os
+import sys
+import argparse
+import itertools
+import json
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+
+from config import (
+    SEGFORMER_MODEL, SEGMENTATION_BATCH_SIZE, CLASS_MAP, ACCESSIBILITY_THRESHOLD_DISTANCE, STAIR_SEGMENT_MIN_PIXELS
+)
+from modules.segmentation import SegmentationModel, SUPPORTED_BACKENDS, SUPPORTED_QUANTIZATION
+from modules.model_evaluation import compare_segmentation_models
+from modules.utils import get_image_files_in_directory, save_report
+from modules.segmap_statistics import SegMapStatistics
+from modules.accessibility_analysis import AccessibilityAnalyzer
+from modules.daemon import DaemonClient, summarize_latencies
+from modules.worker_pool import InferenceWorkerPool, get_cpu_budget, segment_files
+
+
+def _load_image_files(directory, limit):
+    image_files = get_image_files_in_directory(directory)
+    if limit:
+        image_files = image_files[:limit]
+    if not image_files:
+        raise SystemExit(f"No image files found in {directory}")
+    return image_files
+
+
+def _run_segmentation(model, image_files, batch_size, repeat):
+    """
+    이미지 목록을 repeat회 세그멘테이션하고 처리량 측정
+
+    Returns:
+        tuple: (초당 이미지 수, 마지막 회차의 세그멘테이션 맵 목록)
+    """
+    # 워밍업 (첫 forward의 메모리 할당/그래프 초기화 비용 제외)
+    model.process_batch(image_files[:batch_size], batch_size)
+
+    seg_maps = []
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        seg_maps = []
+        for start in range(0, len(image_files), batch_size):
+            batch = image_files[start:start + batch_size]
+            seg_maps.extend(seg_map for _, _, seg_map in model.process_batch(batch, batch_size))
+    elapsed = time.perf_counter() - start_time
+
+    return len(image_files) * repeat / elapsed, seg_maps
+
+
+def benchmark_backends(args):
+    """
+    추론 백엔드별 처리량(images/sec)과 argmax 일치율 비교
+    """
+    image_files = _load_image_files(args.dir, args.limit)
+    results = {}
+    reference_maps = None
+
+    for backend in args.backends:
+        model = SegmentationModel(args.model, batch_size=args.batch_size, backend=backend)
+        images_per_sec, seg_maps = _run_segmentation(model, image_files, args.batch_size, args.repeat)
+
+        entry = {"images_per_sec": round(images_per_sec, 3)}
+        if reference_maps is None:
+            reference_maps = seg_maps
+        else:
+            # 첫 번째 백엔드 대비 픽셀 단위 argmax 일치율
+            agreement = np.mean([np.mean(ref == seg) for ref, seg in zip(reference_maps, seg_maps)])
+            entry["argmax_agreement"] = round(float(agreement), 6)
+        results[backend] = entry
+        print(f"[{backend}] {entry}")
+
+    return results
+
+
+def benchmark_quantization(args):
+    """
+    int8 양자화 모델과 fp32 모델의 속도 및 정확도(클래스별 IoU, 계단/문 판정 일치율) 비교
+    """
+    image_files = _load_image_files(args.dir, args.limit)
+    reference_model = SegmentationModel(args.model, batch_size=args.batch_size, backend=args.backend)
+    candidate_model = SegmentationModel(
+        args.model, batch_size=args.batch_size, backend=args.backend,
+        quantization=args.mode, calibration_dir=args.calibration_dir
+    )
+
+    report = compare_segmentation_models(reference_model, candidate_model, image_files, args.batch_size)
+    report.update({
+        "model": args.model,
+        "backend": args.backend,
+        "quantization": args.mode,
+        "calibration_dir": args.calibration_dir
+    })
+    if args.report:
+        save_report(report, args.report)
+        print(f"Report saved to {args.report}")
+    return report
+
+
+def benchmark_workers(args):
+    """
+    워커 수 x 워커당 스레드 수 조합별 처리량을 측정하고 가장 빠른 구성 보고
+    """
+    image_files = _load_image_files(args.dir, args.limit)
+    cpu_budget = args.cpu_budget or get_cpu_budget()
+    batches = [
+        image_files[start:start + args.batch_size]
+        for start in range(0, len(image_files), args.batch_size)
+    ]
+    model_options = {"batch_size": args.batch_size}
+
+    configurations = []
+    for workers, threads in itertools.product(args.workers, args.threads):
+        # 코어 예산을 넘는 조합은 과다 구독이므로 제외
+        if workers * threads > cpu_budget:
+            continue
+
+        with InferenceWorkerPool(workers, threads, model_name=args.model, model_options=model_options) as pool:
+            # 워커별 모델 로드/첫 forward 비용 제외
+            list(pool.imap(segment_files, [image_files[:1]] * workers))
+
+            start_time = time.perf_counter()
+            for _ in range(args.repeat):
+                processed = sum(pool.imap(segment_files, batches))
+            elapsed = time.perf_counter() - start_time
+
+        entry = {
+            "workers": workers,
+            "threads_per_worker": threads,
+            "images_per_sec": round(processed * args.repeat / elapsed, 3)
+        }
+        configurations.append(entry)
+        print(entry)
+
+    best = max(configurations, key=lambda entry: entry["images_per_sec"]) if configurations else None
+    return {"cpu_budget": cpu_budget, "configurations": configurations, "best": best}
+
+
+# AccessibilityAnalyzer가 계산하는 (출발, 대상) 클래스 쌍
+DISTANCE_PAIRS = [('stairs', 'door'), ('sidewalk', 'door'), ('railing', 'stairs')]
+
+
+def _sampled_object_distance(mask1, mask2):
+    """이전 구현: 각 마스크에서 최대 100픽셀을 무작위 추출하여 이중 루프로 최소 거리 계산 (비교 기준)"""
+    y1, x1 = np.where(mask1)
+    y2, x2 = np.where(mask2)
+    if len(y1) == 0 or len(y2) == 0:
+        return float('inf')
+    max_samples = min(100, len(y1), len(y2))
+    indices1 = np.random.choice(len(y1), max_samples) if len(y1) > max_samples else np.arange(len(y1))
+    indices2 = np.random.choice(len(y2), max_samples) if len(y2) > max_samples else np.arange(len(y2))
+    y1_sample, x1_sample = y1[indices1], x1[indices1]
+    y2_sample, x2_sample = y2[indices2], x2[indices2]
+    min_dist = float('inf')
+    for i in range(len(y1_sample)):
+        for j in range(len(y2_sample)):
+            dist = np.sqrt((y1_sample[i] - y2_sample[j])**2 + (x1_sample[i] - x2_sample[j])**2)
+            min_dist = min(min_dist, dist)
+    return min_dist
+
+
+def benchmark_distances(args):
+    """
+    객체 간 최소 거리 계산 비교: 무작위 샘플링 이중 루프(이전) vs 거리 변환(정확)
+    """
+    image_files = _load_image_files(args.dir, args.limit)
+    model = SegmentationModel(args.model, batch_size=args.batch_size)
+    seg_maps = []
+    for start in range(0, len(image_files), args.batch_size):
+        seg_maps.extend(seg_map for _, _, seg_map in model.process_batch(image_files[start:start + args.batch_size]))
+
+    pairs = [(CLASS_MAP[source], CLASS_MAP[target]) for source, target in DISTANCE_PAIRS]
+    sampled_seconds = exact_seconds = 0.0
+    errors = []
+    flipped = measured = 0
+    for seg_map in seg_maps:
+        # 정확한 거리 (이미지당 통계 객체 하나로 세 쌍 계산 - 대상 클래스별 거리 변환 공유)
+        start_time = time.perf_counter()
+        stats = SegMapStatistics(seg_map)
+        exact = [stats.min_distance(source_id, target_id) for source_id, target_id in pairs]
+        exact_seconds += time.perf_counter() - start_time
+
+        for (source_id, target_id), exact_distance in zip(pairs, exact):
+            if exact_distance == float('inf'):
+                continue
+            source_mask, target_mask = seg_map == source_id, seg_map == target_id
+            start_time = time.perf_counter()
+            sampled = [_sampled_object_distance(source_mask, target_mask) for _ in range(args.repeat)]
+            sampled_seconds += (time.perf_counter() - start_time) / args.repeat
+
+            measured += 1
+            errors.append(float(np.mean(sampled)) - exact_distance)
+            # 같은 맵인데 반복 실행마다 임계값 판정이 달라지는 경우
+            decisions = {distance < ACCESSIBILITY_THRESHOLD_DISTANCE for distance in sampled}
+            flipped += len(decisions) > 1
+
+    return {
+        "images": len(seg_maps),
+        "pairs_measured": measured,
+        "sampled_ms_per_image": round(sampled_seconds / len(seg_maps) * 1000, 2),
+        "exact_ms_per_image": round(exact_seconds / len(seg_maps) * 1000, 2),
+        "sampled_mean_overestimate_px": round(float(np.mean(errors)), 2) if errors else None,
+        "sampled_max_overestimate_px": round(float(np.max(errors)), 2) if errors else None,
+        "sampled_decision_flip_rate": round(flipped / measured, 4) if measured else None
+    }
+
+
+def benchmark_segments(args):
+    """
+    계단 세그먼트 추출 단계 처리 시간 (세그멘테이션 시간과 비교)
+    """
+    image_files = _load_image_files(args.dir, args.limit)
+    model = SegmentationModel(args.model, batch_size=args.batch_size)
+    images_per_second, seg_maps = _run_segmentation(model, image_files, args.batch_size, 1)
+
+    latencies = []
+    segment_counts = []
+    for seg_map in seg_maps:
+        for _ in range(args.repeat):
+            # process_image와 같이 맵 통계 생성부터 포함
+            start_time = time.perf_counter()
+            segments = SegMapStatistics(seg_map).segments(CLASS_MAP['stairs'], STAIR_SEGMENT_MIN_PIXELS)
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        segment_counts.append(len(segments))
+
+    return {
+        "images": len(seg_maps),
+        "segmentation_ms_per_image": round(1000 / images_per_second, 1),
+        "extraction_ms": summarize_latencies(latencies),
+        "segments_per_image_mean": round(float(np.mean(segment_counts)), 2),
+        "images_with_stairs": sum(count > 0 for count in segment_counts)
+    }
+
+
+def benchmark_analyze(args):
+    """
+    접근성 분석 처리 시간 비교: 맵마다 analyze 호출 vs 배치 전체 analyze_many (결과 일치 확인 포함)
+    """
+    image_files = _load_image_files(args.dir, args.limit)
+    model = SegmentationModel(args.model, batch_size=args.batch_size)
+    _, seg_maps = _run_segmentation(model, image_files, args.batch_size, 1)
+    analyzer = AccessibilityAnalyzer()
+
+    per_map_seconds = []
+    batch_seconds = []
+    for _ in range(args.repeat):
+        start_time = time.perf_counter()
+        per_map = [analyzer.analyze(seg_map) for seg_map in seg_maps]
+        per_map_seconds.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        batched = analyzer.analyze_many(seg_maps)
+        batch_seconds.append(time.perf_counter() - start_time)
+
+    return {
+        "images": len(seg_maps),
+        "analyze_ms_per_image": round(min(per_map_seconds) * 1000 / len(seg_maps), 3),
+        "analyze_many_ms_per_image": round(min(batch_seconds) * 1000 / len(seg_maps), 3),
+        "identical": json.dumps(per_map) == json.dumps(batched)
+    }
+
+
+def _timed_cli_runs(argv, repeat):
+    """main.py를 별도 프로세스로 repeat회 실행하고 회차별 전체 실행 시간(ms) 반환"""
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    latencies = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, main_path] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    return latencies
+
+
+def benchmark_daemon(args):
+    """
+    main.py --image 호출 지연 시간 비교: 매번 새로 시작(cold) vs 실행 중인 데몬에 전달
+    """
+    client = DaemonClient()
+    with tempfile.TemporaryDirectory() as output_dir:
+        argv = ["--image", args.image, "--output", output_dir]
+        cold = _timed_cli_runs(argv + ["--no-daemon"], args.repeat)
+
+        daemon_process = None
+        if not client.is_running():
+            main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+            start_time = time.perf_counter()
+            daemon_process = subprocess.Popen([sys.executable, main_path, "--daemon"],
+                                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            while not client.is_running():
+                if daemon_process.poll() is not None or time.perf_counter() - start_time > args.startup_timeout:
+                    raise SystemExit("분석 데몬을 시작하지 못했습니다")
+                time.sleep(0.1)
+            startup_ms = (time.perf_counter() - start_time) * 1000
+        else:
+            startup_ms = None
+
+        try:
+            served = _timed_cli_runs(argv, args.repeat)
+            server = [client.request("image", image_path=os.path.abspath(args.image), output_dir=output_dir)["server_ms"]
+                      for _ in range(args.repeat)]
+        finally:
+            if daemon_process is not None:
+                client.request("shutdown")
+                daemon_process.wait()
+
+    report = {
+        "image": args.image,
+        "cold_cli": summarize_latencies(cold),
+        "daemon_cli": summarize_latencies(served),
+        "daemon_server": summarize_latencies(server),
+        "daemon_startup_ms": round(startup_ms, 1) if startup_ms is not None else None
+    }
+    report["speedup"] = round(report["cold_cli"]["p50_ms"] / report["daemon_cli"]["p50_ms"], 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accessibility Analyzer benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backends_parser = subparsers.add_parser("backends", help="Compare segmentation backends (images/sec)")
+    backends_parser.add_argument("--dir", type=str, required=True, help="Directory containing images")
+    backends_parser.add_argument("--model", type=str, default=SEGFORMER_MODEL, help="SegFormer model name")
+    backends_parser.add_argument("--backends", nargs="+", default=list(SUPPORTED_BACKENDS),
+                                 choices=SUPPORTED_BACKENDS, help="Backends to compare")
+    backends_parser.add_argument("--batch-size", type=int, default=SEGMENTATION_BATCH_SIZE, help="Images per forward pass")
+    backends_parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the image set")
+    backends_parser.add_argument("--limit", type=int, default=16, help="Maximum number of images (0 = all)")
+    backends_parser.set_defaults(func=benchmark_backends)
+
+    quantization_parser = subparsers.add_parser("quantization", help="Compare int8 quantized model against fp32")
+    quantization_parser.add_argument("--dir", type=str, required=True, help="Directory containing evaluation images")
+    quantization_parser.add_argument("--model", type=str, default=SEGFORMER_MODEL, help="SegFormer model name")
+    quantization_parser.add_argument("--backend", default="torch", choices=SUPPORTED_BACKENDS, help="Inference backend")
+    quantization_parser.add_argument("--mode", default="dynamic", choices=SUPPORTED_QUANTIZATION, help="Quantization mode")
+    quantization_parser.add_argument("--calibration-dir", type=str, help="Storefront photos for static calibration")
+    quantization_parser.add_argument("--batch-size", type=int, default=SEGMENTATION_BATCH_SIZE, help="Images per forward pass")
+    quantization_parser.add_argument("--limit", type=int, default=0, help="Maximum number of images (0 = all)")
+    quantization_parser.add_argument("--report", type=str, help="Path to save the JSON accuracy report")
+    quantization_parser.set_defaults(func=benchmark_quantization)
+
+    workers_parser = subparsers.add_parser("workers", help="Sweep worker processes x threads per worker")
+    workers_parser.add_argument("--dir", type=str, required=True, help="Directory containing images")
+    workers_parser.add_argument("--model", type=str, default=SEGFORMER_MODEL, help="SegFormer model name")
+    workers_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to try")
+    workers_parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="Threads per worker to try")
+    workers_parser.add_argument("--cpu-budget", type=int, help="Total cores to use (default: available cores)")
+    workers_parser.add_argument("--batch-size", type=int, default=SEGMENTATION_BATCH_SIZE, help="Images per forward pass")
+    workers_parser.add_argument("--repeat", type=int, default=1, help="Timed passes over the image set")
+    workers_parser.add_argument("--limit", type=int, default=32, help="Maximum number of images (0 = all)")
+    workers_parser.set_defaults(func=benchmark_workers)
+
+    distances_parser = subparsers.add_parser("distances", help="Compare sampled vs exact (distance transform) object distances")
+    distances_parser.add_argument("--dir", type=str, required=True, help="Directory containing images")
+    distances_parser.add_argument("--model", type=str, default=SEGFORMER_MODEL, help="SegFormer model name")
+    distances_parser.add_argument("--batch-size", type=int, default=SEGMENTATION_BATCH_SIZE, help="Images per forward pass")
+    distances_parser.add_argument("--repeat", type=int, default=5, help="Sampled runs per pair (to measure flips)")
+    distances_parser.add_argument("--limit", type=int, default=32, help="Maximum number of images (0 = all)")
+    distances_parser.set_defaults(func=benchmark_distances)
+
+    segments_parser = subparsers.add_parser("segments", help="Time stair-segment extraction against segmentation")
+    segments_parser.add_argument("--dir", type=str, required=True, help="Directory containing images")
+    segments_parser.add_argument("--model", type=str, default=SEGFORMER_MODEL, help="SegFormer model name")
+    segments_parser.add_argument("--batch-size", type=int, default=SEGMENTATION_BATCH_SIZE, help="Images per forward pass")
+    segments_parser.add_argument("--repeat", type=int, default=5, help="Timed extractions per image")
+    segments_parser.add_argument("--limit", type=int, default=32, help="Maximum number of images (0 = all)")
+    segments_parser.set_defaults(func=benchmark_segments)
+
+    analyze_parser = subparsers.add_parser("analyze", help="Compare per-map analyze against batched analyze_many")
+    analyze_parser.add_argument("--dir", type=str, required=True, help="Directory containing images")
+    analyze_parser.add_argument("--model", type=str, default=SEGFORMER_MODEL, help="SegFormer model name")
+    analyze_parser.add_argument("--batch-size", type=int, default=SEGMENTATION_BATCH_SIZE, help="Images per forward pass")
+    analyze_parser.add_argument("--repeat", type=int, default=5, help="Timed runs per mode (best run reported)")
+    analyze_parser.add_argument("--limit", type=int, default=32, help="Maximum number of images (0 = all)")
+    analyze_parser.set_defaults(func=benchmark_analyze)
+
+    daemon_parser = subparsers.add_parser("daemon", help="Compare cold main.py --image runs against daemon-served runs")
+    daemon_parser.add_argument("--image", type=str, required=True, help="Image to analyze")
+    daemon_parser.add_argument("--repeat", type=int, default=5, help="Runs per mode")
+    daemon_parser.add_argument("--startup-timeout", type=float, default=600, help="Seconds to wait for the daemon to start")
+    daemon_parser.set_defaults(func=benchmark_daemon)
+
+    args = parser.parse_args()
+    results = args.func(args)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
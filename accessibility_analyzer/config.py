@@ -14,17 +14,74 @@ OVERLAY_DIR = RESULTS_DIR / "overlays"
 REPORTS_DIR = RESULTS_DIR / "reports"
 CACHE_DIR = BASE_DIR / "cache"
 
-# 디렉토리 생성
-for dir_path in [MODEL_DIR, IMAGES_DIR, OVERLAY_DIR, REPORTS_DIR, CACHE_DIR]:
-    os.makedirs(dir_path, exist_ok=True)
+
+def ensure_directories():
+    """
+    데이터/결과/캐시 디렉토리 생성 (import 시점이 아닌 실제 처리 직전에 호출)
+    """
+    for dir_path in [MODEL_DIR, IMAGES_DIR, OVERLAY_DIR, REPORTS_DIR, CACHE_DIR]:
+        os.makedirs(dir_path, exist_ok=True)
 
 # 모델 설정
 SEGFORMER_MODEL = "nvidia/segformer-b5-finetuned-ade-640-640"
 DEVICE = "cpu"  # CUDA 대신 CPU 사용
+SEGMENTATION_BATCH_SIZE = int(os.environ.get("SEGMENTATION_BATCH_SIZE", "4"))  # 배치당 이미지 수
+SEGMENTATION_BACKEND = os.environ.get("SEGMENTATION_BACKEND", "torch")  # "torch" 또는 "onnx"
+# True이면 세그멘테이션 맵을 모델 출력 해상도(입력의 1/4)로 유지하고 필요한 마스크만 업샘플링
+SEGMENTATION_NATIVE_RESOLUTION = os.environ.get("SEGMENTATION_NATIVE_RESOLUTION", "false").lower() == "true"
+ONNX_MODEL_DIR = MODEL_DIR / "onnx"  # ONNX 변환 모델 캐시 위치
+MODEL_STORE_DIR = MODEL_DIR / "store"  # --prepare-models로 만든 로컬 모델 저장소 (safetensors + 매니페스트)
+MODEL_STORE_VERIFY = os.environ.get("MODEL_STORE_VERIFY", "size")  # 로드 시 검증: "sha256", "size", "none"
+MODEL_OFFLINE = os.environ.get("MODEL_OFFLINE", "false").lower() == "true"  # True이면 로컬 저장소만 사용 (허브 조회 안 함)
+ONNX_OPSET_VERSION = 17
+# int8 양자화 모드: "" (사용 안 함), "dynamic", "static" (static은 onnx 백엔드 전용)
+SEGMENTATION_QUANTIZATION = os.environ.get("SEGMENTATION_QUANTIZATION", "") or None
+QUANTIZATION_CALIBRATION_DIR = os.environ.get("QUANTIZATION_CALIBRATION_DIR", "") or None
+QUANTIZATION_CALIBRATION_LIMIT = 32  # static 보정에 사용할 최대 이미지 수
+
+# 멀티프로세스 추론 설정 (워커당 스레드 수 = 코어 예산 / 워커 수)
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "1"))
+INFERENCE_CPU_BUDGET = int(os.environ.get("INFERENCE_CPU_BUDGET", "0"))  # 0이면 사용 가능한 코어 전체
+
+# 입력 미리 읽기 설정 (디코딩/전처리를 추론과 겹쳐서 실행)
+PREFETCH_WORKERS = int(os.environ.get("PREFETCH_WORKERS", "2"))  # 전처리 스레드 수 (0: 사용 안 함)
+PREFETCH_QUEUE_DEPTH = int(os.environ.get("PREFETCH_QUEUE_DEPTH", "2"))  # 미리 준비해 둘 최대 배치 수
+
+# 로컬 분석 데몬 설정 (main.py --daemon, 실행 중이면 --image/--dir 요청을 전달)
+DAEMON_SOCKET_PATH = os.environ.get("DAEMON_SOCKET_PATH", str(CACHE_DIR / "daemon.sock"))
+DAEMON_CONNECT_TIMEOUT = 0.5  # 데몬 연결 대기 시간(초) - 초과하면 현재 프로세스에서 직접 처리
+
+# 타일 세그멘테이션 설정 (고해상도/파노라마 사진)
+SEGMENTATION_TILED_MIN_PIXELS = int(os.environ.get("SEGMENTATION_TILED_MIN_PIXELS", "0"))  # 이 픽셀 수 이상이면 타일 처리 (0: 사용 안 함)
+SEGMENTATION_TILE_SIZE = 640  # 원본 해상도 기준 타일 한 변 (픽셀)
+SEGMENTATION_TILE_OVERLAP = 128  # 인접 타일 겹침 폭 (픽셀) - 겹침 영역은 로짓을 가중 평균
+SEGMENTATION_TILE_MAX_MEMORY_MB = int(os.environ.get("SEGMENTATION_TILE_MAX_MEMORY_MB", "512"))  # 로짓 누적/보간 버퍼 최대 크기 (일반 경로도 초과 시 밴드 단위 보간)
+
+# 동영상/프레임 시퀀스 설정 (변화가 작은 프레임은 직전 키프레임의 세그멘테이션 맵 재사용)
+VIDEO_CHANGE_THRESHOLD = float(os.environ.get("VIDEO_CHANGE_THRESHOLD", "0.08"))  # 키프레임 대비 평균 밝기 변화(0~1)
+VIDEO_MAX_KEYFRAME_GAP = int(os.environ.get("VIDEO_MAX_KEYFRAME_GAP", "30"))  # 변화가 작아도 이 프레임 수마다 재세그멘테이션
+VIDEO_PROPAGATION = os.environ.get("VIDEO_PROPAGATION", "shift")  # "reuse" 또는 "shift" (카메라 이동만큼 맵 평행 이동)
+VIDEO_FRAME_STEP = int(os.environ.get("VIDEO_FRAME_STEP", "1"))  # N프레임마다 하나씩 사용
+VIDEO_THUMBNAIL_WIDTH = 96  # 변화량/이동량 계산용 축소 이미지 너비
+VIDEO_MAX_SHIFT_FRACTION = 0.25  # 이보다 크게 움직이면 평행 이동 대신 새 키프레임
+VIDEO_DETECTION_MIN_FRACTION = 0.2  # 장소 단위 검출로 인정할 최소 프레임 비율
+
+# 캐스케이드 세그멘테이션 설정 (경량 모델 우선, 필요한 경우에만 SEGFORMER_MODEL로 승급)
+SEGMENTATION_MODE = os.environ.get("SEGMENTATION_MODE", "single")  # "single" 또는 "cascade"
+SEGFORMER_CASCADE_MODEL = "nvidia/segformer-b0-finetuned-ade-512-512"
+CASCADE_CLASSES = ['stairs', 'door', 'railing', 'sidewalk']  # 접근성 판단에 쓰이는 클래스
+CASCADE_CONFIDENCE_THRESHOLD = 0.6  # 클래스 평균 softmax 신뢰도가 이보다 낮으면 승급
+CASCADE_THRESHOLD_MARGIN = 0.2  # 판정 임계값 대비 상대 오차 범위 (±20%) 안이면 승급
+CASCADE_DECISION_THRESHOLDS = {  # AccessibilityAnalyzer의 면적 비율 판정 임계값
+    'stairs': [0.05, 0.1],
+    'door': [0.01, 0.03]
+}
 
 # API 키 설정
 LLM_API_KEY = os.environ.get("LLM_API_KEY", "")  # OpenAI API 키를 여기에 입력하세요
 # LLM_API_KEY = os.environ.get("LLM_API_KEY","")
+LLM_API_URL = os.environ.get("LLM_API_URL", "")  # LLM 메시지 API 엔드포인트 (비어 있으면 LLM 분석/오버레이 생성 생략)
+LLM_MODEL = os.environ.get("LLM_MODEL", "")  # LLM 모델 이름
 FACILITY_API_KEY = os.environ.get("FACILITY_API_KEY", "")  # 공공데이터포털에서 발급받은 키
 FACILITY_API_ENDPOINT = ""  # 공공데이터포털 API 엔드포인트
 
@@ -66,9 +123,31 @@ COLOR_MAP = {
     'railing': [128, 128, 128]  # 회색
 }
 
+# 오버레이 설정 (오버레이는 LLM 분석 등에서 실제로 필요할 때만 렌더링)
+OVERLAY_FORMAT = os.environ.get("OVERLAY_FORMAT", "png").lower()  # "png", "jpg", "webp"
+OVERLAY_QUALITY = 90  # jpg/webp 인코딩 품질
+SAVE_OVERLAYS = os.environ.get("SAVE_OVERLAYS", "false").lower() == "true"  # True이면 항상 저장
+
 # 분석 설정
 ACCESSIBILITY_THRESHOLD_DISTANCE = 50  # 픽셀 단위
+# 작업 해상도 분석: 세그멘테이션 맵(과 이미지)을 긴 변 기준 이 크기로 맞춘 뒤 분석 (0: 입력 해상도 그대로)
+ANALYSIS_WORKING_SIZE = int(os.environ.get("ANALYSIS_WORKING_SIZE", "0"))
+ACCESSIBILITY_THRESHOLD_DISTANCE_RATIO = 50 / 640  # 작업 해상도 분석의 거리 임계값 (긴 변 대비 비율, 640px 기준 50px)
+# True이면 공공데이터가 없는(image_only) 이미지에 강화된 외부 접근성 분석(enhanced_external_analysis) 결과 추가
+ENHANCED_EXTERNAL_ANALYSIS = os.environ.get("ENHANCED_EXTERNAL_ANALYSIS", "false").lower() == "true"
+STAIR_SEGMENT_MIN_PIXELS = int(os.environ.get("STAIR_SEGMENT_MIN_PIXELS", "20"))  # 계단 세그먼트로 추출할 최소 연결 요소 크기 (원본 이미지 픽셀)
+# 강화된 외부 분석의 하위 분석(계단/출입구/표면/장애물/경로)을 공유 스레드 풀에서 동시에 실행
+ENHANCED_ANALYSIS_CONCURRENT = os.environ.get("ENHANCED_ANALYSIS_CONCURRENT", "true").lower() == "true"
+ENHANCED_ANALYSIS_THREADS = int(os.environ.get("ENHANCED_ANALYSIS_THREADS", "0"))  # 0: OpenCV 스레드 수(워커당 코어 예산)
+# True이면 출입구/장애물/경로 분석 영역을 세그멘테이션 맵의 문/인도/계단 영역으로 선택 (없으면 고정 이미지 비율 영역)
+ENHANCED_SEGMAP_ROI = os.environ.get("ENHANCED_SEGMAP_ROI", "true").lower() == "true"
+# 이미지별 점수 규칙 입력 특징을 JSON Lines로 저장 (--rescore로 세그멘테이션 없이 전체 재채점)
+FEATURE_STORE_ENABLED = os.environ.get("FEATURE_STORE_ENABLED", "false").lower() == "true"  # --rescore용 특징 저장 (파일은 계속 커지므로 선택 사용)
+FEATURE_STORE_PATH = Path(os.environ.get("FEATURE_STORE_PATH", str(RESULTS_DIR / "features.jsonl")))
 # API_REQUEST_TIMEOUT = 10  # API 요청 타임아웃(초)
 API_REQUEST_TIMEOUT = 120
 API_MAX_RETRIES = 3  # API 요청 최대 재시도 횟수
-CACHE_EXPIRY_SECONDS = 86400  # 캐시 만료 시간(초) - 24시간
\ No newline at end of file
+CACHE_EXPIRY_SECONDS = 86400  # 캐시 만료 시간(초) - 24시간
+SEGMENTATION_CACHE_ENABLED = os.environ.get("SEGMENTATION_CACHE_ENABLED", "true").lower() == "true"
+SEGMENTATION_CACHE_DIR = CACHE_DIR / "segmentation"  # 세그멘테이션 결과 캐시 위치
+SEGMENTATION_CACHE_MAX_MB = int(os.environ.get("SEGMENTATION_CACHE_MAX_MB", "1024"))  # 초과 시 오래 안 쓴 항목부터 삭제
\ No newline at end of file
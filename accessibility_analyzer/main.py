@@ -1,32 +1,36 @@
 """
 접근성 분석 시스템 메인 실행 파일 (FastAPI 통합 업데이트)
+
+torch/transformers/scipy/cv2/pandas 등 무거운 모듈은 실제로 사용하는 함수 안에서
+import하여, --check-server/--test 같은 가벼운 명령은 ML 스택을 로드하지 않는다.
 """
 import os
+import sys
 import argparse
+import subprocess
 import time
-import requests
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
 import json
+from functools import partial, lru_cache
 
-from modules.segmentation import SegmentationModel
-from modules.accessibility_analysis import AccessibilityAnalyzer
-from modules.facility_data import FacilityData
-from modules.llm_interface import LLMAnalyzer
-from modules.api_client import APIClient
+from modules.model_registry import get_active_segmentation_model, get_model_metrics
+from modules.prefetch import PrefetchPipeline
+from modules.worker_pool import InferenceWorkerPool
 from modules.utils import (
     generate_output_paths, save_report, extract_location_from_image,
     measure_execution_time, validate_image, get_image_files_in_directory,
     logger
 )
 from config import (
-    IMAGES_DIR, OVERLAY_DIR, REPORTS_DIR, 
-    USE_FASTAPI, FASTAPI_HOST, FASTAPI_PORT
+    REPORTS_DIR, USE_FASTAPI, FASTAPI_HOST, FASTAPI_PORT, FASTAPI_API_KEY, SAVE_OVERLAYS,
+    SEGMENTATION_BATCH_SIZE, INFERENCE_WORKERS, ensure_directories,
+    SEGFORMER_MODEL, SEGFORMER_CASCADE_MODEL, SEGMENTATION_MODE, ENHANCED_EXTERNAL_ANALYSIS,
+    CLASS_MAP, STAIR_SEGMENT_MIN_PIXELS, FEATURE_STORE_ENABLED, FEATURE_STORE_PATH
 )
 
-import pandas as pd
-import json
+# 파일 경로 -> (수정 시각, 매핑 데이터) (데몬 등 한 프로세스에서 여러 이미지를 처리할 때 CSV 재파싱 방지)
+_mapping_cache = {}
 
 def load_kakao_mapping_data(csv_path="processed_output.csv"):
     """
@@ -38,7 +42,15 @@ def load_kakao_mapping_data(csv_path="processed_output.csv"):
     Returns:
         dict: 파일명을 키로 하는 매핑 딕셔너리
     """
+    import pandas as pd
+    
     try:
+        cache_key = os.path.abspath(csv_path)
+        mtime = os.path.getmtime(csv_path)
+        cached = _mapping_cache.get(cache_key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
         df = pd.read_csv(csv_path)
         mapping_data = {}
         
@@ -74,6 +86,7 @@ def load_kakao_mapping_data(csv_path="processed_output.csv"):
                 }
             }
         
+        _mapping_cache[cache_key] = (mtime, mapping_data)
         return mapping_data
     except Exception as e:
         logger.error(f"카카오 매핑 데이터 로드 실패: {str(e)}")
@@ -98,8 +111,28 @@ def get_location_info_from_mapping(image_path, mapping_data):
         logger.warning(f"매핑 데이터에서 {filename}을 찾을 수 없습니다.")
         return None
 
+@lru_cache(maxsize=None)
+def get_analyzers():
+    """
+    프로세스 내에서 재사용하는 분석기 인스턴스 반환 (최초 호출 시 생성)
+    
+    Returns:
+        dict: accessibility / enhanced / facility / llm 분석기
+    """
+    from modules.accessibility_analysis import AccessibilityAnalyzer
+    from modules.enhanced_external_analysis import EnhancedExternalAnalyzer
+    from modules.facility_data import FacilityData
+    from modules.llm_interface import LLMAnalyzer
+    
+    return {
+        "accessibility": AccessibilityAnalyzer(),
+        "enhanced": EnhancedExternalAnalyzer(),
+        "facility": FacilityData(),
+        "llm": LLMAnalyzer()
+    }
+
 @measure_execution_time
-def process_image(image_path, output_dir=None, send_to_api=False):
+def process_image(image_path, output_dir=None, send_to_api=False, segmentation=None, segmentation_info=None):
     """
     단일 이미지 처리
     
@@ -107,10 +140,19 @@ def process_image(image_path, output_dir=None, send_to_api=False):
         image_path: 이미지 파일 경로
         output_dir: 결과물 저장 디렉토리 (None이면 기본값 사용)
         send_to_api: API 전송 여부
+        segmentation: 미리 계산된 (이미지, numpy 이미지, 세그멘테이션 맵) (None이면 직접 수행)
+        segmentation_info: 미리 계산된 세그멘테이션의 메타데이터 (모델, 캐스케이드 단계 등)
     
     Returns:
         dict: 처리 결과
     """
+    from modules.segmentation import LazyOverlay
+    from modules.segmentation_cache import segment_with_cache
+    from modules.feature_context import ImageFeatureContext
+    from modules.enhanced_external_analysis import integrate_enhanced_external_analysis
+    from modules.scoring import append_feature_record
+    from modules.api_client import APIClient
+    
     # 이미지 존재 및 유효성 확인
     if not os.path.exists(image_path):
         return {"error": f"Image not found: {image_path}"}
@@ -137,25 +179,45 @@ def process_image(image_path, output_dir=None, send_to_api=False):
         logger.info(f"기존 방식으로 위치 정보 추출: {location_info}")
     
     try:
-        # 세그멘테이션 모델 초기화 및 실행
+        # 세그멘테이션 모델 실행 (프로세스 내에서 한 번만 로드된 모델 공유, 캐시 우선 조회)
         logger.info(f"Processing image: {image_path}")
-        segmentation_model = SegmentationModel()
-        image, image_np, seg_map = segmentation_model.process_image(image_path)
+        segmentation_model = get_active_segmentation_model()
+        if segmentation is None:
+            segmentation, segmentation_info = segment_with_cache(segmentation_model, [image_path])[0]
+        image, image_np, seg_map = segmentation
+        
+        # 오버레이 이미지 (LLM 분석/API 전송 등에서 경로를 요청할 때 렌더링)
+        overlay = LazyOverlay(segmentation_model, image_np, seg_map, output_paths["overlay"])
+        if SAVE_OVERLAYS:
+            overlay.render()
         
-        # 오버레이 이미지 생성
-        logger.info("Creating overlay image...")
-        blended, color_map = segmentation_model.create_overlay(image_np, seg_map)
-        segmentation_model.save_overlay(blended, output_paths["overlay"])
+        # 이미지 특징(디코딩 이미지, 그레이스케일, 엣지, 클래스 마스크 등)은 모든 분석기가 한 번만 계산해 공유
+        context = ImageFeatureContext(image_path, seg_map)
         
         # 접근성 분석
         logger.info("Analyzing accessibility...")
-        analyzer = AccessibilityAnalyzer()
-        accessibility_info = analyzer.analyze(seg_map)
+        analyzers = get_analyzers()
+        accessibility_info = analyzers["accessibility"].analyze(seg_map, context=context)
+        
+        # 계단 세그먼트 추출 (계단 검증기/강화된 외부 분석 입력, 연결 요소 라벨링 한 번)
+        # 저해상도 맵(SEGMENTATION_NATIVE_RESOLUTION, 캐스케이드 등)이어도 두 소비자가 원본 이미지 좌표로 읽도록 환산
+        extraction_start = time.perf_counter()
+        stair_segments = context.stats.segments(
+            CLASS_MAP['stairs'], STAIR_SEGMENT_MIN_PIXELS, shape=image_np.shape[:2]
+        )
+        logger.info(f"Stair segments: {len(stair_segments)} ({(time.perf_counter() - extraction_start) * 1000:.1f}ms)")
+        
+        # 점수 규칙 입력 특징 (LLM 계단 검증이 has_stairs를 바꾸기 전의 분석 결과 기준)
+        feature_record = {
+            "image_path": image_path,
+            "timestamp": datetime.now().isoformat(),
+            "accessibility_score": accessibility_info["accessibility_score"],
+            "accessibility": analyzers["accessibility"].extract_features(accessibility_info, seg_map.shape)
+        }
         
         # 장애인편의시설 데이터 가져오기
         logger.info("Checking facility data availability...")
-        facility_data = FacilityData()
-        facility_info = facility_data.get_facility_info(location_info)
+        facility_info = analyzers["facility"].get_facility_info(location_info)
         
         # 공공데이터 사용 여부에 따른 처리 분기
         if facility_info and facility_info.get("available", False):
@@ -165,11 +227,28 @@ def process_image(image_path, output_dir=None, send_to_api=False):
             logger.info("No public facility data - using image-based analysis only")
             analysis_mode = "image_only"  # 외부 점수만 사용
             facility_info = None  # LLM에 None 전달하여 이미지 기반 분석 모드 활성화
+            if ENHANCED_EXTERNAL_ANALYSIS:
+                logger.info("Running enhanced external analysis...")
+                accessibility_info = integrate_enhanced_external_analysis(
+                    accessibility_info, image_path, seg_map, stair_segments,
+                    context=context, analyzer=analyzers["enhanced"]
+                )
+                enhanced_result = accessibility_info["enhanced_external_analysis"]
+                if "timing" in enhanced_result:
+                    logger.info(f"Enhanced sub-analyses: {json.dumps(enhanced_result['timing'])}")
+                if "features" in enhanced_result:
+                    feature_record["external_accessibility_score"] = enhanced_result["external_accessibility_score"]
+                    feature_record["external"] = enhanced_result["features"]
+        
+        if FEATURE_STORE_ENABLED:
+            append_feature_record(feature_record, FEATURE_STORE_PATH)
         
         # LLM 분석
         logger.info(f"Requesting LLM analysis (mode: {analysis_mode})...")
-        llm = LLMAnalyzer()
-        llm_analysis = llm.analyze_image(image_path, output_paths["overlay"], accessibility_info, facility_info)
+        llm_analysis = analyzers["llm"].analyze_image(
+            image_path, overlay, accessibility_info, facility_info, stair_segments, context=context
+        )
+        logger.info(f"Feature context: {json.dumps(context.get_counters(), ensure_ascii=False)}")
         
         # 분석 모드 정보 추가
         if isinstance(llm_analysis, dict):
@@ -178,7 +257,7 @@ def process_image(image_path, output_dir=None, send_to_api=False):
         # 결과 종합
         result = {
             "image_path": image_path,
-            "overlay_path": output_paths["overlay"],
+            "overlay_path": None,
         }
         
         # 카카오 매핑 정보가 있으면 추가
@@ -190,9 +269,14 @@ def process_image(image_path, output_dir=None, send_to_api=False):
             "accessibility_info": accessibility_info,
             "facility_info": facility_info,
             "llm_analysis": llm_analysis,
+            "segmentation_info": segmentation_info,
             "timestamp": datetime.now().isoformat()
         })
         
+        # 오버레이를 실제로 생성한 경우에만 경로 기록
+        if overlay.rendered:
+            result["overlay_path"] = overlay.path
+        
         # 보고서 저장
         logger.info("Saving report...")
         save_report(result, output_paths["report"])
@@ -207,9 +291,10 @@ def process_image(image_path, output_dir=None, send_to_api=False):
                 facility_info, 
                 llm_analysis,
                 image_path,
-                output_paths["overlay"]
+                overlay
             )
             result["api_response"] = api_response
+            result["overlay_path"] = overlay.path
         
         logger.info(f"Processing complete. Results saved to {output_paths['report']}")
         return result
@@ -235,7 +320,8 @@ def process_image(image_path, output_dir=None, send_to_api=False):
         logger.debug(f"Error details saved to {error_report_path}")
         return error_result
 
-def process_directory(directory_path, output_dir=None, send_to_api=False):
+def process_directory(directory_path, output_dir=None, send_to_api=False, workers=INFERENCE_WORKERS,
+                      threads_per_worker=None):
     """
     디렉토리 내 모든 이미지 처리
     
@@ -243,6 +329,8 @@ def process_directory(directory_path, output_dir=None, send_to_api=False):
         directory_path: 이미지 디렉토리 경로
         output_dir: 결과물 저장 디렉토리 (None이면 기본값 사용)
         send_to_api: API 전송 여부
+        workers: 추론 워커 프로세스 수 (1이면 현재 프로세스에서 처리)
+        threads_per_worker: 워커당 torch/OpenCV 스레드 수 (None이면 코어 예산을 워커 수로 나눔)
     
     Returns:
         list: 처리 결과 목록
@@ -264,22 +352,150 @@ def process_directory(directory_path, output_dir=None, send_to_api=False):
     
     logger.info(f"Found {len(image_files)} images to process")
     
-    image_count = 0
-    error_count = 0
-    
-    for file_path in image_files:
-        image_count += 1
-        logger.info(f"\nProcessing image {image_count}/{len(image_files)}: {Path(file_path).name}")
+    if workers > 1:
+        # 워커마다 모델을 로드하므로 부모 프로세스에서는 모델을 로드하지 않음
+        batches = [
+            image_files[batch_start:batch_start + SEGMENTATION_BATCH_SIZE]
+            for batch_start in range(0, len(image_files), SEGMENTATION_BATCH_SIZE)
+        ]
+        task = partial(process_image_batch, output_dir=output_dir, send_to_api=send_to_api)
+        with InferenceWorkerPool(workers, threads_per_worker) as pool:
+            for batch_results in pool.imap(task, batches):
+                results.extend(batch_results)
+    else:
+        segmentation_model = get_active_segmentation_model()
+        batch_size = segmentation_model.batch_size
+        batches = [
+            image_files[batch_start:batch_start + batch_size]
+            for batch_start in range(0, len(image_files), batch_size)
+        ]
         
-        result = process_image(file_path, output_dir, send_to_api)
-        results.append(result)
+        # 다음 배치의 디코딩/전처리를 현재 배치 추론·분석과 겹쳐서 실행
+        pipeline = PrefetchPipeline(partial(_prepare_batch, segmentation_model), batches)
+        for batch_files, pending in pipeline:
+            logger.info(f"\nProcessing images {len(results) + 1}-{len(results) + len(batch_files)}/{len(image_files)}")
+            segmentations = _segment_batch(segmentation_model, pending)
+            results.extend(process_image_batch(batch_files, output_dir, send_to_api, segmentations))
+        logger.info(f"Prefetch metrics: {json.dumps(pipeline.get_metrics(), ensure_ascii=False)}")
+    
+    error_count = sum(1 for result in results if "error" in result)
+    logger.info(f"\nProcessing complete. Total: {len(results)} images, Success: {len(results) - error_count}, Errors: {error_count}")
+    if workers <= 1:
+        from modules.segmentation_cache import get_segmentation_cache
         
-        if "error" in result:
-            error_count += 1
+        logger.info(f"Model metrics: {json.dumps(get_model_metrics(), ensure_ascii=False)}")
+        cache = get_segmentation_cache()
+        if cache is not None:
+            logger.info(f"Segmentation cache: {json.dumps(cache.get_stats(), ensure_ascii=False)}")
+    return results
+
+@measure_execution_time
+def process_video(video_path, output_dir=None):
+    """
+    동영상/프레임 시퀀스를 분석하여 장소 단위 접근성 보고서 저장
+    
+    Args:
+        video_path: 동영상 파일 또는 프레임 이미지 디렉토리 경로
+        output_dir: 결과물 저장 디렉토리 (None이면 기본값 사용)
+    
+    Returns:
+        dict: 장소 단위 처리 결과
+    """
+    from modules.video import VideoAnalyzer
+    
+    if not os.path.exists(video_path):
+        return {"error": f"Video not found: {video_path}"}
     
-    logger.info(f"\nProcessing complete. Total: {image_count} images, Success: {image_count - error_count}, Errors: {error_count}")
+    logger.info(f"Processing video: {video_path}")
+    try:
+        video_analyzer = VideoAnalyzer(get_active_segmentation_model(), get_analyzers()["accessibility"])
+        result = video_analyzer.analyze(video_path)
+    except Exception as e:
+        logger.error(f"Error during video processing: {str(e)}")
+        return {"error": f"Processing error: {str(e)}", "video_path": video_path}
+    
+    report_dir = output_dir or REPORTS_DIR
+    os.makedirs(report_dir, exist_ok=True)
+    report_path = os.path.join(
+        report_dir, f"{Path(video_path).stem}_video_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    save_report(result, report_path)
+    logger.info(f"Processing complete. Results saved to {report_path}")
+    return result
+
+def process_image_batch(batch_files, output_dir=None, send_to_api=False, segmentations=None):
+    """
+    이미지 묶음을 배치 세그멘테이션한 뒤 이미지별로 분석 (워커 프로세스 작업 단위)
+    
+    Args:
+        batch_files: 이미지 파일 경로 목록
+        output_dir: 결과물 저장 디렉토리 (None이면 기본값 사용)
+        send_to_api: API 전송 여부
+        segmentations: 미리 계산된 파일 경로별 (세그멘테이션 결과, 메타데이터) (None이면 직접 수행)
+    
+    Returns:
+        list: 이미지별 처리 결과
+    """
+    if segmentations is None:
+        segmentation_model = get_active_segmentation_model()
+        segmentations = _segment_batch(segmentation_model, _prepare_batch(segmentation_model, batch_files))
+    
+    results = []
+    for file_path in batch_files:
+        logger.info(f"Processing image: {Path(file_path).name}")
+        segmentation, segmentation_info = segmentations.get(file_path, (None, None))
+        results.append(process_image(file_path, output_dir, send_to_api, segmentation, segmentation_info))
     return results
 
+def _prepare_batch(segmentation_model, image_files):
+    """
+    유효한 이미지만 골라 캐시 조회 및 디코딩/전처리 (prefetch 스레드에서 실행)
+    
+    Args:
+        segmentation_model: 세그멘테이션 모델
+        image_files: 이미지 파일 경로 목록
+    
+    Returns:
+        dict: prepare_with_cache 결과 (유효한 이미지가 없거나 실패하면 None - 개별 처리됨)
+    """
+    from modules.segmentation_cache import prepare_with_cache
+    
+    valid_files = [
+        file_path for file_path in image_files
+        if os.path.exists(file_path) and validate_image(file_path)
+    ]
+    if not valid_files:
+        return None
+    
+    try:
+        return prepare_with_cache(segmentation_model, valid_files)
+    except Exception as e:
+        logger.warning(f"배치 전처리 실패, 개별 처리로 전환: {str(e)}")
+        return None
+
+def _segment_batch(segmentation_model, pending):
+    """
+    전처리된 이미지들을 한 번에 배치 세그멘테이션 (캐시에 있는 이미지는 추론 생략)
+    
+    Args:
+        segmentation_model: 세그멘테이션 모델
+        pending: _prepare_batch 결과
+    
+    Returns:
+        dict: 파일 경로별 (세그멘테이션 결과, 메타데이터) (실패한 이미지는 제외되어 개별 처리됨)
+    """
+    from modules.segmentation_cache import complete_with_cache
+    
+    if pending is None:
+        return {}
+    
+    try:
+        logger.info(f"Segmenting batch of {len(pending['image_files'])} images...")
+        return dict(zip(pending["image_files"], complete_with_cache(segmentation_model, pending)))
+    except Exception as e:
+        logger.warning(f"배치 세그멘테이션 실패, 개별 처리로 전환: {str(e)}")
+        return {}
+
 def check_fastapi_server():
     """
     FastAPI 서버 연결 확인
@@ -290,6 +506,8 @@ def check_fastapi_server():
     if not USE_FASTAPI:
         return False
     
+    import requests
+    
     try:
         url = f"http://{FASTAPI_HOST}:{FASTAPI_PORT}/ping"
         response = requests.post(
@@ -303,6 +521,162 @@ def check_fastapi_server():
         logger.warning(f"FastAPI 서버 연결 확인 실패: {str(e)}")
         return False
 
+def prepare_models(model_names=None, force=False):
+    """
+    설정된 세그멘테이션 모델을 로컬 저장소(MODEL_DIR)에 safetensors + 체크섬 매니페스트로 저장
+    
+    Args:
+        model_names: 저장할 모델 이름 목록 (비어 있으면 SEGFORMER_MODEL, 캐스케이드 모드면 경량 모델 포함)
+        force: True이면 기존 저장소도 다시 생성
+    
+    Returns:
+        dict: 모델 이름별 매니페스트
+    """
+    from modules.model_store import prepare_model
+    
+    if not model_names:
+        model_names = [SEGFORMER_MODEL]
+        if SEGMENTATION_MODE == "cascade":
+            model_names.append(SEGFORMER_CASCADE_MODEL)
+    
+    manifests = {}
+    for model_name in model_names:
+        manifest = prepare_model(model_name, force)
+        manifests[model_name] = manifest
+        logger.info(f"{model_name}: " + ", ".join(
+            f"{file_name} ({entry['size'] / (1024 * 1024):.1f}MB, sha256 {entry['sha256'][:12]})"
+            for file_name, entry in manifest["files"].items()
+        ))
+    return manifests
+
+def warmup_daemon():
+    """
+    데몬 시작 시 모델/분석기/매핑 데이터를 미리 로드하고 첫 forward 비용을 미리 지불
+    """
+    import numpy as np
+    
+    ensure_directories()
+    segmentation_model = get_active_segmentation_model()
+    segmentation_model.process_batch([np.zeros((64, 64, 3), dtype=np.uint8)])
+    get_analyzers()
+    load_kakao_mapping_data()
+
+def run_daemon():
+    """
+    로컬 분석 데몬 실행 (종료 요청까지 대기)
+    """
+    from modules.daemon import AnalysisDaemon
+    
+    handlers = {
+        "image": process_image,
+        # 데몬 안에서는 이미 로드된 모델을 쓰도록 워커 풀을 만들지 않음
+        "dir": partial(process_directory, workers=1),
+        "video": process_video
+    }
+    AnalysisDaemon(handlers, warmup=warmup_daemon).serve_forever()
+
+def forward_to_daemon(command, **params):
+    """
+    실행 중인 데몬에 요청 전달 (데몬이 없으면 None 반환 - 현재 프로세스에서 직접 처리)
+    
+    Args:
+        command: "image", "dir" 또는 "video"
+        **params: 처리 함수 인자 (경로는 절대 경로로 변환하여 전달)
+    
+    Returns:
+        dict: 데몬 응답 (result, server_ms, roundtrip_ms) 또는 None
+    """
+    from modules.daemon import DaemonClient
+    
+    client = DaemonClient()
+    if not client.is_running():
+        return None
+    
+    params = {
+        name: os.path.abspath(value) if name in ("image_path", "directory_path", "video_path", "output_dir") and value else value
+        for name, value in params.items()
+    }
+    response = client.request(command, cwd=os.getcwd(), **params)
+    if response.get("status") != "ok":
+        logger.error(f"데몬 처리 실패: {response.get('error')}")
+        return response
+    
+    results = response["result"] if command == "dir" else [response["result"]]
+    error_count = sum(1 for result in results if "error" in result)
+    logger.info(
+        f"데몬 처리 완료: {len(results)}개 (오류 {error_count}개) - "
+        f"왕복 {response['roundtrip_ms']}ms (서버 처리 {response['server_ms']}ms)"
+    )
+    for result in results:
+        if "error" in result:
+            logger.error(result["error"])
+    return response
+
+def rescore(feature_path=None, output_dir=None):
+    """
+    저장된 특징 전체를 현재 점수 규칙으로 재채점 (세그멘테이션/LLM 호출 없음)
+    
+    Args:
+        feature_path: 특징 저장 파일 경로 (None이면 FEATURE_STORE_PATH)
+        output_dir: 점수 CSV 저장 디렉토리 (None이면 특징 파일과 같은 디렉토리)
+        
+    Returns:
+        dict: 레코드 수, 점수가 바뀐 레코드 수, 로드/채점 시간(ms)
+    """
+    from modules.scoring import rescore_features
+    
+    feature_path = Path(feature_path or FEATURE_STORE_PATH)
+    if not feature_path.exists():
+        logger.error(f"특징 저장 파일이 없습니다: {feature_path}")
+        return None
+    
+    scores, summary = rescore_features(feature_path)
+    output_dir = Path(output_dir) if output_dir else feature_path.parent
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = output_dir / f"rescored_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    scores.to_csv(output_path, index=False, encoding="utf-8-sig")
+    summary["output_path"] = str(output_path)
+    return summary
+
+def profile_startup(argv, top=15):
+    """
+    -X importtime으로 명령을 다시 실행하여 패키지별 import 시간과 전체 실행 시간 출력
+    
+    Args:
+        argv: main.py에 전달할 인자 목록
+        top: 출력할 상위 패키지 수
+    
+    Returns:
+        dict: 전체 실행 시간, import 총 시간, 패키지별 import 시간(ms)
+    """
+    command = [sys.executable, "-X", "importtime", os.path.abspath(__file__)] + argv
+    start_time = time.perf_counter()
+    completed = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall_ms = (time.perf_counter() - start_time) * 1000
+    
+    # "import time: self [us] | cumulative | imported package" 형식의 줄을 최상위 패키지별로 합산
+    package_us = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, _, name = line[len("import time:"):].split("|")
+            package = name.strip().split(".")[0]
+            package_us[package] = package_us.get(package, 0) + int(self_us)
+        except ValueError:
+            continue
+    
+    breakdown = sorted(package_us.items(), key=lambda item: item[1], reverse=True)
+    report = {
+        "command": " ".join(["main.py"] + argv),
+        "exit_code": completed.returncode,
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(sum(package_us.values()) / 1000, 1),
+        "packages_ms": {package: round(us / 1000, 1) for package, us in breakdown[:top]}
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return report
+
 def main():
     """
     메인 실행 함수
@@ -310,13 +684,59 @@ def main():
     parser = argparse.ArgumentParser(description="Accessibility Analyzer")
     parser.add_argument("--image", type=str, help="Path to single image")
     parser.add_argument("--dir", type=str, help="Directory containing images")
+    parser.add_argument("--video", type=str, help="Video file or directory of frames of one entrance approach")
     parser.add_argument("--output", type=str, help="Output directory")
     parser.add_argument("--api", action="store_true", help="Send results to API")
     parser.add_argument("--test", action="store_true", help="Test API connection")
     parser.add_argument("--check-server", action="store_true", help="Check FastAPI server connection")
+    parser.add_argument("--workers", type=int, default=INFERENCE_WORKERS, help="Inference worker processes for --dir")
+    parser.add_argument("--threads-per-worker", type=int, help="torch/OpenCV threads per worker (default: CPU budget / workers)")
+    parser.add_argument("--prepare-models", nargs="*", metavar="MODEL",
+                        help="Save models (default: configured models) to the local store as safetensors with checksums")
+    parser.add_argument("--force", action="store_true", help="With --prepare-models, rebuild even if the store verifies")
+    parser.add_argument("--daemon", action="store_true", help="Run a local analysis daemon that keeps models warm (Unix socket)")
+    parser.add_argument("--daemon-status", action="store_true", help="Print daemon status and per-request latency")
+    parser.add_argument("--daemon-stop", action="store_true", help="Stop the running daemon")
+    parser.add_argument("--no-daemon", action="store_true", help="Process in this process even if a daemon is running")
+    parser.add_argument("--rescore", nargs="?", const="", metavar="FEATURES",
+                        help="Recompute scores for all stored features (default: FEATURE_STORE_PATH); CSV goes to --output")
+    parser.add_argument("--profile-startup", action="store_true", help="Re-run the command under -X importtime and print an import-time breakdown")
     
     args = parser.parse_args()
     
+    # 시작 시간 프로파일링 (나머지 인자로 자기 자신을 다시 실행)
+    if args.profile_startup:
+        profile_startup([arg for arg in sys.argv[1:] if arg != "--profile-startup"])
+        return
+    
+    # 로컬 모델 저장소 준비 (이후 MODEL_OFFLINE=true로 허브 없이 실행 가능)
+    if args.prepare_models is not None:
+        prepare_models(args.prepare_models, args.force)
+        return
+    
+    # 저장된 특징 재채점 (점수 규칙만 다시 적용)
+    if args.rescore is not None:
+        summary = rescore(args.rescore or None, args.output)
+        if summary:
+            print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+    
+    # 로컬 분석 데몬 실행/상태/종료
+    if args.daemon:
+        run_daemon()
+        return
+    
+    if args.daemon_status or args.daemon_stop:
+        from modules.daemon import DaemonClient
+        
+        client = DaemonClient()
+        if not client.is_running():
+            logger.error("실행 중인 분석 데몬이 없습니다.")
+            return
+        response = client.request("shutdown" if args.daemon_stop else "status")
+        print(json.dumps(response["result"], ensure_ascii=False, indent=2))
+        return
+    
     # FastAPI 서버 연결 확인
     if args.check_server:
         if check_fastapi_server():
@@ -327,6 +747,8 @@ def main():
     
     # API 연결 테스트
     if args.test:
+        from modules.api_client import APIClient
+        
         logger.info("Testing API connection...")
         api_client = APIClient()
         if api_client.test_connection():
@@ -335,18 +757,36 @@ def main():
             logger.error("API connection failed!")
         return
     
+    # 실행 중인 데몬이 있으면 요청만 전달 (워커 풀을 쓰는 --dir는 현재 프로세스에서 처리)
+    use_daemon = not args.no_daemon and (args.image or (args.dir and args.workers <= 1))
+    
     # 단일 이미지 처리
     if args.image:
+        if use_daemon and forward_to_daemon("image", image_path=args.image, output_dir=args.output,
+                                            send_to_api=args.api):
+            return
+        ensure_directories()
         process_image(args.image, args.output, args.api)
     
     # 디렉토리 처리
     elif args.dir:
-        process_directory(args.dir, args.output, args.api)
+        if use_daemon and forward_to_daemon("dir", directory_path=args.dir, output_dir=args.output,
+                                            send_to_api=args.api):
+            return
+        ensure_directories()
+        process_directory(args.dir, args.output, args.api, args.workers, args.threads_per_worker)
+    
+    # 동영상/프레임 시퀀스 처리
+    elif args.video:
+        if not args.no_daemon and forward_to_daemon("video", video_path=args.video, output_dir=args.output):
+            return
+        ensure_directories()
+        process_video(args.video, args.output)
     
     # 인자 없을 경우 도움말 출력
     else:
         parser.print_help()
-        logger.info("\nPlease specify --image or --dir")
+        logger.info("\nPlease specify --image, --dir or --video")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
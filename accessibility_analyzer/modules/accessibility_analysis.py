@@ -3,149 +3,277 @@
 """
 import numpy as np
 from scipy.ndimage import binary_dilation
-from config import CLASS_MAP, ACCESSIBILITY_THRESHOLD_DISTANCE
+from config import CLASS_MAP, ANALYSIS_WORKING_SIZE
+from modules.segmap_statistics import (
+    SegMapStatistics, ComponentStatistics, to_working_resolution
+)
+from modules.scoring import (
+    get_threshold_distance, door_width_category, accessibility_decisions, accessibility_score
+)
 
 class AccessibilityAnalyzer:
-    def __init__(self, class_map=CLASS_MAP):
+    def __init__(self, class_map=CLASS_MAP, working_size=ANALYSIS_WORKING_SIZE):
         """
         접근성 분석기 초기화
+        
+        Args:
+            class_map: 클래스 이름 -> 클래스 ID
+            working_size: 작업 해상도 긴 변 (0이면 입력 해상도에서 픽셀 단위 임계값으로 분석)
         """
         self.class_map = class_map
-        self.threshold_distance = ACCESSIBILITY_THRESHOLD_DISTANCE
+        self.working_size = working_size
     
-    def analyze(self, seg_map):
+    def get_threshold_distance(self, shape):
+        """
+        분석할 맵 크기에 맞는 거리 임계값 (작업 해상도 모드에서는 긴 변 대비 비율로 환산)
+        
+        Args:
+            shape: 분석할 세그멘테이션 맵 (높이, 너비)
+        
+        Returns:
+            float: 거리 임계값 (픽셀)
+        """
+        return float(get_threshold_distance(max(shape), bool(self.working_size)))
+    
+    def analyze(self, seg_map, stats=None, context=None):
         """
         세그멘테이션 맵에서 접근성 정보 분석
         
         Args:
             seg_map: 세그멘테이션 맵
+            stats: 미리 계산한 SegMapStatistics (None이면 생성 - 클래스별 픽셀 수는 bincount 한 번으로 계산)
+            context: 다른 분석기와 공유하는 ImageFeatureContext (주어지면 seg_map/stats 대신 사용)
             
         Returns:
             dict: 접근성 정보
         """
-        # 기본 접근성 정보 초기화
-        accessibility_info = {
-            'has_stairs': False,
-            'has_ramp': False,
-            'entrance_accessible': True,
-            'obstacles': [],
-            'obstacle_details': {},
-            'additional_obstacles': [],  # 새로 추가
-            'confidence_scores': {}  # 새로 추가
-        }
+        if context is not None:
+            # 작업 해상도 컨텍스트는 같은 크기를 쓰는 다른 분석기와 공유
+            context = context.at_working_size(self.working_size)
+            seg_map, stats = context.seg_map, context.stats
+        # 작업 해상도 모드: 촬영 해상도와 관계없이 같은 크기의 맵에서 분석
+        elif self.working_size:
+            seg_map = to_working_resolution(seg_map, self.working_size)
+            if stats is not None and stats.shape != seg_map.shape:
+                stats = None
+        if stats is None:
+            stats = SegMapStatistics(seg_map)
+        return self._analyze_statistics([stats])[0]
+    
+    def analyze_many(self, seg_maps, contexts=None):
+        """
+        여러 세그멘테이션 맵을 한 번에 분석 (결과는 맵마다 analyze를 호출한 것과 같음)
+        
+        클래스별 픽셀 수를 (맵 수, 클래스 수) 행렬로 모아 존재 여부/비율/크기·심각도 구간/추가 장애물/
+        신뢰도/점수를 배치 전체에 배열 연산으로 계산하고, 거리와 연결 요소 같은 기하 관계만 맵별로 계산한다.
         
-        # 계단 감지
-        stairs_mask = seg_map == self.class_map['stairs']
-        if np.any(stairs_mask):
-            accessibility_info['has_stairs'] = True
-            accessibility_info['obstacles'].append('stairs')
+        Args:
+            seg_maps: 세그멘테이션 맵 목록 또는 (맵 수, 높이, 너비) 배열 (목록이면 맵 크기가 달라도 됨)
+            contexts: 맵별 ImageFeatureContext 목록 (주어지면 seg_maps 대신 사용)
             
-            # 계단 크기 분석 (픽셀 수로 상대적인 크기 추정)
-            stairs_pixels = np.count_nonzero(stairs_mask)
-            total_pixels = seg_map.size
-            stairs_ratio = stairs_pixels / total_pixels
-
-            stair_count = self._estimate_stair_count(stairs_mask)
-
-            accessibility_info['obstacle_details']['stairs'] = {
-                'pixel_count': int(stairs_pixels),
-                'ratio': float(stairs_ratio),
-                'estimated_size': self._estimate_size(stairs_ratio),
-                'estimated_count': stair_count
-            }
-
-            # 계단 심각도 분석
-            accessibility_info['stair_severity'] = self._analyze_stair_severity(stair_count, stairs_ratio)
+        Returns:
+            list: 맵별 접근성 정보
+        """
+        if contexts is not None:
+            stats_list = [context.at_working_size(self.working_size).stats for context in contexts]
         else:
-            accessibility_info['stair_severity'] = 'none'
-
-        # 추가 장애물 감지 (계단 외)
-        additional_obstacles, additional_obstacle_details = self._detect_additional_obstacles(seg_map)
-        accessibility_info['additional_obstacles'] = additional_obstacles
-        accessibility_info['obstacles'].extend(additional_obstacles)
-        
-        # 추가 장애물 세부 정보를 기존 obstacle_details에 병합
-        accessibility_info['obstacle_details'].update(additional_obstacle_details)
-        
-        # 문 감지 및 분석
-        door_mask = seg_map == self.class_map['door']
-        if np.any(door_mask):
-            # 문 크기 분석
-            door_pixels = np.count_nonzero(door_mask)
-            total_pixels = seg_map.size
-            door_ratio = door_pixels / total_pixels
-            accessibility_info['has_door'] = True
-            accessibility_info['obstacle_details']['door'] = {
-                'pixel_count': int(door_pixels),
-                'ratio': float(door_ratio),
-                'estimated_width': self._estimate_door_width(door_ratio)
+            stats_list = [SegMapStatistics(to_working_resolution(seg_map, self.working_size)) for seg_map in seg_maps]
+        return self._analyze_statistics(stats_list)
+    
+    def _analyze_statistics(self, stats_list):
+        """
+        맵 통계 목록에서 접근성 정보 계산 (analyze/analyze_many 공통)
+        
+        Args:
+            stats_list: 맵별 SegMapStatistics
+            
+        Returns:
+            list: 맵별 접근성 정보
+        """
+        if not stats_list:
+            return []
+        stairs_id = self.class_map['stairs']
+        door_id = self.class_map['door']
+        sidewalk_id = self.class_map['sidewalk']
+        building_id = self.class_map['building']
+        railing_id = self.class_map['railing']
+        
+        # 클래스별 픽셀 수 행렬 (맵 수, 클래스 수) - 맵마다 이미 계산한 bincount를 모음
+        num_classes = max(max(len(stats.counts) for stats in stats_list), max(self.class_map.values()) + 1)
+        counts = np.zeros((len(stats_list), num_classes), dtype=np.int64)
+        for index, stats in enumerate(stats_list):
+            counts[index, :len(stats.counts)] = stats.counts
+        total_pixels = np.array([stats.total_pixels for stats in stats_list])
+        ratios = counts / total_pixels[:, None]
+        present = counts > 0
+        
+        # 기하 관계(계단 연결 요소, 객체 간 거리)만 맵별로 계산
+        stair_counts = np.zeros(len(stats_list), dtype=np.int64)
+        distances = []
+        for index, stats in enumerate(stats_list):
+            if present[index, stairs_id]:
+                stair_counts[index] = self._estimate_stair_count(stats.mask(stairs_id), stats.count(stairs_id))
+            map_distances = {}
+            if present[index, door_id]:
+                # 문까지의 거리 변환 한 번으로 계단/인도에서 문까지의 거리를 함께 계산
+                door_distances = stats.min_distances(door_id, [stairs_id, sidewalk_id])
+                if present[index, stairs_id]:
+                    map_distances['stairs_to_door_distance'] = float(door_distances[stairs_id])
+                if present[index, sidewalk_id]:
+                    map_distances['sidewalk_to_door_distance'] = float(door_distances[sidewalk_id])
+            if present[index, railing_id] and present[index, stairs_id]:
+                # 난간이 계단 근처에 있는지 확인
+                map_distances['railing_to_stairs_distance'] = float(stats.min_distance(railing_id, stairs_id))
+            distances.append(map_distances)
+        
+        # 크기/심각도 구간, 문 너비, 추가 장애물, 신뢰도는 배치 전체에 배열 연산
+        stair_sizes = self._estimate_size(ratios[:, stairs_id])
+        stair_severities = self._analyze_stair_severity(stair_counts, ratios[:, stairs_id])
+        door_widths = self._estimate_door_width(ratios[:, door_id])
+        obstacle_flags = self._detect_additional_obstacles(counts)
+        confidence_scores = self._calculate_confidence_scores(stats_list, counts, ratios)
+        
+        results = []
+        for index, stats in enumerate(stats_list):
+            # 기본 접근성 정보 초기화
+            accessibility_info = {
+                'has_stairs': False,
+                'has_ramp': False,
+                'entrance_accessible': True,
+                'obstacles': [],
+                'obstacle_details': {},
+                'additional_obstacles': [],  # 새로 추가
+                'confidence_scores': {}  # 새로 추가
             }
+            obstacle_details = accessibility_info['obstacle_details']
+            map_distances = distances[index]
             
-            # 문과 계단의 관계 분석
-            if accessibility_info['has_stairs']:
-                min_distance = self._calculate_object_distance(stairs_mask, door_mask)
-                accessibility_info['obstacle_details']['stairs_to_door_distance'] = float(min_distance)
-                
-                # 문 앞에 계단이 있는지 분석
-                if min_distance < self.threshold_distance:
-                    accessibility_info['entrance_accessible'] = False
-                    accessibility_info['obstacles'].append('stairs_at_entrance')
-        
-        # 인도 감지
-        sidewalk_mask = seg_map == self.class_map['sidewalk']
-        if np.any(sidewalk_mask):
-            accessibility_info['has_sidewalk'] = True
+            # 계단 감지 (픽셀 수로 상대적인 크기 추정)
+            if present[index, stairs_id]:
+                accessibility_info['has_stairs'] = True
+                accessibility_info['obstacles'].append('stairs')
+                obstacle_details['stairs'] = {
+                    'pixel_count': int(counts[index, stairs_id]),
+                    'ratio': float(ratios[index, stairs_id]),
+                    'estimated_size': str(stair_sizes[index]),
+                    'estimated_count': int(stair_counts[index])
+                }
+                accessibility_info['stair_severity'] = str(stair_severities[index])
+            else:
+                accessibility_info['stair_severity'] = 'none'
             
-            # 인도와 입구의 관계 분석
-            if accessibility_info.get('has_door', False):
-                sidewalk_to_door = self._calculate_object_distance(sidewalk_mask, door_mask)
-                accessibility_info['obstacle_details']['sidewalk_to_door_distance'] = float(sidewalk_to_door)
-                
-                # 인도에서 문까지 연결성 분석
-                if sidewalk_to_door > self.threshold_distance:
-                    accessibility_info['obstacles'].append('disconnected_sidewalk')
-        
-        # 건물 감지
-        building_mask = seg_map == self.class_map['building']
-        if np.any(building_mask):
-            accessibility_info['has_building'] = True
+            # 추가 장애물 감지 (계단 외)
+            for obstacle_name, class_id, detected in obstacle_flags:
+                if detected[index]:
+                    accessibility_info['additional_obstacles'].append(obstacle_name)
+                    obstacle_details[obstacle_name] = {
+                        'pixel_count': int(counts[index, class_id]),
+                        'ratio': float(ratios[index, class_id]),
+                        'obstacle_type': self._categorize_obstacle_type(obstacle_name)
+                    }
+            accessibility_info['obstacles'].extend(accessibility_info['additional_obstacles'])
             
-            # 건물 크기 분석
-            building_pixels = np.count_nonzero(building_mask)
-            total_pixels = seg_map.size
-            building_ratio = building_pixels / total_pixels
-            accessibility_info['obstacle_details']['building'] = {
-                'pixel_count': int(building_pixels),
-                'ratio': float(building_ratio)
-            }
-        
-        # 난간 감지 (계단용)
-        railing_mask = seg_map == self.class_map['railing']
-        if np.any(railing_mask):
-            accessibility_info['has_railing'] = True
+            # 문 감지 및 분석 (문과 계단의 관계 포함)
+            if present[index, door_id]:
+                accessibility_info['has_door'] = True
+                obstacle_details['door'] = {
+                    'pixel_count': int(counts[index, door_id]),
+                    'ratio': float(ratios[index, door_id]),
+                    'estimated_width': str(door_widths[index])
+                }
+                if 'stairs_to_door_distance' in map_distances:
+                    obstacle_details['stairs_to_door_distance'] = map_distances['stairs_to_door_distance']
             
-            # 난간이 계단 근처에 있는지 확인
-            if accessibility_info['has_stairs']:
-                railing_to_stairs = self._calculate_object_distance(railing_mask, stairs_mask)
-                accessibility_info['obstacle_details']['railing_to_stairs_distance'] = float(railing_to_stairs)
-                
+            # 인도 감지 (인도와 입구의 관계 포함)
+            if present[index, sidewalk_id]:
+                accessibility_info['has_sidewalk'] = True
+                if 'sidewalk_to_door_distance' in map_distances:
+                    obstacle_details['sidewalk_to_door_distance'] = map_distances['sidewalk_to_door_distance']
+            
+            # 건물 감지
+            if present[index, building_id]:
+                accessibility_info['has_building'] = True
+                obstacle_details['building'] = {
+                    'pixel_count': int(counts[index, building_id]),
+                    'ratio': float(ratios[index, building_id])
+                }
+            
+            # 난간 감지 (계단용)
+            if present[index, railing_id]:
+                accessibility_info['has_railing'] = True
+                if 'railing_to_stairs_distance' in map_distances:
+                    obstacle_details['railing_to_stairs_distance'] = map_distances['railing_to_stairs_distance']
+            
+            results.append(accessibility_info)
+        
+        # 측정한 거리로 입구 접근성 판정 및 점수 계산 (재채점과 같은 규칙을 배치 전체에 적용)
+        features = [
+            self.extract_features(accessibility_info, stats.shape)
+            for accessibility_info, stats in zip(results, stats_list)
+        ]
+        feature_columns = {name: [row[name] for row in features] for name in features[0]}
+        decisions = accessibility_decisions(feature_columns)
+        scores = accessibility_score(feature_columns, decisions)
+        
+        for index, (accessibility_info, stats) in enumerate(zip(results, stats_list)):
+            if decisions['stairs_at_entrance'][index]:
+                # 문 앞에 계단이 있음
+                accessibility_info['entrance_accessible'] = False
+                accessibility_info['obstacles'].append('stairs_at_entrance')
+            if decisions['disconnected_sidewalk'][index]:
+                # 인도에서 문까지 연결되지 않음
+                accessibility_info['obstacles'].append('disconnected_sidewalk')
+            if decisions['has_stairs_railing'][index]:
                 # 계단에 난간이 있으면 접근성 향상
-                if railing_to_stairs < self.threshold_distance:
-                    accessibility_info['has_stairs_railing'] = True
-        
-        # 신뢰도 점수 계산
-        accessibility_info['confidence_scores'] = self._calculate_confidence_scores(seg_map)
+                accessibility_info['has_stairs_railing'] = True
+            
+            accessibility_info['confidence_scores'] = confidence_scores[index]
+            
+            # 기본 접근성 점수 (참고용)
+            accessibility_info['accessibility_score'] = int(scores[index])
+            
+            if self.working_size:
+                accessibility_info['analysis_resolution'] = list(stats.shape)
         
-        # 기본 접근성 점수 (참고용)
-        accessibility_score = self._calculate_accessibility_score(accessibility_info)
-        accessibility_info['accessibility_score'] = accessibility_score
+        return results
+    
+    def extract_features(self, accessibility_info, shape):
+        """
+        접근성 정보에서 점수 계산에 쓰는 수치 특징 추출 (특징 저장/재채점용)
         
-        return accessibility_info
+        Args:
+            accessibility_info: analyze 결과
+            shape: 분석한 세그멘테이션 맵 (높이, 너비) (작업 해상도 모드에서는 analysis_resolution 우선)
+            
+        Returns:
+            dict: 특징 이름 -> 값 (측정하지 않은 값은 None)
+        """
+        details = accessibility_info['obstacle_details']
+        door = details.get('door')
+        return {
+            'has_stairs': bool(accessibility_info.get('has_stairs', False)),
+            'has_door': bool(accessibility_info.get('has_door', False)),
+            'has_sidewalk': bool(accessibility_info.get('has_sidewalk', False)),
+            'has_railing': bool(accessibility_info.get('has_railing', False)),
+            'door_ratio': door['ratio'] if door else None,
+            'stairs_to_door_distance': details.get('stairs_to_door_distance'),
+            'sidewalk_to_door_distance': details.get('sidewalk_to_door_distance'),
+            'railing_to_stairs_distance': details.get('railing_to_stairs_distance'),
+            'analysis_long_side': int(max(accessibility_info.get('analysis_resolution') or shape)),
+            'working_resolution': bool(self.working_size)
+        }
     
-    def _detect_additional_obstacles(self, seg_map):
-        """계단 외 추가 장애물 감지"""
-        additional_obstacles = []
-        obstacle_details = {}  # 로컬 변수로 변경
+    def _detect_additional_obstacles(self, counts):
+        """
+        계단 외 추가 장애물 감지 (클래스별 픽셀 수만 사용하므로 마스크를 만들지 않음)
+        
+        Args:
+            counts: (맵 수, 클래스 수) 클래스별 픽셀 수 행렬
+            
+        Returns:
+            list: (장애물 이름, 클래스 ID, 맵별 감지 여부 배열) 목록
+        """
+        obstacle_flags = []
         
         # 감지할 장애물 목록과 최소 픽셀 임계값
         obstacle_classes = {
@@ -165,19 +293,11 @@ class AccessibilityAnalyzer:
         
         for obstacle_name, min_pixels in obstacle_classes.items():
             if obstacle_name in self.class_map:
-                obstacle_mask = seg_map == self.class_map[obstacle_name]
-                if np.any(obstacle_mask):
-                    obstacle_pixels = np.count_nonzero(obstacle_mask)
-                    if obstacle_pixels >= min_pixels:
-                        additional_obstacles.append(obstacle_name)
-                        # 장애물 세부 정보를 로컬 딕셔너리에 저장
-                        obstacle_details[obstacle_name] = {
-                            'pixel_count': int(obstacle_pixels),
-                            'ratio': float(obstacle_pixels / seg_map.size),
-                            'obstacle_type': self._categorize_obstacle_type(obstacle_name)
-                        }
-        
-        return additional_obstacles, obstacle_details  # 두 개 값 반환
+                class_id = self.class_map[obstacle_name]
+                obstacle_pixels = counts[:, class_id]
+                obstacle_flags.append((obstacle_name, class_id, (obstacle_pixels > 0) & (obstacle_pixels >= min_pixels)))
+        
+        return obstacle_flags
 
     
     def _categorize_obstacle_type(self, obstacle_name):
@@ -195,8 +315,8 @@ class AccessibilityAnalyzer:
         else:
             return 'unknown'
 
-    def _estimate_stair_count(self, stairs_mask):
-        """계단 개수 추정"""
+    def _estimate_stair_count(self, stairs_mask, stairs_pixels=None):
+        """계단 개수 추정 (stairs_pixels: 미리 센 계단 픽셀 수)"""
         from scipy import ndimage
         
         # 형태학적 연산으로 개별 계단 영역 분리
@@ -204,17 +324,15 @@ class AccessibilityAnalyzer:
         cleaned = ndimage.binary_opening(stairs_mask, kernel)
         
         # 연결된 컴포넌트로 개별 계단 구분
-        labeled, num_features = ndimage.label(cleaned)
+        components = ComponentStatistics(cleaned)
         
-        # 너무 작은 영역 제거 후 계단 수 추정
-        valid_stairs = 0
-        for i in range(1, num_features + 1):
-            component_size = np.sum(labeled == i)
-            if component_size > 10:  # 최소 크기 임계값
-                valid_stairs += 1
+        # 너무 작은 영역 제거 후 계단 수 추정 (최소 크기 임계값 10픽셀)
+        valid_stairs = int(np.count_nonzero(components.sizes > 10))
         
         # 픽셀 비율 기반 추가 추정
-        stairs_ratio = np.sum(stairs_mask) / stairs_mask.size
+        if stairs_pixels is None:
+            stairs_pixels = np.sum(stairs_mask)
+        stairs_ratio = stairs_pixels / stairs_mask.size
         if stairs_ratio > 0.05:  # 큰 계단 영역
             estimated_from_ratio = max(3, int(stairs_ratio * 50))
             return max(valid_stairs, estimated_from_ratio)
@@ -222,203 +340,138 @@ class AccessibilityAnalyzer:
         return max(1, valid_stairs)  # 최소 1개
 
     def _analyze_stair_severity(self, stair_count, stairs_ratio):
-        """계단 심각도 분석"""
-        if stair_count == 0:
-            return 'none'
-        elif stair_count >= 5 or stairs_ratio > 0.1:
-            return 'severe'  # 심각 (5단 이상 또는 큰 면적)
-        elif stair_count >= 3 or stairs_ratio > 0.05:
-            return 'moderate'  # 중간 (3-4단)
-        else:
-            return 'mild'  # 경미 (1-2단)
+        """계단 심각도 분석 (맵별 계단 수/비율 배열)"""
+        stair_count = np.asarray(stair_count)
+        stairs_ratio = np.asarray(stairs_ratio, dtype=float)
+        return np.select(
+            [
+                stair_count == 0,
+                (stair_count >= 5) | (stairs_ratio > 0.1),  # 심각 (5단 이상 또는 큰 면적)
+                (stair_count >= 3) | (stairs_ratio > 0.05)  # 중간 (3-4단)
+            ],
+            ['none', 'severe', 'moderate'],
+            'mild'  # 경미 (1-2단)
+        )
 
-    def _calculate_confidence_scores(self, seg_map):
-        """검출 신뢰도 계산"""
-        confidence_scores = {}
+    def _calculate_confidence_scores(self, stats_list, counts, ratios):
+        """
+        검출 신뢰도 계산 (크기 신뢰도와 종합 등급은 배치 전체에 배열 연산, 형태 신뢰도만 맵별 연결 요소로 계산)
+        
+        Args:
+            stats_list: 맵별 SegMapStatistics
+            counts: (맵 수, 클래스 수) 클래스별 픽셀 수 행렬
+            ratios: (맵 수, 클래스 수) 클래스별 픽셀 비율 행렬
+            
+        Returns:
+            list: 맵별 신뢰도 dict
+        """
+        detections = {}
         
         # 각 클래스별 검출 영역의 크기와 형태를 바탕으로 신뢰도 추정
         for class_name in ['stairs', 'door', 'building', 'sidewalk']:
             if class_name in self.class_map:
-                class_mask = seg_map == self.class_map[class_name]
-                if np.any(class_mask):
-                    # 영역 크기 기반 신뢰도
-                    ratio = np.sum(class_mask) / seg_map.size
-                    size_confidence = min(1.0, ratio * 100)  # 크기가 클수록 높은 신뢰도
-                    
-                    # 형태 기반 신뢰도 (연결성, 모양 등)
-                    shape_confidence = self._calculate_shape_confidence(class_mask, class_name)
-                    
-                    # 종합 신뢰도
-                    confidence_scores[f'{class_name}_detection'] = (size_confidence + shape_confidence) / 2
-                else:
-                    confidence_scores[f'{class_name}_detection'] = 0.0
+                class_id = self.class_map[class_name]
+                present = counts[:, class_id] > 0
+                # 영역 크기 기반 신뢰도
+                size_confidence = np.minimum(1.0, ratios[:, class_id] * 100)  # 크기가 클수록 높은 신뢰도
+                
+                # 형태 기반 신뢰도 (연결성, 모양 등)
+                shape_confidence = np.array([
+                    self._calculate_shape_confidence(stats.components(class_id), class_name, stats.count(class_id))
+                    if present[index] else 0.0
+                    for index, stats in enumerate(stats_list)
+                ], dtype=float)
+                
+                # 종합 신뢰도
+                detections[f'{class_name}_detection'] = np.where(present, (size_confidence + shape_confidence) / 2, 0.0)
+        
+        confidence_scores = [
+            {name: float(values[index]) for name, values in detections.items()}
+            for index in range(len(stats_list))
+        ]
         
         # 전체 신뢰도
-        if confidence_scores:
-            avg_confidence = sum(confidence_scores.values()) / len(confidence_scores)
-            if avg_confidence > 0.8:
-                reliability = 'high'
-            elif avg_confidence > 0.5:
-                reliability = 'medium'
-            else:
-                reliability = 'low'
-            confidence_scores['overall_reliability'] = reliability
+        if detections:
+            avg_confidence = sum(detections.values()) / len(detections)
+            reliability = np.select([avg_confidence > 0.8, avg_confidence > 0.5], ['high', 'medium'], 'low')
+            for map_scores, map_reliability in zip(confidence_scores, reliability):
+                map_scores['overall_reliability'] = str(map_reliability)
         
         return confidence_scores
 
-    def _calculate_shape_confidence(self, mask, class_name):
-        """형태 기반 신뢰도 계산"""
-        from scipy import ndimage
-        
-        # 연결된 컴포넌트 분석
-        labeled, num_features = ndimage.label(mask)
+    def _calculate_shape_confidence(self, components, class_name, mask_pixels=None):
+        """
+        형태 기반 신뢰도 계산
         
-        if num_features == 0:
+        Args:
+            components: 클래스 마스크의 ComponentStatistics
+            class_name: 클래스 이름
+            mask_pixels: 클래스 전체 픽셀 수 (None이면 요소 크기 합)
+        """
+        if components.count == 0:
             return 0.0
         
         # 가장 큰 영역의 형태 분석
-        largest_component = 0
-        largest_size = 0
-        for i in range(1, num_features + 1):
-            component_size = np.sum(labeled == i)
-            if component_size > largest_size:
-                largest_size = component_size
-                largest_component = i
-        
-        if largest_component == 0:
-            return 0.0
-        
-        component_mask = (labeled == largest_component)
+        largest = components.largest()
+        largest_size = components.sizes[largest]
+        largest_bbox = components.bboxes[largest]
         
         # 클래스별 형태 특성 확인
         if class_name == 'stairs':
             # 계단은 일반적으로 가로로 긴 형태
-            return self._check_rectangular_shape(component_mask)
+            return self._check_rectangular_shape(largest_bbox, largest_size)
         elif class_name == 'door':
             # 문은 세로로 긴 직사각형
-            return self._check_vertical_rectangle(component_mask)
+            return self._check_vertical_rectangle(largest_bbox, largest_size)
         else:
             # 기본적인 연결성 확인
-            return min(1.0, largest_size / np.sum(mask))
+            if mask_pixels is None:
+                mask_pixels = components.sizes.sum()
+            return min(1.0, largest_size / mask_pixels)
 
-    def _check_rectangular_shape(self, mask):
-        """직사각형 형태 확인"""
+    def _check_rectangular_shape(self, bbox, area):
+        """직사각형 형태 확인 (bbox: 요소의 (x, y, 너비, 높이), area: 요소 픽셀 수)"""
         # 바운딩 박스와 실제 영역의 비율로 직사각형성 측정
-        rows, cols = np.where(mask)
-        if len(rows) == 0:
+        if area == 0:
             return 0.0
         
-        height = np.max(rows) - np.min(rows) + 1
-        width = np.max(cols) - np.min(cols) + 1
+        _, _, width, height = bbox
         bbox_area = height * width
-        actual_area = np.sum(mask)
         
-        return min(1.0, actual_area / bbox_area)
+        return min(1.0, area / bbox_area)
 
-    def _check_vertical_rectangle(self, mask):
-        """세로 직사각형 확인"""
-        rows, cols = np.where(mask)
-        if len(rows) == 0:
+    def _check_vertical_rectangle(self, bbox, area):
+        """세로 직사각형 확인 (bbox: 요소의 (x, y, 너비, 높이), area: 요소 픽셀 수)"""
+        if area == 0:
             return 0.0
         
-        height = np.max(rows) - np.min(rows) + 1
-        width = np.max(cols) - np.min(cols) + 1
+        _, _, width, height = bbox
         
         # 높이가 너비보다 크면 세로 직사각형
         aspect_ratio = height / width if width > 0 else 0
         vertical_score = min(1.0, aspect_ratio / 2.0)  # 2:1 비율을 이상으로 설정
         
         # 직사각형성도 함께 고려
-        rectangularity = self._check_rectangular_shape(mask)
+        rectangularity = self._check_rectangular_shape(bbox, area)
         
         return (vertical_score + rectangularity) / 2
     
-    def _calculate_object_distance(self, mask1, mask2):
-        """
-        두 객체 마스크 간의 최소 거리 계산
-        """
-        # 두 마스크의 픽셀 좌표 얻기
-        y1, x1 = np.where(mask1)
-        y2, x2 = np.where(mask2)
-        
-        if len(y1) == 0 or len(y2) == 0:
-            return float('inf')
-        
-        # 계산량을 줄이기 위해 각 마스크에서 최대 100개 픽셀만 샘플링
-        max_samples = min(100, len(y1), len(y2))
-        indices1 = np.random.choice(len(y1), max_samples) if len(y1) > max_samples else np.arange(len(y1))
-        indices2 = np.random.choice(len(y2), max_samples) if len(y2) > max_samples else np.arange(len(y2))
-        
-        y1_sample, x1_sample = y1[indices1], x1[indices1]
-        y2_sample, x2_sample = y2[indices2], x2[indices2]
-        
-        # 최소 거리 계산
-        min_dist = float('inf')
-        for i in range(len(y1_sample)):
-            for j in range(len(y2_sample)):
-                dist = np.sqrt((y1_sample[i] - y2_sample[j])**2 + (x1_sample[i] - x2_sample[j])**2)
-                min_dist = min(min_dist, dist)
-        
-        return min_dist
-    
     def _estimate_size(self, ratio):
         """
         픽셀 비율에 따른 상대적 크기 추정
         """
-        if ratio < 0.01:
-            return "very small"
-        elif ratio < 0.05:
-            return "small"
-        elif ratio < 0.15:
-            return "medium"
-        elif ratio < 0.3:
-            return "large"
-        else:
-            return "very large"
+        ratio = np.asarray(ratio, dtype=float)
+        return np.select(
+            [ratio < 0.01, ratio < 0.05, ratio < 0.15, ratio < 0.3],
+            ["very small", "small", "medium", "large"],
+            "very large"
+        )
     
     def _estimate_door_width(self, ratio):
         """
         문의 상대적 너비 추정 및 휠체어 통과 가능성 판단
         """
-        if ratio < 0.01:
-            return "narrow"
-        elif ratio < 0.03:
-            return "standard"
-        else:
-            return "wide"
-    
-    def _calculate_accessibility_score(self, accessibility_info):
-        """
-        종합적인 접근성 점수 계산 (0-10)
-        """
-        score = 10  # 기본 점수
-        
-        # 계단 관련
-        if 'stairs_at_entrance' in accessibility_info['obstacles']:
-            # 입구 바로 앞에 계단이 있으면 큰 감점
-            score -= 5
-            
-            # 난간이 있으면 약간 점수 보상
-            if accessibility_info.get('has_stairs_railing', False):
-                score += 1
-        elif accessibility_info['has_stairs']:
-            # 계단이 있지만 입구에서 떨어져 있으면 작은 감점
-            score -= 2
-        
-        # 인도 연결성
-        if 'disconnected_sidewalk' in accessibility_info['obstacles']:
-            score -= 2
-        
-        # 문 너비
-        if accessibility_info.get('has_door', False):
-            door_width = accessibility_info['obstacle_details']['door']['estimated_width']
-            if door_width == "narrow":
-                score -= 3
-            elif door_width == "wide":
-                score += 1
-        
-        # 최종 점수 범위 조정
-        return max(1, min(10, score))
+        return door_width_category(ratio)
     
     def get_accessibility_explanation(self, accessibility_info):
         """
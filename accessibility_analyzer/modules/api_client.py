@@ -1,6 +1,7 @@
 """
 외부 API와 통신하는 모듈 (FastAPI 통합 업데이트)
 """
+import os
 import requests
 import json
 import time
@@ -69,7 +70,7 @@ class APIClient:
             data["image_path"] = image_path
             
         if overlay_path:
-            data["overlay_path"] = overlay_path
+            data["overlay_path"] = os.fspath(overlay_path)  # LazyOverlay는 이 시점에 렌더링
         
         # API 요청 헤더
         headers = {
@@ -0,0 +1,231 @@
+"""
+로컬 분석 데몬 - 모델과 분석기를 메모리에 유지한 채 Unix 소켓으로 요청 처리
+
+main.py --image/--dir 호출마다 반복되던 인터프리터/torch/SegFormer 초기화 비용을 없애기 위해,
+데몬이 실행 중이면 클라이언트는 요청만 전달하고 결과를 받는다.
+요청/응답은 한 줄짜리 JSON이며, 모델이 스레드 안전하지 않으므로 요청은 도착 순서대로 하나씩 처리한다.
+"""
+import os
+import json
+import time
+import signal
+import socket
+import threading
+import socketserver
+from collections import deque
+from datetime import datetime
+
+from config import DAEMON_SOCKET_PATH, DAEMON_CONNECT_TIMEOUT
+from modules.utils import logger
+
+LATENCY_HISTORY = 1000  # 명령별로 보관할 최근 처리 시간 수
+
+
+def summarize_latencies(latencies_ms):
+    """
+    처리 시간 목록 요약
+
+    Args:
+        latencies_ms: 처리 시간 목록 (ms)
+
+    Returns:
+        dict: 요청 수, 평균/중앙값/p95/최대 (ms)
+    """
+    if not latencies_ms:
+        return {"count": 0}
+    ordered = sorted(latencies_ms)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 1),
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        "max_ms": round(ordered[-1], 1)
+    }
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            response = self.server.daemon.dispatch(request.get("command"), request.get("params") or {})
+        except Exception as e:
+            logger.error(f"데몬 요청 처리 실패: {str(e)}")
+            response = {"status": "error", "error": f"{type(e).__name__}: {str(e)}"}
+        self.wfile.write(json.dumps(response, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+
+
+class AnalysisDaemon:
+    def __init__(self, handlers, socket_path=DAEMON_SOCKET_PATH, warmup=None):
+        """
+        분석 데몬 초기화
+
+        Args:
+            handlers: 명령 이름 -> 처리 함수(params dict를 키워드 인자로 받음)
+            socket_path: Unix 소켓 경로
+            warmup: 소켓을 열기 전에 호출할 모델/분석기 미리 로드 함수
+        """
+        self.handlers = handlers
+        self.socket_path = str(socket_path)
+        self.warmup = warmup
+        self.started_at = None
+        self.latencies = {}
+        self._server = None
+
+    def dispatch(self, command, params):
+        """
+        명령 하나 처리
+
+        Args:
+            command: 명령 이름 ("status", "shutdown" 또는 handlers에 등록된 이름)
+            params: 명령 인자
+
+        Returns:
+            dict: 응답 (status, result, server_ms)
+        """
+        if command == "status":
+            return {"status": "ok", "result": self.get_status()}
+        if command == "shutdown":
+            # serve_forever를 실행 중인 스레드에서 shutdown()을 호출하면 교착되므로 별도 스레드에서 종료
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+            return {"status": "ok", "result": "stopping"}
+        if command not in self.handlers:
+            return {"status": "error", "error": f"Unknown command: {command}"}
+
+        # 클라이언트의 작업 디렉토리 기준으로 상대 경로(매핑 CSV 등)를 해석 (요청은 하나씩 처리되므로 안전)
+        cwd = params.pop("cwd", None)
+        previous_cwd = os.getcwd()
+        start_time = time.perf_counter()
+        try:
+            if cwd:
+                os.chdir(cwd)
+            result = self.handlers[command](**params)
+        finally:
+            os.chdir(previous_cwd)
+            server_ms = (time.perf_counter() - start_time) * 1000
+            self.latencies.setdefault(command, deque(maxlen=LATENCY_HISTORY)).append(server_ms)
+
+        logger.info(f"데몬 요청 처리: {command} - {server_ms:.1f}ms")
+        return {"status": "ok", "result": result, "server_ms": round(server_ms, 1)}
+
+    def get_status(self):
+        """
+        데몬 상태 및 명령별 처리 시간 통계 반환
+
+        Returns:
+            dict: pid, 가동 시간, 명령별 처리 시간 요약, 모델 지표
+        """
+        from modules.model_registry import get_model_metrics
+
+        return {
+            "pid": os.getpid(),
+            "socket_path": self.socket_path,
+            "started_at": self.started_at,
+            "latency": {command: summarize_latencies(list(values)) for command, values in self.latencies.items()},
+            "model_metrics": get_model_metrics()
+        }
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        if DaemonClient(self.socket_path).is_running():
+            raise RuntimeError(f"분석 데몬이 이미 실행 중입니다: {self.socket_path}")
+        # 이전 데몬이 비정상 종료하며 남긴 소켓 파일
+        os.remove(self.socket_path)
+
+    def serve_forever(self):
+        """
+        모델을 미리 로드한 뒤 종료 요청(shutdown 명령, SIGTERM, Ctrl+C)까지 요청 처리
+        """
+        self._remove_stale_socket()
+        if self.warmup is not None:
+            warmup_start = time.perf_counter()
+            self.warmup()
+            logger.info(f"데몬 워밍업 완료: {time.perf_counter() - warmup_start:.2f}초")
+
+        os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+        self._server = socketserver.UnixStreamServer(self.socket_path, _RequestHandler)
+        self._server.daemon = self
+        os.chmod(self.socket_path, 0o600)
+        self.started_at = datetime.now().isoformat()
+
+        # SIGTERM도 Ctrl+C와 같이 소켓 파일을 정리하고 종료
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+        logger.info(f"분석 데몬 시작 (pid={os.getpid()}): {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            logger.info("분석 데몬 종료")
+
+
+class DaemonClient:
+    def __init__(self, socket_path=DAEMON_SOCKET_PATH, connect_timeout=DAEMON_CONNECT_TIMEOUT):
+        """
+        분석 데몬 클라이언트 초기화
+
+        Args:
+            socket_path: Unix 소켓 경로
+            connect_timeout: 연결 대기 시간 (초)
+        """
+        self.socket_path = str(socket_path)
+        self.connect_timeout = connect_timeout
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.connect_timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        # 연결 후에는 처리 시간이 긴 요청(--dir)도 끝까지 대기
+        sock.settimeout(None)
+        return sock
+
+    def is_running(self):
+        """
+        데몬 실행 여부 확인 (소켓 연결 가능 여부)
+
+        Returns:
+            bool: 연결 가능하면 True
+        """
+        if not os.path.exists(self.socket_path):
+            return False
+        try:
+            self._connect().close()
+            return True
+        except OSError:
+            return False
+
+    def request(self, command, **params):
+        """
+        데몬에 명령을 보내고 응답 대기
+
+        Args:
+            command: 명령 이름
+            **params: 명령 인자 (JSON 직렬화 가능해야 함)
+
+        Returns:
+            dict: 응답 (status, result, server_ms)과 왕복 시간(roundtrip_ms)
+        """
+        start_time = time.perf_counter()
+        with self._connect() as sock:
+            sock.sendall(json.dumps({"command": command, "params": params}, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        if not line:
+            raise ConnectionError("분석 데몬이 응답 없이 연결을 종료했습니다")
+        response = json.loads(line)
+        response["roundtrip_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+        return response
@@ -4,14 +4,95 @@
 import cv2
 import numpy as np
 import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 
+from config import (
+    CLASS_MAP, ANALYSIS_WORKING_SIZE, ENHANCED_ANALYSIS_CONCURRENT, ENHANCED_ANALYSIS_THREADS, ENHANCED_SEGMAP_ROI
+)
+from modules.feature_context import ImageFeatureContext
+from modules.segmap_statistics import scale_segments
+from modules.scoring import (
+    enhanced_external_score, enhanced_score_breakdown,
+    STAIR_AREA_RATIO_HIGH, STAIR_AREA_RATIO_MEDIUM, HANDRAIL_MIN_VERTICAL_LINES,
+    ENTRANCE_WIDE_RATIO, ENTRANCE_NARROW_RATIO, ENTRANCE_STEP_EDGE_FRACTION,
+    ROUGH_TEXTURE_VARIANCE, SMOOTH_TEXTURE_VARIANCE, TACTILE_TOPHAT_MEAN,
+    OBSTACLES_HIGH, OBSTACLES_MEDIUM, PATH_NARROW_RATIO, PATH_WIDE_RATIO, STEEP_SLOPE, SLIGHT_SLOPE
+)
+
+
+# 하위 분석별 분석 영역(ROI): 기준 클래스, 기준 영역 여백(바운딩 박스 크기 대비), 기준 클래스가 없을 때의 이미지 비율 (y0, y1, x0, x1)
+ANALYSIS_REGIONS = {
+    "entrance": (("door",), 0.5, (0.4, 1.0, 0.2, 0.8)),  # 문 주변과 문 아래 턱/계단
+    "obstacles": (("sidewalk", "stairs"), 0.25, (0.4, 1.0, 0.1, 0.9)),  # 입구까지의 보행면과 그 위에 선 장애물
+    "path": (("sidewalk", "stairs"), 0.1, (0.3, 1.0, 0.0, 1.0))  # 보행 경로
+}
+ANALYSIS_REGION_MIN_SIZE = 16  # 이보다 작은 기준 영역은 필터 결과를 믿기 어려우므로 이미지 비율 영역 사용 (픽셀)
+
+
+def get_fallback_region(name: str, shape: Tuple) -> Tuple:
+    """
+    하위 분석의 고정 이미지 비율 영역 (기준 클래스가 없을 때의 분석 영역이자, 폭/면적 비율의 기준 크기)
+    
+    Args:
+        name: ANALYSIS_REGIONS의 영역 이름
+        shape: 이미지 (높이, 너비)
+        
+    Returns:
+        Tuple: (행 slice, 열 slice)
+    """
+    height, width = shape[:2]
+    y0, y1, x0, x1 = ANALYSIS_REGIONS[name][2]
+    return slice(int(height*y0), int(height*y1)), slice(int(width*x0), int(width*x1))
+
+
+def _slice_shape(region: Tuple) -> Tuple:
+    rows, cols = region
+    return rows.stop - rows.start, cols.stop - cols.start
+
+# 프로세스 전역 하위 분석 스레드 풀 (스레드 수별로 하나씩, 분석기 인스턴스와 요청이 공유)
+_executors = {}
+_executor_lock = threading.Lock()
+
+
+def get_sub_analysis_executor(threads: int) -> ThreadPoolExecutor:
+    """
+    하위 분석 공유 스레드 풀 반환 (스레드 수별로 처음 요청할 때 생성)
+    
+    Args:
+        threads: 스레드 수 (스레드 수가 다른 분석기는 각자 크기에 맞는 풀을 공유)
+        
+    Returns:
+        ThreadPoolExecutor: 공유 스레드 풀
+    """
+    with _executor_lock:
+        executor = _executors.get(threads)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f"enhanced-analysis-{threads}")
+            _executors[threads] = executor
+        return executor
+
 
 class EnhancedExternalAnalyzer:
     """강화된 외부 접근성 분석기"""
     
-    def __init__(self):
+    def __init__(self, working_size: int = ANALYSIS_WORKING_SIZE, concurrent: bool = ENHANCED_ANALYSIS_CONCURRENT,
+                 threads: int = ENHANCED_ANALYSIS_THREADS):
+        """
+        Args:
+            working_size: 작업 해상도 긴 변 (0이면 입력 해상도 그대로 분석)
+                작업 해상도 모드에서는 허프 변환 길이, 컨투어 면적 등 픽셀 단위 임계값이
+                작업 해상도 기준 값, 즉 이미지 크기 대비 고정 비율이 된다.
+            concurrent: 하위 분석을 공유 스레드 풀에서 동시에 실행할지 여부
+            threads: 동시 실행 스레드 수 (0이면 OpenCV 스레드 수, 즉 워커당 코어 예산)
+        """
+        self.working_size = working_size
+        self.concurrent = concurrent
+        self.threads = threads
         self.obstacle_weights = {
             'stairs': -3.0,      # 계단 (가장 큰 장애물)
             'curb': -2.0,        # 연석/턱
@@ -39,25 +120,33 @@ class EnhancedExternalAnalyzer:
         }
 
     def analyze_enhanced_external_accessibility(self, image_path: str, seg_map: np.ndarray, 
-                                              stair_segments: List[Dict] = None) -> Dict:
+                                              stair_segments: List[Dict] = None,
+                                              context: Optional[ImageFeatureContext] = None) -> Dict:
         """
         강화된 외부 접근성 분석
         
         Args:
             image_path: 이미지 파일 경로
             seg_map: 세그멘테이션 결과 맵
-            stair_segments: 계단 세그먼트 정보
+            stair_segments: 계단 세그먼트 정보 (원본 이미지 좌표, SegMapStatistics.segments(..., shape=이미지 크기))
+            context: 다른 분석기와 공유하는 ImageFeatureContext (None이면 image_path/seg_map으로 생성)
             
         Returns:
             Dict: 상세한 외부 접근성 분석 결과
         """
         try:
-            # 이미지 로드
-            image = cv2.imread(image_path)
-            if image is None:
+            # 이미지 로드 (컨텍스트가 한 번만 디코딩하고 그레이스케일/엣지 맵도 공유)
+            source_context = context if context is not None else ImageFeatureContext(image_path, seg_map)
+            if source_context.image is None:
                 return {"error": "이미지를 로드할 수 없습니다."}
             
-            height, width = image.shape[:2]
+            # 작업 해상도 모드: 이미지와 세그멘테이션 맵을 같은 크기로 맞춘 뒤 분석
+            context = source_context.at_working_size(self.working_size)
+            working_resolution = None
+            if context is not source_context:
+                # 계단 세그먼트는 원본 이미지 좌표이므로 bbox/면적/중심점을 작업 해상도로 환산
+                stair_segments = scale_segments(stair_segments, source_context.shape, context.shape)
+                working_resolution = list(context.shape)
             
             # 분석 결과 초기화
             analysis_result = {
@@ -68,34 +157,61 @@ class EnhancedExternalAnalyzer:
                 "confidence_level": "medium",
                 "analysis_details": []
             }
+            if working_resolution:
+                analysis_result["analysis_resolution"] = working_resolution
             
-            # 1. 계단 분석 (강화)
-            stair_analysis = self._analyze_stairs_detailed(image, seg_map, stair_segments)
-            analysis_result["stairs_analysis"] = stair_analysis
-            
-            # 2. 출입구 분석
-            entrance_analysis = self._analyze_entrance_accessibility(image, seg_map)
-            analysis_result["entrance_analysis"] = entrance_analysis
+            start_time = time.perf_counter()
             
-            # 3. 표면 및 경로 분석
-            surface_analysis = self._analyze_surface_conditions(image, seg_map)
-            analysis_result["surface_analysis"] = surface_analysis
-            
-            # 4. 장애물 검출
-            obstacle_analysis = self._detect_mobility_obstacles(image, seg_map)
-            analysis_result["obstacle_analysis"] = obstacle_analysis
-            
-            # 5. 접근 경로 분석
-            path_analysis = self._analyze_access_paths(image, seg_map)
-            analysis_result["path_analysis"] = path_analysis
+            # 여러 하위 분석이 쓰는 그레이스케일/엣지 맵과 분석 영역은 먼저 한 번 계산 (스레드 간 중복 계산 방지)
+            context.gray
+            context.edges(50, 150)
+            regions = self._select_analysis_regions(context)
+            analysis_result["analysis_regions"] = {
+                name: {"bbox": region["bbox"], "source": region["source"]} for name, region in regions.items()
+            }
+            shared_seconds = time.perf_counter() - start_time
+            
+            # 하위 분석 (서로 독립적이므로 동시 실행 모드에서는 스레드 풀에서 함께 실행)
+            sub_analyses = [
+                # 1. 계단 분석 (강화)
+                ("stairs_analysis", partial(self._analyze_stairs_detailed, context, stair_segments=stair_segments)),
+                # 2. 출입구 분석
+                ("entrance_analysis", partial(self._analyze_entrance_accessibility, context,
+                                              region=regions["entrance"]["slice"],
+                                              door_width=regions["entrance"]["reference_width"])),
+                # 3. 표면 및 경로 분석
+                ("surface_analysis", partial(self._analyze_surface_conditions, context)),
+                # 4. 장애물 검출
+                ("obstacle_analysis", partial(self._detect_mobility_obstacles, context,
+                                              region=regions["obstacles"]["slice"])),
+                # 5. 접근 경로 분석
+                ("path_analysis", partial(self._analyze_access_paths, context, region=regions["path"]["slice"],
+                                          path_width=regions["path"]["reference_width"]))
+            ]
+            
+            # 각 분석이 측정한 수치 특징 (점수 계산 및 재채점용으로 결과에 저장, 분석 순서대로 병합)
+            threads = self._get_thread_count(len(sub_analyses))
+            features = {}
+            sub_analysis_ms = {}
+            for (result_key, _), (sub_result, sub_features, seconds) in zip(
+                    sub_analyses, self._run_sub_analyses([analysis for _, analysis in sub_analyses], threads)):
+                analysis_result[result_key] = sub_result
+                features.update(sub_features)
+                sub_analysis_ms[result_key] = round(seconds * 1000, 1)
+            
+            analysis_result["timing"] = {
+                "mode": "concurrent" if threads else "sequential",
+                "threads": threads,
+                "shared_features_ms": round(shared_seconds * 1000, 1),
+                "sub_analysis_ms": sub_analysis_ms,
+                "wall_ms": round((time.perf_counter() - start_time) * 1000, 1)
+            }
             
             # 6. 종합 점수 계산
-            final_score = self._calculate_enhanced_external_score(
-                stair_analysis, entrance_analysis, surface_analysis, 
-                obstacle_analysis, path_analysis
-            )
+            final_score = self._calculate_enhanced_external_score(features)
             
             analysis_result.update(final_score)
+            analysis_result["features"] = features
             analysis_result["analysis_timestamp"] = datetime.now().isoformat()
             
             return analysis_result
@@ -103,7 +219,126 @@ class EnhancedExternalAnalyzer:
         except Exception as e:
             return {"error": f"외부 접근성 분석 중 오류: {str(e)}"}
 
-    def _analyze_stairs_detailed(self, image: np.ndarray, seg_map: np.ndarray, 
+    def _select_analysis_regions(self, context: ImageFeatureContext) -> Dict:
+        """
+        하위 분석별 분석 영역(ROI) 선택
+        
+        기준 클래스(문/인도/계단)마다 가장 큰 연결 요소의 바운딩 박스를 합쳐 여백만큼 넓힌 영역을 사용하고,
+        기준 클래스가 맵에 없으면(또는 영역이 너무 작으면) 고정 이미지 비율 영역을 사용한다.
+        연결 요소 통계는 컨텍스트에 캐시되므로 접근성 분석기가 이미 계산한 값을 재사용한다.
+        
+        Args:
+            context: 분석할 ImageFeatureContext
+            
+        Returns:
+            Dict: 영역 이름 -> {"slice": (행 slice, 열 slice), "bbox": [x, y, 너비, 높이],
+                "source": 기준 클래스 목록 또는 "fallback", "reference_width": 여백 없는 기준 영역 폭 (고정 영역이면 None)}
+        """
+        regions = {}
+        for name, (class_names, margin, _) in ANALYSIS_REGIONS.items():
+            bounds, source, reference_width = None, "fallback", None
+            if ENHANCED_SEGMAP_ROI and context.seg_map is not None:
+                bounds, source, reference_width = self._get_class_region(context, class_names, margin)
+            if bounds is None:
+                rows, cols = get_fallback_region(name, context.shape)
+                bounds, source = (cols.start, rows.start, cols.stop, rows.stop), "fallback"
+            left, top, right, bottom = bounds
+            regions[name] = {
+                "slice": (slice(top, bottom), slice(left, right)),
+                "bbox": [left, top, right - left, bottom - top],
+                "source": source,
+                "reference_width": reference_width
+            }
+        return regions
+
+    def _get_class_region(self, context: ImageFeatureContext, class_names: Tuple, margin: float) -> Tuple:
+        """
+        기준 클래스들의 가장 큰 연결 요소 바운딩 박스를 합친 이미지 좌표 영역
+        
+        Args:
+            context: 분석할 ImageFeatureContext
+            class_names: 기준 클래스 이름 목록
+            margin: 영역 크기 대비 여백 비율 (각 방향)
+            
+        Returns:
+            Tuple: ((left, top, right, bottom), 맵에 있는 기준 클래스 목록, 여백 없는 기준 영역 폭(이미지 픽셀))
+                (기준 영역이 없거나 너무 작으면 (None, None, None))
+        """
+        stats = context.stats
+        boxes = []
+        found = []
+        for class_name in class_names:
+            class_id = CLASS_MAP[class_name]
+            if not stats.present(class_id):
+                continue
+            components = stats.components(class_id)
+            x, y, w, h = components.bboxes[components.largest()]
+            boxes.append((x, y, x + w, y + h))
+            found.append(class_name)
+        if not boxes:
+            return None, None, None
+        
+        left = min(box[0] for box in boxes)
+        top = min(box[1] for box in boxes)
+        right = max(box[2] for box in boxes)
+        bottom = max(box[3] for box in boxes)
+        margin_x = (right - left) * margin
+        margin_y = (bottom - top) * margin
+        
+        # 맵 좌표 -> 이미지 좌표 (맵이 이미지보다 작은 저해상도 세그멘테이션도 지원)
+        height, width = context.shape
+        scale_y = height / stats.shape[0]
+        scale_x = width / stats.shape[1]
+        reference_width = float((right - left) * scale_x)
+        left = max(0, int((left - margin_x) * scale_x))
+        top = max(0, int((top - margin_y) * scale_y))
+        right = min(width, int(np.ceil((right + margin_x) * scale_x)))
+        bottom = min(height, int(np.ceil((bottom + margin_y) * scale_y)))
+        if right - left < ANALYSIS_REGION_MIN_SIZE or bottom - top < ANALYSIS_REGION_MIN_SIZE:
+            return None, None, None
+        return (left, top, right, bottom), found, reference_width
+
+    def _get_thread_count(self, sub_analysis_count: int) -> int:
+        """
+        하위 분석 동시 실행 스레드 수 (코어가 하나뿐이면 스레드 전환 비용만 생기므로 0 - 순차 실행)
+        
+        Args:
+            sub_analysis_count: 하위 분석 수
+            
+        Returns:
+            int: 스레드 수 (0이면 순차 실행)
+        """
+        if not self.concurrent:
+            return 0
+        threads = min(self.threads or cv2.getNumThreads(), sub_analysis_count)
+        return threads if threads > 1 else 0
+
+    def _run_sub_analyses(self, analyses: List, threads: int) -> List[Tuple[Dict, Dict, float]]:
+        """
+        하위 분석 실행 (threads가 1 이상이면 공유 스레드 풀에서 동시에 실행)
+        
+        OpenCV/NumPy 연산은 GIL을 놓으므로 이미지 한 장의 지연 시간이 가장 느린 하위 분석 수준으로 줄어든다.
+        
+        Args:
+            analyses: 특징 dict 하나를 받아 결과를 반환하는 하위 분석 함수 목록
+            threads: 스레드 수 (0이면 순차 실행)
+            
+        Returns:
+            List: 하위 분석별 (결과, 측정한 특징, 실행 시간(초)) (analyses 순서)
+        """
+        def run(analysis):
+            features = {}
+            start_time = time.perf_counter()
+            result = analysis(features)
+            return result, features, time.perf_counter() - start_time
+        
+        if not threads:
+            return [run(analysis) for analysis in analyses]
+        executor = get_sub_analysis_executor(threads)
+        futures = [executor.submit(run, analysis) for analysis in analyses]
+        return [future.result() for future in futures]
+
+    def _analyze_stairs_detailed(self, context: ImageFeatureContext, features: Dict,
                                stair_segments: List[Dict] = None) -> Dict:
         """상세한 계단 분석"""
         result = {
@@ -117,19 +352,21 @@ class EnhancedExternalAnalyzer:
         
         try:
             # 계단 검출 (기존 세그멘테이션 + 개선된 분석)
+            features["stair_segment_count"] = len(stair_segments) if stair_segments else 0
             if stair_segments and len(stair_segments) > 0:
                 result["has_stairs"] = True
                 result["stair_count"] = len(stair_segments)
                 
                 # 계단 높이 추정 (세그먼트 크기 기반)
                 total_area = sum(seg.get('area', 0) for seg in stair_segments)
-                image_area = image.shape[0] * image.shape[1]
+                image_area = context.shape[0] * context.shape[1]
                 stair_ratio = total_area / image_area
+                features["stair_area_ratio"] = float(stair_ratio)
                 
-                if stair_ratio > 0.1:
+                if stair_ratio > STAIR_AREA_RATIO_HIGH:
                     result["stair_height_estimate"] = "높음"
                     result["accessibility_impact"] = "매우 높음"
-                elif stair_ratio > 0.05:
+                elif stair_ratio > STAIR_AREA_RATIO_MEDIUM:
                     result["stair_height_estimate"] = "보통"
                     result["accessibility_impact"] = "높음"
                 else:
@@ -137,21 +374,21 @@ class EnhancedExternalAnalyzer:
                     result["accessibility_impact"] = "보통"
             
             # 난간 검출 (수직선 분석)
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray, 50, 150)
-            lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=50, 
+            lines = cv2.HoughLinesP(context.edges(50, 150), 1, np.pi/180, threshold=50, 
                                   minLineLength=30, maxLineGap=10)
             
+            vertical_lines = []
             if lines is not None:
-                vertical_lines = []
-                for line in lines:
-                    x1, y1, x2, y2 = line[0]
+                # OpenCV 버전에 따라 (N, 1, 4) 또는 (N, 4) 배열
+                for line in lines.reshape(-1, 4):
+                    x1, y1, x2, y2 = line
                     angle = np.abs(np.arctan2(y2-y1, x2-x1) * 180 / np.pi)
                     if 70 <= angle <= 110:  # 수직에 가까운 선
                         vertical_lines.append(line)
-                
-                if len(vertical_lines) >= 2:
-                    result["handrail_detected"] = True
+            features["vertical_line_count"] = len(vertical_lines)
+            
+            if len(vertical_lines) >= HANDRAIL_MIN_VERTICAL_LINES:
+                result["handrail_detected"] = True
             
             return result
             
@@ -159,8 +396,14 @@ class EnhancedExternalAnalyzer:
             result["error"] = f"계단 분석 오류: {str(e)}"
             return result
 
-    def _analyze_entrance_accessibility(self, image: np.ndarray, seg_map: np.ndarray) -> Dict:
-        """출입구 접근성 분석"""
+    def _analyze_entrance_accessibility(self, context: ImageFeatureContext, features: Dict,
+                                        region: Tuple = None, door_width: float = None) -> Dict:
+        """
+        출입구 접근성 분석 (region: 분석 영역 (행 slice, 열 slice), None이면 이미지 중앙 하단)
+        
+        문 폭은 분석 영역과 무관하게 고정 출입구 영역 폭 대비 비율로 판정한다
+        (door_width: 세그멘테이션 맵의 문 영역 폭(이미지 픽셀), None이면 분석 영역의 수직 엣지로 추정).
+        """
         result = {
             "entrance_width": "보통",
             "door_type": "일반문",
@@ -170,41 +413,43 @@ class EnhancedExternalAnalyzer:
         }
         
         try:
-            height, width = image.shape[:2]
-            
-            # 출입구 영역 추정 (이미지 중앙 하단)
-            entrance_region = seg_map[int(height*0.4):height, int(width*0.2):int(width*0.8)]
-            
-            # 문 영역 검출 (색상 및 형태 기반)
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            entrance_gray = gray[int(height*0.4):height, int(width*0.2):int(width*0.8)]
-            
-            # 수직 엣지 검출로 문틀 찾기
-            sobel_x = cv2.Sobel(entrance_gray, cv2.CV_64F, 1, 0, ksize=3)
-            vertical_edges = np.abs(sobel_x)
-            
-            # 문 폭 추정
-            edge_columns = np.sum(vertical_edges, axis=0)
-            prominent_edges = edge_columns > np.percentile(edge_columns, 90)
-            
-            if np.sum(prominent_edges) > 0:
+            # 출입구 영역 (문 주변, 기본값: 이미지 중앙 하단)
+            reference_region = get_fallback_region("entrance", context.shape)
+            if region is None:
+                region = reference_region
+            entrance_gray = context.gray[region]
+            
+            if door_width is None:
+                # 수직 엣지 검출로 문틀 찾기
+                sobel_x = cv2.Sobel(entrance_gray, cv2.CV_64F, 1, 0, ksize=3)
+                vertical_edges = np.abs(sobel_x)
+                
+                # 문 폭 추정
+                edge_columns = np.sum(vertical_edges, axis=0)
+                prominent_edges = edge_columns > np.percentile(edge_columns, 90)
                 edge_positions = np.where(prominent_edges)[0]
                 if len(edge_positions) >= 2:
                     door_width = edge_positions[-1] - edge_positions[0]
-                    door_width_ratio = door_width / entrance_gray.shape[1]
-                    
-                    if door_width_ratio > 0.6:
-                        result["entrance_width"] = "넓음"
-                    elif door_width_ratio < 0.3:
-                        result["entrance_width"] = "좁음"
-                        result["door_type"] = "좁은문"
+            
+            if door_width is not None:
+                # 문 주변으로 좁힌 분석 영역 대비 비율은 문 크기와 관계없이 일정하므로 고정 출입구 영역 폭 기준
+                door_width_ratio = door_width / _slice_shape(reference_region)[1]
+                features["door_width_ratio"] = float(door_width_ratio)
+                
+                if door_width_ratio > ENTRANCE_WIDE_RATIO:
+                    result["entrance_width"] = "넓음"
+                elif door_width_ratio < ENTRANCE_NARROW_RATIO:
+                    result["entrance_width"] = "좁음"
+                    result["door_type"] = "좁은문"
             
             # 턱/계단 검출 (수평 엣지 기반)
             sobel_y = cv2.Sobel(entrance_gray, cv2.CV_64F, 0, 1, ksize=3)
             horizontal_edges = np.abs(sobel_y)
             
             strong_horizontal = horizontal_edges > np.percentile(horizontal_edges, 95)
-            if np.sum(strong_horizontal) > entrance_gray.shape[0] * 0.1:
+            features["strong_horizontal_pixels"] = int(np.sum(strong_horizontal))
+            features["entrance_height"] = int(entrance_gray.shape[0])
+            if np.sum(strong_horizontal) > entrance_gray.shape[0] * ENTRANCE_STEP_EDGE_FRACTION:
                 result["entrance_level"] = False
                 result["threshold_height"] = "높음"
             
@@ -214,7 +459,7 @@ class EnhancedExternalAnalyzer:
             result["error"] = f"출입구 분석 오류: {str(e)}"
             return result
 
-    def _analyze_surface_conditions(self, image: np.ndarray, seg_map: np.ndarray) -> Dict:
+    def _analyze_surface_conditions(self, context: ImageFeatureContext, features: Dict) -> Dict:
         """표면 상태 분석"""
         result = {
             "surface_type": "포장도로",
@@ -226,19 +471,19 @@ class EnhancedExternalAnalyzer:
         
         try:
             # 바닥 영역 추출 (이미지 하단 70%)
-            height, width = image.shape[:2]
-            ground_region = image[int(height*0.3):height, :]
-            ground_gray = cv2.cvtColor(ground_region, cv2.COLOR_BGR2GRAY)
+            height, width = context.shape
+            ground_gray = context.gray[int(height*0.3):height, :]
             
             # 표면 질감 분석 (텍스처)
             # 라플라시안 분산으로 텍스처 복잡도 측정
             laplacian = cv2.Laplacian(ground_gray, cv2.CV_64F)
             texture_variance = np.var(laplacian)
+            features["texture_variance"] = float(texture_variance)
             
-            if texture_variance > 500:
+            if texture_variance > ROUGH_TEXTURE_VARIANCE:
                 result["surface_quality"] = "거칠음"
                 result["surface_smoothness"] = "울퉁불퉁"
-            elif texture_variance < 100:
+            elif texture_variance < SMOOTH_TEXTURE_VARIANCE:
                 result["surface_quality"] = "매우양호"
                 result["surface_smoothness"] = "매우매끄러움"
             
@@ -247,15 +492,16 @@ class EnhancedExternalAnalyzer:
             kernel = np.ones((5,5), np.uint8)
             tophat = cv2.morphologyEx(ground_gray, cv2.MORPH_TOPHAT, kernel)
             
-            if np.mean(tophat) > 10:  # 임계값 조정 가능
+            features["tophat_mean"] = float(np.mean(tophat))
+            if np.mean(tophat) > TACTILE_TOPHAT_MEAN:
                 result["has_tactile_paving"] = True
             
             # 색상 분석으로 표면 타입 추정
-            hsv = cv2.cvtColor(ground_region, cv2.COLOR_BGR2HSV)
+            hsv = context.hsv[int(height*0.3):height, :]
             
             # 회색/검은색 계열 (아스팔트)
             gray_mask = cv2.inRange(hsv, (0,0,0), (180,50,100))
-            gray_ratio = np.sum(gray_mask > 0) / (ground_region.shape[0] * ground_region.shape[1])
+            gray_ratio = np.sum(gray_mask > 0) / (hsv.shape[0] * hsv.shape[1])
             
             if gray_ratio > 0.3:
                 result["surface_type"] = "아스팔트"
@@ -266,8 +512,13 @@ class EnhancedExternalAnalyzer:
             result["error"] = f"표면 분석 오류: {str(e)}"
             return result
 
-    def _detect_mobility_obstacles(self, image: np.ndarray, seg_map: np.ndarray) -> Dict:
-        """이동성 장애물 검출"""
+    def _detect_mobility_obstacles(self, context: ImageFeatureContext, features: Dict,
+                                   region: Tuple = None) -> Dict:
+        """
+        이동성 장애물 검출 (region: 분석 영역 (행 slice, 열 slice), None이면 이미지 중앙 하단)
+        
+        장애물 크기(연석 높이, 심각도 면적 비율)는 분석 영역과 무관하게 고정 장애물 영역 크기 기준으로 판정한다.
+        """
         result = {
             "detected_obstacles": [],
             "obstacle_severity": "낮음",
@@ -276,16 +527,12 @@ class EnhancedExternalAnalyzer:
         }
         
         try:
-            height, width = image.shape[:2]
-            
-            # 객체 검출을 위한 컨투어 찾기
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # 접근 경로 영역 (이미지 중앙 하단)
-            path_region = gray[int(height*0.4):height, int(width*0.1):int(width*0.9)]
-            
-            # 엣지 검출 및 컨투어
-            edges = cv2.Canny(path_region, 50, 150)
+            # 접근 경로 영역 (입구까지의 인도/계단, 기본값: 이미지 중앙 하단)의 엣지로 컨투어 찾기
+            reference_region = get_fallback_region("obstacles", context.shape)
+            reference_shape = _slice_shape(reference_region)
+            if region is None:
+                region = reference_region
+            edges = context.edges(50, 150)[region]
             contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             
             significant_obstacles = []
@@ -298,7 +545,7 @@ class EnhancedExternalAnalyzer:
                     
                     # 장애물 유형 분류
                     obstacle_type = "unknown"
-                    if aspect_ratio > 3 and h < path_region.shape[0] * 0.2:
+                    if aspect_ratio > 3 and h < reference_shape[0] * 0.2:
                         obstacle_type = "curb"  # 연석
                     elif 0.5 < aspect_ratio < 2 and area > 500:
                         obstacle_type = "pole_post"  # 기둥/표지판
@@ -310,17 +557,18 @@ class EnhancedExternalAnalyzer:
                             "type": obstacle_type,
                             "area": area,
                             "position": (x, y, w, h),
-                            "severity": self._assess_obstacle_severity(obstacle_type, area, path_region.shape)
+                            "severity": self._assess_obstacle_severity(obstacle_type, area, reference_shape)
                         })
             
             result["detected_obstacles"] = [obs["type"] for obs in significant_obstacles]
             result["obstacle_details"] = {obs["type"]: obs for obs in significant_obstacles}
             
             # 전체 심각도 평가
-            if len(significant_obstacles) > 3:
+            features["obstacle_count"] = len(significant_obstacles)
+            if len(significant_obstacles) > OBSTACLES_HIGH:
                 result["obstacle_severity"] = "높음"
                 result["clear_path_available"] = False
-            elif len(significant_obstacles) > 1:
+            elif len(significant_obstacles) > OBSTACLES_MEDIUM:
                 result["obstacle_severity"] = "보통"
             
             return result
@@ -329,8 +577,14 @@ class EnhancedExternalAnalyzer:
             result["error"] = f"장애물 검출 오류: {str(e)}"
             return result
 
-    def _analyze_access_paths(self, image: np.ndarray, seg_map: np.ndarray) -> Dict:
-        """접근 경로 분석"""
+    def _analyze_access_paths(self, context: ImageFeatureContext, features: Dict, region: Tuple = None,
+                              path_width: float = None) -> Dict:
+        """
+        접근 경로 분석 (region: 분석 영역 (행 slice, 열 slice), None이면 이미지 하단 70%)
+        
+        경로 폭은 분석 영역과 무관하게 이미지 폭 대비 비율로 판정한다
+        (path_width: 세그멘테이션 맵의 보행면 폭(이미지 픽셀), None이면 분석 영역의 밝기 변화로 추정).
+        """
         result = {
             "path_width": "적절함",
             "path_continuity": True,
@@ -340,41 +594,47 @@ class EnhancedExternalAnalyzer:
         }
         
         try:
-            height, width = image.shape[:2]
-            
-            # 접근 경로 분석을 위한 영역 설정
-            path_region = image[int(height*0.3):height, :]
-            path_gray = cv2.cvtColor(path_region, cv2.COLOR_BGR2GRAY)
-            
-            # 경로 폭 분석 (수직 방향 변화 분석)
-            vertical_profile = np.mean(path_gray, axis=0)
-            path_edges = np.where(np.abs(np.diff(vertical_profile)) > 20)[0]
-            
-            if len(path_edges) >= 2:
-                path_width_pixels = path_edges[-1] - path_edges[0]
-                width_ratio = path_width_pixels / width
+            width = context.shape[1]
+            
+            # 접근 경로 분석을 위한 영역 설정 (보행 경로, 기본값: 이미지 하단 70%)
+            if region is None:
+                region = get_fallback_region("path", context.shape)
+            
+            if path_width is None:
+                # 경로 폭 분석 (수직 방향 변화 분석)
+                vertical_profile = np.mean(context.gray[region], axis=0)
+                path_edges = np.where(np.abs(np.diff(vertical_profile)) > 20)[0]
+                if len(path_edges) >= 2:
+                    path_width = path_edges[-1] - path_edges[0]
+            
+            if path_width is not None:
+                width_ratio = path_width / width
+                features["path_width_ratio"] = float(width_ratio)
                 
-                if width_ratio < 0.3:
+                if width_ratio < PATH_NARROW_RATIO:
                     result["path_width"] = "좁음"
-                elif width_ratio > 0.7:
+                elif width_ratio > PATH_WIDE_RATIO:
                     result["path_width"] = "넓음"
             
             # 경사 분석 (수평선 검출)
-            lines = cv2.HoughLinesP(cv2.Canny(path_gray, 50, 150), 
+            lines = cv2.HoughLinesP(context.edges(50, 150)[region], 
                                   1, np.pi/180, threshold=30, 
                                   minLineLength=50, maxLineGap=20)
             
             if lines is not None:
                 slopes = []
-                for line in lines:
-                    x1, y1, x2, y2 = line[0]
+                # OpenCV 버전에 따라 (N, 1, 4) 또는 (N, 4) 배열
+                for line in lines.reshape(-1, 4):
+                    x1, y1, x2, y2 = line
                     if abs(x2 - x1) > 10:  # 수평선이 아닌 경우
                         slope = abs((y2 - y1) / (x2 - x1))
                         slopes.append(slope)
                 
-                if slopes and np.mean(slopes) > 0.3:
+                if slopes:
+                    features["mean_slope"] = float(np.mean(slopes))
+                if slopes and np.mean(slopes) > STEEP_SLOPE:
                     result["slope_assessment"] = "경사있음"
-                elif slopes and np.mean(slopes) > 0.1:
+                elif slopes and np.mean(slopes) > SLIGHT_SLOPE:
                     result["slope_assessment"] = "약간경사"
             
             return result
@@ -402,97 +662,24 @@ class EnhancedExternalAnalyzer:
         else:
             return "낮음"
 
-    def _calculate_enhanced_external_score(self, stair_analysis: Dict, entrance_analysis: Dict,
-                                         surface_analysis: Dict, obstacle_analysis: Dict,
-                                         path_analysis: Dict) -> Dict:
-        """강화된 외부 접근성 점수 계산"""
-        base_score = 10.0  # 만점에서 시작
-        score_details = {}
-        
-        # 1. 계단 관련 감점
-        if stair_analysis.get("has_stairs", False):
-            stair_impact = stair_analysis.get("accessibility_impact", "없음")
-            if stair_impact == "매우 높음":
-                deduction = 4.0
-            elif stair_impact == "높음":
-                deduction = 3.0
-            elif stair_impact == "보통":
-                deduction = 2.0
-            else:
-                deduction = 1.0
-            
-            base_score -= deduction
-            score_details["stairs"] = f"-{deduction}점 (계단 {stair_analysis.get('stair_count', 0)}개)"
-            
-            # 난간이 있으면 일부 회복
-            if stair_analysis.get("handrail_detected", False):
-                base_score += 0.5
-                score_details["handrail"] = "+0.5점 (난간 존재)"
-        
-        # 2. 출입구 관련 점수
-        entrance_width = entrance_analysis.get("entrance_width", "보통")
-        if entrance_width == "넓음":
-            base_score += 1.0
-            score_details["entrance_width"] = "+1.0점 (넓은 출입구)"
-        elif entrance_width == "좁음":
-            base_score -= 2.0
-            score_details["entrance_width"] = "-2.0점 (좁은 출입구)"
-        
-        if not entrance_analysis.get("entrance_level", True):
-            base_score -= 1.5
-            score_details["entrance_level"] = "-1.5점 (출입구 턱/계단)"
-        
-        # 3. 표면 상태 점수
-        surface_quality = surface_analysis.get("surface_quality", "양호")
-        if surface_quality == "매우양호":
-            base_score += 0.5
-            score_details["surface"] = "+0.5점 (매우 양호한 표면)"
-        elif surface_quality == "거칠음":
-            base_score -= 1.0
-            score_details["surface"] = "-1.0점 (거친 표면)"
-        
-        if surface_analysis.get("has_tactile_paving", False):
-            base_score += 1.0
-            score_details["tactile"] = "+1.0점 (점자블록 존재)"
-        
-        # 4. 장애물 관련 감점
-        obstacle_severity = obstacle_analysis.get("obstacle_severity", "낮음")
-        if obstacle_severity == "높음":
-            base_score -= 2.5
-            score_details["obstacles"] = "-2.5점 (심각한 장애물)"
-        elif obstacle_severity == "보통":
-            base_score -= 1.0
-            score_details["obstacles"] = "-1.0점 (일반 장애물)"
-        
-        # 5. 접근 경로 점수
-        path_width = path_analysis.get("path_width", "적절함")
-        if path_width == "넓음":
-            base_score += 0.5
-            score_details["path_width"] = "+0.5점 (넓은 경로)"
-        elif path_width == "좁음":
-            base_score -= 1.5
-            score_details["path_width"] = "-1.5점 (좁은 경로)"
-        
-        slope = path_analysis.get("slope_assessment", "평평함")
-        if slope == "경사있음":
-            base_score -= 2.0
-            score_details["slope"] = "-2.0점 (급경사)"
-        elif slope == "약간경사":
-            base_score -= 0.5
-            score_details["slope"] = "-0.5점 (약간 경사)"
-        
-        # 최종 점수 범위 제한 (1-10)
-        final_score = max(1.0, min(10.0, base_score))
+    def _calculate_enhanced_external_score(self, features: Dict) -> Dict:
+        """
+        강화된 외부 접근성 점수 계산 (점수 규칙은 재채점과 공유하는 modules.scoring 사용)
         
-        # 신뢰도 계산
-        confidence = "높음"
-        if len(score_details) < 3:
-            confidence = "보통"
+        Args:
+            features: 하위 분석들이 측정한 수치 특징
+            
+        Returns:
+            Dict: 점수, 항목별 설명, 신뢰도, 요약
+        """
+        scored = enhanced_external_score(features)
+        final_score = float(scored["score"])
+        score_details = enhanced_score_breakdown(features, scored)
         
         return {
-            "external_accessibility_score": round(final_score, 1),
+            "external_accessibility_score": final_score,
             "score_breakdown": score_details,
-            "confidence_level": confidence,
+            "confidence_level": str(scored["confidence_level"]),
             "analysis_summary": self._generate_analysis_summary(score_details, final_score)
         }
 
@@ -523,7 +710,9 @@ class EnhancedExternalAnalyzer:
 
 def integrate_enhanced_external_analysis(original_accessibility_info: Dict, 
                                        image_path: str, seg_map: np.ndarray,
-                                       stair_segments: List[Dict] = None) -> Dict:
+                                       stair_segments: List[Dict] = None,
+                                       context: Optional[ImageFeatureContext] = None,
+                                       analyzer: Optional[EnhancedExternalAnalyzer] = None) -> Dict:
     """
     기존 접근성 정보에 강화된 외부 분석 결과 통합
     
@@ -532,14 +721,16 @@ def integrate_enhanced_external_analysis(original_accessibility_info: Dict,
         image_path: 이미지 파일 경로
         seg_map: 세그멘테이션 맵
         stair_segments: 계단 세그먼트 정보
+        context: 다른 분석기와 공유하는 ImageFeatureContext
+        analyzer: 재사용할 EnhancedExternalAnalyzer (None이면 생성)
         
     Returns:
         Dict: 통합된 접근성 분석 결과
     """
     # 강화된 외부 분석 실행
-    analyzer = EnhancedExternalAnalyzer()
+    analyzer = analyzer or EnhancedExternalAnalyzer()
     enhanced_result = analyzer.analyze_enhanced_external_accessibility(
-        image_path, seg_map, stair_segments
+        image_path, seg_map, stair_segments, context=context
     )
     
     # 기존 정보와 통합
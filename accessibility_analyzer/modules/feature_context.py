@@ -0,0 +1,174 @@
+"""
+이미지별 특징 컨텍스트 - 디코딩한 이미지, 그레이스케일, 엣지 맵, 클래스 마스크, 연결 요소 통계를
+처음 요청할 때 한 번만 계산하여 접근성 분석기/강화된 외부 분석기/계단 검증기가 공유
+"""
+import threading
+
+import cv2
+
+from modules.segmap_statistics import SegMapStatistics, get_working_shape, to_working_resolution
+
+
+class ImageFeatureContext:
+    def __init__(self, image_path=None, seg_map=None, image=None):
+        """
+        이미지 특징 컨텍스트 초기화 (이미지는 처음 요청할 때 디코딩)
+
+        Args:
+            image_path: 이미지 파일 경로
+            seg_map: 세그멘테이션 맵 (없으면 마스크/연결 요소 특징을 사용할 수 없음)
+            image: 이미 디코딩한 BGR 이미지 (None이면 image_path에서 cv2.imread)
+        """
+        self.image_path = image_path
+        self.seg_map = seg_map
+        self.counters = {}
+        self._features = {}
+        self._working_contexts = {}
+        self._counter_suffix = ""
+        # 여러 스레드(강화된 외부 하위 분석 등)가 조회해도 집계가 어긋나지 않도록 보호 (계산은 잠금 밖에서 수행)
+        self._lock = threading.Lock()
+        # 특징별 계산 잠금 (같은 특징을 동시에 요청하면 한 스레드만 계산)
+        self._compute_locks = {}
+        self._image_loader = lambda: cv2.imread(self.image_path) if self.image_path else None
+        if image is not None:
+            self._features["image"] = image
+
+    def _get(self, name, compute, key=None):
+        """
+        특징 조회 (없으면 계산 후 저장하고 hits/misses 집계, 특징마다 한 번만 계산)
+
+        Args:
+            name: 특징 이름 (집계 단위)
+            compute: 특징 계산 함수
+            key: 같은 특징의 인자별 저장 키 (None이면 name)
+
+        Returns:
+            특징 값
+        """
+        key = key or name
+        with self._lock:
+            counter = self.counters.setdefault(name + self._counter_suffix, {"hits": 0, "misses": 0})
+            if key in self._features:
+                counter["hits"] += 1
+                return self._features[key]
+            compute_lock = self._compute_locks.setdefault(key, threading.Lock())
+        # 다른 스레드가 계산 중이면 기다렸다가 그 결과를 사용 (적중으로 집계)
+        with compute_lock:
+            with self._lock:
+                if key in self._features:
+                    counter["hits"] += 1
+                    return self._features[key]
+                counter["misses"] += 1
+            value = compute()
+            self._features[key] = value
+        return value
+
+    @property
+    def image(self):
+        """BGR 이미지 (디코딩 실패 시 None)"""
+        return self._get("image", self._image_loader)
+
+    @property
+    def shape(self):
+        """이미지 (높이, 너비) (이미지가 없으면 세그멘테이션 맵 크기)"""
+        # 크기 조회는 특징 사용이 아니므로 이미 디코딩한 이미지는 집계하지 않음
+        image = self._features["image"] if "image" in self._features else self.image
+        return (image if image is not None else self.seg_map).shape[:2]
+
+    @property
+    def gray(self):
+        """그레이스케일 이미지"""
+        return self._get("gray", lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY))
+
+    @property
+    def hsv(self):
+        """HSV 이미지"""
+        return self._get("hsv", lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2HSV))
+
+    def edges(self, low=50, high=150):
+        """
+        이미지 전체의 Canny 엣지 맵 (영역별 엣지는 이 맵을 잘라서 사용)
+
+        Args:
+            low: Canny 하한 임계값
+            high: Canny 상한 임계값
+
+        Returns:
+            numpy.ndarray: uint8 엣지 맵
+        """
+        return self._get("edges", lambda: cv2.Canny(self.gray, low, high), key=("edges", low, high))
+
+    @property
+    def stats(self):
+        """세그멘테이션 맵 클래스 통계 (마스크/연결 요소 조회도 이 컨텍스트의 집계에 포함)"""
+        return self._get("stats", lambda: SegMapStatistics(
+            self.seg_map, counters=self.counters, counter_suffix=self._counter_suffix, lock=self._lock
+        ))
+
+    def mask(self, class_id):
+        """
+        클래스 마스크
+
+        Args:
+            class_id: 클래스 ID
+
+        Returns:
+            numpy.ndarray: bool 마스크
+        """
+        return self.stats.mask(class_id)
+
+    def components(self, class_id):
+        """
+        클래스 마스크의 연결 요소 통계
+
+        Args:
+            class_id: 클래스 ID
+
+        Returns:
+            ComponentStatistics: 연결 요소 크기/바운딩 박스/중심점
+        """
+        return self.stats.components(class_id)
+
+    def at_working_size(self, working_size):
+        """
+        작업 해상도 컨텍스트 (같은 작업 해상도를 쓰는 분석기들이 축소한 이미지/맵과 그 특징을 공유)
+
+        Args:
+            working_size: 작업 해상도 긴 변 (0 또는 None이면 이 컨텍스트 그대로)
+
+        Returns:
+            ImageFeatureContext: 작업 해상도 컨텍스트 (집계는 "특징@크기" 이름으로 이 컨텍스트와 공유)
+        """
+        if not working_size:
+            return self
+        context = self._working_contexts.get(working_size)
+        if context is None:
+            # 맵도 이미지와 같은 작업 해상도로 맞춤 (저해상도 맵은 비율이 이미지와 조금 다를 수 있음)
+            seg_map = (
+                to_working_resolution(self.seg_map, working_size, self.shape) if self.seg_map is not None else None
+            )
+            context = ImageFeatureContext(self.image_path, seg_map)
+            context.counters = self.counters
+            context._lock = self._lock
+            context._counter_suffix = f"@{working_size}"
+            context._image_loader = lambda: self._resize_image(working_size)
+            self._working_contexts[working_size] = context
+        return context
+
+    def _resize_image(self, working_size):
+        image = self.image
+        if image is None:
+            return None
+        height, width = get_working_shape(image.shape, working_size)
+        if image.shape[:2] == (height, width):
+            return image
+        return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+
+    def get_counters(self):
+        """
+        특징별 hits/misses 집계 반환
+
+        Returns:
+            dict: 특징 이름 -> {"hits", "misses"}
+        """
+        return {name: dict(counter) for name, counter in self.counters.items()}
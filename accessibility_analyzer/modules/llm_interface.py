@@ -1,6 +1,7 @@
 """
 LLM API와 통신하는 모듈 - 한국어 응답 버전
 """
+import os
 import requests
 import json
 import base64
@@ -12,7 +13,8 @@ import numpy as np
 from datetime import datetime
 from PIL import Image
 from typing import Dict, List, Tuple, Optional
-from config import LLM_API_KEY, API_MAX_RETRIES
+from config import LLM_API_KEY, LLM_API_URL, LLM_MODEL, API_MAX_RETRIES
+from modules.feature_context import ImageFeatureContext
 
 # 타임아웃 값을 직접 정의
 API_REQUEST_TIMEOUT = 120  # 120초로 설정
@@ -24,7 +26,8 @@ class StairDetectionValidator:
     def validate_stair_segments(image_path: str, stair_segments: List[Dict], 
                               min_area_threshold: int = 500, 
                               aspect_ratio_range: Tuple[float, float] = (0.2, 5.0),
-                              edge_density_threshold: float = 0.1) -> Dict:
+                              edge_density_threshold: float = 0.1,
+                              context: Optional[ImageFeatureContext] = None) -> Dict:
         """
         segmentation 결과에서 실제 계단인지 검증
         
@@ -34,18 +37,19 @@ class StairDetectionValidator:
             min_area_threshold: 최소 영역 크기 (픽셀)
             aspect_ratio_range: 가로세로 비율 범위
             edge_density_threshold: 엣지 밀도 임계값
+            context: 다른 분석기와 공유하는 ImageFeatureContext (None이면 image_path로 생성)
             
         Returns:
             Dict: 검증된 계단 정보
         """
         try:
-            # 이미지 로드
-            image = cv2.imread(image_path)
-            if image is None:
+            # 이미지 로드 (컨텍스트가 디코딩한 이미지와 그레이스케일 공유)
+            context = context if context is not None else ImageFeatureContext(image_path)
+            if context.image is None:
                 return {"valid_stairs": [], "total_segments": len(stair_segments)}
             
-            height, width = image.shape[:2]
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            height, width = context.shape
+            gray = context.gray
             
             valid_stairs = []
             validation_details = []
@@ -212,13 +216,18 @@ class StairDetectionValidator:
 
 
 class LLMAnalyzer:
-    def __init__(self, api_key=LLM_API_KEY):
+    def __init__(self, api_key=LLM_API_KEY, api_url=LLM_API_URL, model=LLM_MODEL):
         """
         LLM 분석기 초기화
+        
+        Args:
+            api_key: LLM API 키
+            api_url: LLM 메시지 API 엔드포인트 (비어 있으면 analyze_image가 요청 없이 오류 반환)
+            model: LLM 모델 이름
         """
         self.api_key = api_key
-        self.api_url = ""
-        self.model = ""  # 원래 모델 유지
+        self.api_url = api_url
+        self.model = model
         self.stair_validator = StairDetectionValidator()
 
     
@@ -491,16 +500,18 @@ class LLMAnalyzer:
         return prompt
 
     
-    def analyze_image(self, image_path, overlay_path, accessibility_info, facility_info=None, stair_segments=None):
+    def analyze_image(self, image_path, overlay_path, accessibility_info, facility_info=None, stair_segments=None,
+                      context=None):
         """
         이미지와 접근성 정보를 LLM으로 분석 (계단 검증 기능 추가)
         
         Args:
             image_path: 원본 이미지 경로
-            overlay_path: 오버레이 이미지 경로
+            overlay_path: 오버레이 이미지 경로 (또는 LazyOverlay 등 os.PathLike)
             accessibility_info: 접근성 분석 정보
             facility_info: 장애인편의시설 정보 (기존 파일에서 전달받음)
             stair_segments: segmentation된 계단 정보 (선택적)
+            context: 다른 분석기와 공유하는 ImageFeatureContext (계단 검증에 사용)
             
         Returns:
             dict: LLM 분석 결과
@@ -510,7 +521,7 @@ class LLMAnalyzer:
         if stair_segments:
             print("계단 세그먼트 검증 중...")
             stair_validation = self.stair_validator.validate_stair_segments(
-                image_path, stair_segments
+                image_path, stair_segments, context=context
             )
             
             # 검증 결과를 accessibility_info에 반영
@@ -522,11 +533,15 @@ class LLMAnalyzer:
                 print(f"검증 결과: {stair_validation.get('final_stair_groups', 0)}개 계단 그룹 검출")
                 print(f"신뢰도: {stair_validation.get('confidence_score', 0):.2f}")
         
+        # API 설정이 없으면 요청이 실패하므로 오버레이 렌더링/인코딩 전에 종료
+        if not self.api_key or not self.api_url:
+            return {"error": "LLM API 설정이 없습니다 (API 키 또는 URL 누락)"}
+        
         prompt = self.create_prompt(accessibility_info, facility_info, stair_validation)
         
         # 이미지 인코딩 (최적화 함수 사용)
         original_image_b64, original_mime = self.optimize_image_for_api(image_path)
-        overlay_image_b64, overlay_mime = self.optimize_image_for_api(overlay_path)
+        overlay_image_b64, overlay_mime = self.optimize_image_for_api(os.fspath(overlay_path))
         
         if not original_image_b64 or not overlay_image_b64:
             return {"error": "이미지 인코딩 실패"}
@@ -640,9 +655,11 @@ class LLMAnalyzer:
             img = Image.open(image_path)
             img.thumbnail(max_size, Image.LANCZOS)
             
-            # 메모리에 이미지 저장
+            # 메모리에 이미지 저장 (JPEG/WebP는 그대로, 그 외는 PNG로 인코딩)
             buffer = io.BytesIO()
-            img_format = 'JPEG' if mime_type == 'image/jpeg' else 'PNG'
+            img_format = {'image/jpeg': 'JPEG', 'image/webp': 'WEBP'}.get(mime_type, 'PNG')
+            if img_format == 'PNG':
+                mime_type = 'image/png'
             img.save(buffer, format=img_format)
             buffer.seek(0)
             
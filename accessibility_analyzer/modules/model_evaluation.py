@@ -0,0 +1,108 @@
+"""
+세그멘테이션 모델 간 정확도 비교 모듈 (양자화 모델 검증용)
+"""
+import time
+
+import numpy as np
+
+from config import CLASS_MAP
+from modules.accessibility_analysis import AccessibilityAnalyzer
+
+# ADE20K 클래스 ID는 uint8 범위에 들어간다
+NUM_LABEL_SLOTS = 256
+
+# 배포 여부 판단에 사용하는 접근성 결정 항목
+DECISION_KEYS = ("has_stairs", "has_door")
+
+
+def compare_segmentation_models(reference_model, candidate_model, image_files, batch_size=None):
+    """
+    기준 모델(fp32)과 후보 모델(int8 등)의 세그멘테이션 결과 비교
+
+    Args:
+        reference_model: 기준 SegmentationModel
+        candidate_model: 비교 대상 SegmentationModel
+        image_files: 평가 이미지 경로 목록
+        batch_size: forward 1회당 이미지 수 (None이면 각 모델 설정값)
+
+    Returns:
+        dict: 클래스별 IoU, 접근성 결정 일치율, 처리 속도 비교 보고서
+    """
+    analyzer = AccessibilityAnalyzer()
+    confusion = np.zeros(NUM_LABEL_SLOTS * NUM_LABEL_SLOTS, dtype=np.int64)
+    decision_matches = {key: 0 for key in DECISION_KEYS}
+    disagreements = []
+    reference_seconds = 0.0
+    candidate_seconds = 0.0
+    batch_size = batch_size or reference_model.batch_size
+
+    for start in range(0, len(image_files), batch_size):
+        batch = image_files[start:start + batch_size]
+
+        start_time = time.perf_counter()
+        reference_results = reference_model.process_batch(batch, batch_size)
+        reference_seconds += time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        candidate_results = candidate_model.process_batch(batch, batch_size)
+        candidate_seconds += time.perf_counter() - start_time
+
+        # 배치의 맵을 한 번에 분석 (클래스 단위 판정은 배치 전체에 배열 연산)
+        reference_maps = [seg_map for _, _, seg_map in reference_results]
+        candidate_maps = [seg_map for _, _, seg_map in candidate_results]
+        reference_infos = analyzer.analyze_many(reference_maps)
+        candidate_infos = analyzer.analyze_many(candidate_maps)
+
+        for image_file, reference_map, candidate_map, reference_info, candidate_info in zip(
+                batch, reference_maps, candidate_maps, reference_infos, candidate_infos):
+            # 기준/후보 클래스 쌍의 빈도를 한 번에 누적 (혼동 행렬)
+            pair_index = reference_map.astype(np.int64) * NUM_LABEL_SLOTS + candidate_map
+            confusion += np.bincount(pair_index.ravel(), minlength=confusion.size)
+
+            mismatched = []
+            for key in DECISION_KEYS:
+                if reference_info.get(key, False) == candidate_info.get(key, False):
+                    decision_matches[key] += 1
+                else:
+                    mismatched.append(key)
+            if mismatched:
+                disagreements.append({"image_path": image_file, "mismatched": mismatched})
+
+    image_count = len(image_files)
+    return {
+        "image_count": image_count,
+        "per_class_iou": _per_class_iou(confusion.reshape(NUM_LABEL_SLOTS, NUM_LABEL_SLOTS)),
+        "decision_agreement": {
+            key: round(matches / image_count, 4) if image_count else None
+            for key, matches in decision_matches.items()
+        },
+        "decision_disagreements": disagreements,
+        "reference_images_per_sec": round(image_count / reference_seconds, 3) if reference_seconds else None,
+        "candidate_images_per_sec": round(image_count / candidate_seconds, 3) if candidate_seconds else None,
+        "speedup": round(reference_seconds / candidate_seconds, 3) if candidate_seconds else None
+    }
+
+
+def _per_class_iou(confusion):
+    """
+    혼동 행렬에서 클래스별 IoU 계산
+
+    Args:
+        confusion: (기준 클래스, 후보 클래스) 픽셀 수 행렬
+
+    Returns:
+        dict: 접근성 클래스별 IoU, 등장한 전체 클래스 평균 IoU
+    """
+    intersection = np.diag(confusion).astype(np.float64)
+    union = confusion.sum(axis=0) + confusion.sum(axis=1) - intersection
+    present = union > 0
+    iou = np.divide(intersection, union, out=np.zeros_like(intersection), where=present)
+
+    return {
+        "classes": {
+            class_name: round(float(iou[class_id]), 4) if present[class_id] else None
+            for class_name, class_id in CLASS_MAP.items()
+        },
+        "mean_iou": round(float(iou[present].mean()), 4) if np.any(present) else None,
+        "evaluated_class_count": int(np.count_nonzero(present))
+    }
@@ -0,0 +1,209 @@
+"""
+세그멘테이션 모델 레지스트리 - 프로세스 단위로 모델을 한 번만 로드하여 공유
+"""
+import os
+import gc
+import time
+import threading
+from datetime import datetime
+
+from config import SEGFORMER_MODEL, SEGFORMER_CASCADE_MODEL, SEGMENTATION_MODE
+from modules.utils import logger
+
+
+def get_rss_bytes():
+    """
+    현재 프로세스의 상주 메모리(RSS) 크기 반환
+
+    Returns:
+        int: RSS 바이트 수 (측정 불가 시 None)
+    """
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss
+    except ImportError:
+        pass
+
+    # psutil이 없으면 Linux procfs에서 직접 읽기
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _to_mb(num_bytes):
+    return round(num_bytes / (1024 * 1024), 1) if num_bytes is not None else None
+
+
+class ModelRegistry:
+    def __init__(self):
+        """
+        모델 레지스트리 초기화
+
+        모델은 (모델 이름, 생성 옵션) 단위로 프로세스 내에서 한 번만 로드된다.
+        """
+        self._models = {}
+        self._metrics = {}
+        self._cascade = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(model_name, options):
+        return (model_name, tuple(sorted(options.items())))
+
+    def get(self, model_name=SEGFORMER_MODEL, **options):
+        """
+        세그멘테이션 모델 반환 (최초 호출 시에만 로드)
+
+        Args:
+            model_name: SegFormer 모델 이름
+            **options: SegmentationModel 생성 옵션
+
+        Returns:
+            SegmentationModel: 공유 모델 인스턴스
+        """
+        key = self._make_key(model_name, options)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._load(key, model_name, options)
+            else:
+                self._metrics[key]["hits"] += 1
+        return model
+
+    def _load(self, key, model_name, options):
+        from modules.segmentation import SegmentationModel
+
+        logger.info(f"세그멘테이션 모델 로드 중: {model_name} {options or ''}")
+        rss_before = get_rss_bytes()
+        start_time = time.perf_counter()
+
+        model = SegmentationModel(model_name, **options)
+
+        load_time = time.perf_counter() - start_time
+        rss_after = get_rss_bytes()
+
+        self._models[key] = model
+        self._metrics[key] = {
+            "model_name": model_name,
+            "options": dict(options),
+            "load_time_seconds": round(load_time, 3),
+            "rss_before_mb": _to_mb(rss_before),
+            "rss_after_mb": _to_mb(rss_after),
+            "rss_delta_mb": _to_mb(rss_after - rss_before)
+            if rss_before is not None and rss_after is not None else None,
+            "loaded_at": datetime.now().isoformat(),
+            "hits": 0
+        }
+        logger.info(
+            f"모델 로드 완료: {model_name} - {load_time:.2f}초, "
+            f"RSS {self._metrics[key]['rss_after_mb']}MB "
+            f"(+{self._metrics[key]['rss_delta_mb']}MB)"
+        )
+        return model
+
+    def get_cascade(self, fast_model_name=SEGFORMER_CASCADE_MODEL, accurate_model_name=SEGFORMER_MODEL):
+        """
+        캐스케이드 모델 반환 (승급 비율 통계를 프로세스 내에서 공유)
+
+        Args:
+            fast_model_name: 1단계 경량 모델 이름
+            accurate_model_name: 2단계 정밀 모델 이름
+
+        Returns:
+            CascadeSegmentationModel: 공유 캐스케이드 모델
+        """
+        from modules.segmentation import CascadeSegmentationModel
+
+        fast_model = self.get(fast_model_name)
+        accurate_model = self.get(accurate_model_name)
+        with self._lock:
+            if (self._cascade is None or self._cascade.fast_model is not fast_model
+                    or self._cascade.accurate_model is not accurate_model):
+                self._cascade = CascadeSegmentationModel(fast_model, accurate_model)
+            return self._cascade
+
+    def is_loaded(self, model_name=SEGFORMER_MODEL, **options):
+        """
+        모델 로드 여부 확인
+
+        Returns:
+            bool: 이미 로드된 경우 True
+        """
+        return self._make_key(model_name, options) in self._models
+
+    def get_metrics(self):
+        """
+        로드된 모델별 로드 시간 및 메모리 지표 반환
+
+        Returns:
+            dict: 모델 지표 목록과 현재 프로세스 RSS
+        """
+        with self._lock:
+            models = [dict(metrics) for metrics in self._metrics.values()]
+        return {
+            "models": models,
+            "process_rss_mb": _to_mb(get_rss_bytes())
+        }
+
+    def unload(self, model_name=None):
+        """
+        모델 언로드 (model_name이 None이면 전체)
+
+        Args:
+            model_name: 언로드할 모델 이름
+
+        Returns:
+            int: 언로드된 모델 수
+        """
+        with self._lock:
+            keys = [key for key in self._models if model_name is None or key[0] == model_name]
+            for key in keys:
+                del self._models[key]
+                del self._metrics[key]
+            if keys:
+                self._cascade = None
+        gc.collect()
+        return len(keys)
+
+
+# 프로세스 전역 레지스트리
+registry = ModelRegistry()
+
+
+def get_segmentation_model(model_name=SEGFORMER_MODEL, **options):
+    """
+    프로세스 전역 레지스트리에서 세그멘테이션 모델 가져오기
+
+    Args:
+        model_name: SegFormer 모델 이름
+        **options: SegmentationModel 생성 옵션
+
+    Returns:
+        SegmentationModel: 공유 모델 인스턴스
+    """
+    return registry.get(model_name, **options)
+
+
+def get_active_segmentation_model():
+    """
+    설정(SEGMENTATION_MODE)에 따른 세그멘테이션 모델 반환
+
+    Returns:
+        SegmentationModel 또는 CascadeSegmentationModel
+    """
+    if SEGMENTATION_MODE == "cascade":
+        return registry.get_cascade()
+    return registry.get(SEGFORMER_MODEL)
+
+
+def get_model_metrics():
+    """
+    프로세스 전역 레지스트리의 모델 지표 반환
+
+    Returns:
+        dict: 모델 지표
+    """
+    return registry.get_metrics()
@@ -0,0 +1,240 @@
+"""
+로컬 모델 저장소 - 허깅페이스 허브 모델을 MODEL_DIR에 safetensors로 고정하고 체크섬으로 검증
+
+저장된 가중치는 mmap으로 로드하므로, 같은 파일을 여는 워커 프로세스들은 페이지 캐시를
+공유하고(copy-on-write) 각자 가중치 사본을 갖지 않는다. 로컬 저장소에서 로드할 때는
+허브 조회 코드(from_pretrained)를 거치지 않는다.
+"""
+import os
+import re
+import json
+import shutil
+import hashlib
+from datetime import datetime
+
+from config import MODEL_STORE_DIR, MODEL_STORE_VERIFY
+from modules.utils import logger
+
+MANIFEST_FILE = "manifest.json"
+WEIGHTS_FILE = "model.safetensors"
+CONFIG_FILE = "config.json"
+PROCESSOR_CONFIG_FILE = "preprocessor_config.json"
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class ModelStoreError(Exception):
+    """로컬 모델 저장소가 없거나 검증에 실패한 경우"""
+
+
+def get_local_model_dir(model_name):
+    """
+    모델 이름에 해당하는 로컬 저장소 디렉토리 반환
+
+    Args:
+        model_name: SegFormer 모델 이름 (허브 ID)
+
+    Returns:
+        Path: 로컬 저장소 디렉토리
+    """
+    safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", model_name).strip("_")
+    return MODEL_STORE_DIR / safe_name
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(model_dir):
+    """
+    로컬 저장소 매니페스트 읽기
+
+    Args:
+        model_dir: 로컬 저장소 디렉토리
+
+    Returns:
+        dict: 매니페스트 (없으면 None)
+    """
+    manifest_path = os.path.join(model_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_model(model_dir, mode="sha256"):
+    """
+    매니페스트 기준으로 저장된 파일 검증
+
+    Args:
+        model_dir: 로컬 저장소 디렉토리
+        mode: "sha256" (내용 해시), "size" (파일 크기만), "none" (검증 생략)
+
+    Returns:
+        list: 문제 목록 (비어 있으면 정상)
+    """
+    manifest = read_manifest(model_dir)
+    if manifest is None:
+        return [f"{MANIFEST_FILE} 없음"]
+    if mode == "none":
+        return []
+
+    problems = []
+    for file_name, expected in manifest["files"].items():
+        path = os.path.join(model_dir, file_name)
+        if not os.path.exists(path):
+            problems.append(f"{file_name} 없음")
+        elif os.path.getsize(path) != expected["size"]:
+            problems.append(f"{file_name} 크기 불일치")
+        elif mode == "sha256" and _sha256(path) != expected["sha256"]:
+            problems.append(f"{file_name} 체크섬 불일치")
+    return problems
+
+
+def has_local_model(model_name):
+    """
+    로컬 저장소에 모델이 준비되어 있는지 확인 (매니페스트 존재 여부)
+
+    Args:
+        model_name: SegFormer 모델 이름
+
+    Returns:
+        bool: 준비된 경우 True
+    """
+    return read_manifest(get_local_model_dir(model_name)) is not None
+
+
+def prepare_model(model_name, force=False):
+    """
+    허브 모델을 로컬 저장소에 safetensors + 매니페스트로 저장
+
+    Args:
+        model_name: SegFormer 모델 이름 (허브 ID 또는 로컬 경로)
+        force: True이면 검증에 통과한 기존 저장소도 다시 생성
+
+    Returns:
+        dict: 매니페스트
+    """
+    from safetensors.torch import save_file
+    from transformers import SegformerImageProcessor, SegformerForSemanticSegmentation
+
+    model_dir = get_local_model_dir(model_name)
+    if not force and read_manifest(model_dir) is not None and not verify_model(model_dir):
+        logger.info(f"로컬 모델 저장소 검증 완료 (변경 없음): {model_dir}")
+        return read_manifest(model_dir)
+
+    logger.info(f"로컬 모델 저장소 생성 중: {model_name} -> {model_dir}")
+    os.makedirs(MODEL_STORE_DIR, exist_ok=True)
+    tmp_dir = f"{model_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    try:
+        processor = SegformerImageProcessor.from_pretrained(model_name)
+        model = SegformerForSemanticSegmentation.from_pretrained(model_name)
+        os.makedirs(tmp_dir)
+        model.config.save_pretrained(tmp_dir)
+        processor.save_pretrained(tmp_dir)
+
+        # 체크포인트 변환 규칙과 무관하게 현재 모듈 구조의 state_dict 키 그대로 저장 (load_state_dict와 1:1 대응)
+        state_dict = {name: tensor.contiguous() for name, tensor in model.state_dict().items()}
+        save_file(state_dict, os.path.join(tmp_dir, WEIGHTS_FILE), metadata={"format": "pt"})
+
+        files = {}
+        for file_name in (WEIGHTS_FILE, CONFIG_FILE, PROCESSOR_CONFIG_FILE):
+            path = os.path.join(tmp_dir, file_name)
+            files[file_name] = {"sha256": _sha256(path), "size": os.path.getsize(path)}
+
+        import torch
+        import transformers
+        manifest = {
+            "model_name": model_name,
+            "created_at": datetime.now().isoformat(),
+            "torch_version": torch.__version__,
+            "transformers_version": transformers.__version__,
+            "files": files
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        # 완성된 디렉토리로 교체 (중간 상태의 저장소가 보이지 않도록)
+        shutil.rmtree(model_dir, ignore_errors=True)
+        os.replace(tmp_dir, model_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    logger.info(f"로컬 모델 저장소 생성 완료: {model_dir}")
+    return manifest
+
+
+def _checked_model_dir(model_name):
+    model_dir = get_local_model_dir(model_name)
+    problems = verify_model(model_dir, MODEL_STORE_VERIFY)
+    if problems:
+        raise ModelStoreError(
+            f"로컬 모델 저장소 검증 실패 ({model_dir}): {', '.join(problems)} - "
+            f"'python main.py --prepare-models'로 다시 생성하세요"
+        )
+    return model_dir
+
+
+def load_local_processor(model_name):
+    """
+    로컬 저장소에서 이미지 전처리기 로드 (허브 조회 없음)
+
+    Args:
+        model_name: SegFormer 모델 이름
+
+    Returns:
+        SegformerImageProcessor: 전처리기
+    """
+    from transformers import SegformerImageProcessor
+
+    model_dir = _checked_model_dir(model_name)
+    with open(os.path.join(model_dir, PROCESSOR_CONFIG_FILE), "r", encoding="utf-8") as f:
+        processor_config = json.load(f)
+    processor_config.pop("image_processor_type", None)
+    processor_config.pop("processor_class", None)
+    return SegformerImageProcessor.from_dict(processor_config)
+
+
+def load_local_model(model_name):
+    """
+    로컬 저장소에서 가중치를 mmap으로 로드 (허브 조회 없음)
+
+    meta 디바이스에서 모델 구조만 만든 뒤, mmap된 safetensors 텐서를 복사 없이
+    파라미터로 할당한다(load_state_dict(assign=True)).
+
+    Args:
+        model_name: SegFormer 모델 이름
+
+    Returns:
+        SegformerForSemanticSegmentation: eval 모드 모델
+    """
+    import torch
+    from safetensors.torch import load_file
+    from transformers import SegformerConfig, SegformerForSemanticSegmentation
+
+    model_dir = _checked_model_dir(model_name)
+    model_config = SegformerConfig.from_json_file(os.path.join(model_dir, CONFIG_FILE))
+
+    with torch.device("meta"):
+        model = SegformerForSemanticSegmentation(model_config)
+    state_dict = load_file(os.path.join(model_dir, WEIGHTS_FILE))
+    try:
+        model.load_state_dict(state_dict, strict=True, assign=True)
+    except RuntimeError as e:
+        # transformers 버전이 바뀌어 모듈 구조(키 이름)가 달라진 경우
+        raise ModelStoreError(
+            f"로컬 모델 저장소의 가중치가 현재 모델 구조와 맞지 않습니다 ({model_dir}) - "
+            f"'python main.py --prepare-models --force'로 다시 생성하세요: {str(e)[:200]}"
+        ) from e
+
+    unloaded = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers()) if tensor.is_meta]
+    if unloaded:
+        raise ModelStoreError(f"가중치가 로드되지 않은 텐서: {', '.join(unloaded[:5])}")
+
+    model.eval()
+    return model
@@ -0,0 +1,100 @@
+"""
+입력 미리 읽기(prefetch) 파이프라인 - 디스크 읽기/디코딩/전처리를 모델 추론과 겹쳐서 실행
+"""
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from config import PREFETCH_WORKERS, PREFETCH_QUEUE_DEPTH
+
+
+class PrefetchPipeline:
+    def __init__(self, prepare_func, batches, workers=PREFETCH_WORKERS, queue_depth=PREFETCH_QUEUE_DEPTH):
+        """
+        prefetch 파이프라인 초기화
+
+        Args:
+            prepare_func: 배치 하나를 받아 전처리 결과를 반환하는 함수 (스레드에서 실행)
+            batches: 입력 배치 목록
+            workers: 전처리 스레드 수 (0이면 소비 시점에 동기 실행)
+            queue_depth: 미리 준비해 둘 최대 배치 수 (메모리 상한)
+        """
+        self.prepare_func = prepare_func
+        self.batches = batches
+        self.workers = workers
+        self.queue_depth = max(1, queue_depth)
+        self.metrics = {
+            "batches": 0,
+            "input_wait_seconds": 0.0,
+            "max_input_wait_seconds": 0.0,
+            "prepare_seconds": 0.0
+        }
+        self._lock = threading.Lock()
+
+    def _timed_prepare(self, batch):
+        start_time = time.perf_counter()
+        try:
+            return self.prepare_func(batch)
+        finally:
+            with self._lock:
+                self.metrics["prepare_seconds"] += time.perf_counter() - start_time
+
+    def __iter__(self):
+        """
+        입력 순서대로 (배치, 전처리 결과) 반환
+
+        소비자가 배치 하나를 처리하는 동안 다음 queue_depth개 배치를 스레드에서 준비한다.
+        전처리 함수의 예외는 해당 배치를 꺼낼 때 다시 발생한다.
+        """
+        if self.workers <= 0:
+            for batch in self.batches:
+                start_time = time.perf_counter()
+                prepared = self._timed_prepare(batch)
+                self._record_wait(time.perf_counter() - start_time)
+                yield batch, prepared
+            return
+
+        batch_iter = iter(self.batches)
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch") as executor:
+            for batch in batch_iter:
+                pending.append((batch, executor.submit(self._timed_prepare, batch)))
+                if len(pending) >= self.queue_depth:
+                    break
+
+            while pending:
+                batch, future = pending.popleft()
+                start_time = time.perf_counter()
+                prepared = future.result()
+                self._record_wait(time.perf_counter() - start_time)
+
+                # 꺼낸 만큼 다음 배치 준비 시작
+                next_batch = next(batch_iter, None)
+                if next_batch is not None:
+                    pending.append((next_batch, executor.submit(self._timed_prepare, next_batch)))
+
+                yield batch, prepared
+
+    def _record_wait(self, wait_seconds):
+        self.metrics["batches"] += 1
+        self.metrics["input_wait_seconds"] += wait_seconds
+        self.metrics["max_input_wait_seconds"] = max(self.metrics["max_input_wait_seconds"], wait_seconds)
+
+    def get_metrics(self):
+        """
+        입력 대기 지표 반환
+
+        Returns:
+            dict: 배치 수, 추론 루프가 입력을 기다린 총/평균/최대 시간, 전처리 총 시간
+        """
+        batches = self.metrics["batches"]
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "batches": batches,
+            "input_wait_seconds": round(self.metrics["input_wait_seconds"], 3),
+            "mean_input_wait_ms": round(self.metrics["input_wait_seconds"] / batches * 1000, 1) if batches else None,
+            "max_input_wait_ms": round(self.metrics["max_input_wait_seconds"] * 1000, 1),
+            "prepare_seconds": round(self.metrics["prepare_seconds"], 3)
+        }
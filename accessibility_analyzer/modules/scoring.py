@@ -0,0 +1,322 @@
+"""
+접근성 점수 규칙 - 분석기가 추출한 수치 특징에서 점수를 계산
+
+규칙은 모두 numpy 배열 연산으로 작성되어 있어, 분석기는 이미지 한 장의 특징(스칼라)에,
+재채점(--rescore)은 저장된 특징 레코드 전체(pandas 열)에 같은 함수를 적용한다.
+임계값을 바꾼 뒤 세그멘테이션/LLM 호출 없이 전체 코퍼스의 점수를 다시 계산할 수 있다.
+"""
+import os
+import json
+import time
+
+import numpy as np
+
+from config import ACCESSIBILITY_THRESHOLD_DISTANCE, ACCESSIBILITY_THRESHOLD_DISTANCE_RATIO
+
+# 기본 접근성 점수 - 문 너비 (전체 픽셀 대비 문 비율)
+DOOR_NARROW_RATIO = 0.01
+DOOR_WIDE_RATIO = 0.03
+
+# 강화된 외부 접근성 점수
+STAIR_AREA_RATIO_HIGH = 0.1       # 계단 면적 비율: 높음 (매우 높은 영향)
+STAIR_AREA_RATIO_MEDIUM = 0.05    # 계단 면적 비율: 보통 (높은 영향)
+HANDRAIL_MIN_VERTICAL_LINES = 2   # 난간으로 볼 수직선 수
+ENTRANCE_WIDE_RATIO = 0.6         # 고정 출입구 영역 폭 대비 문 폭: 넓음
+ENTRANCE_NARROW_RATIO = 0.3       # 고정 출입구 영역 폭 대비 문 폭: 좁음
+ENTRANCE_STEP_EDGE_FRACTION = 0.1  # 강한 수평 엣지 픽셀 수 / 출입구 영역 높이: 턱/계단
+ROUGH_TEXTURE_VARIANCE = 500      # 라플라시안 분산: 거친 표면
+SMOOTH_TEXTURE_VARIANCE = 100     # 라플라시안 분산: 매우 양호한 표면
+TACTILE_TOPHAT_MEAN = 10          # top-hat 평균: 점자블록
+OBSTACLES_HIGH = 3                # 이보다 많으면 심각한 장애물
+OBSTACLES_MEDIUM = 1              # 이보다 많으면 일반 장애물
+PATH_NARROW_RATIO = 0.3           # 이미지 폭 대비 경로 폭: 좁음
+PATH_WIDE_RATIO = 0.7             # 이미지 폭 대비 경로 폭: 넓음
+STEEP_SLOPE = 0.3                 # 평균 기울기: 급경사
+SLIGHT_SLOPE = 0.1                # 평균 기울기: 약간 경사
+
+
+# 특징 레코드의 특징 그룹 (기본 접근성 분석, 강화된 외부 분석)
+FEATURE_GROUPS = ("accessibility", "external")
+
+# 재채점 결과 표의 열
+RESCORE_COLUMNS = [
+    "image_path", "timestamp", "previous_accessibility_score", "accessibility_score",
+    "previous_external_accessibility_score", "external_accessibility_score", "external_confidence_level"
+]
+
+
+def _values(features, name):
+    """특징 열(또는 스칼라)을 float 배열로 (없는 값은 NaN - 모든 비교가 False)"""
+    values = features[name] if name in features else None
+    return np.asarray(np.nan if values is None else values, dtype=float)
+
+
+def _flags(features, name):
+    return _values(features, name) == 1
+
+
+def get_threshold_distance(long_side, working_resolution):
+    """
+    객체 간 거리 임계값 (작업 해상도 분석은 긴 변 대비 비율, 아니면 픽셀 단위 고정값)
+
+    Args:
+        long_side: 분석한 세그멘테이션 맵의 긴 변 (픽셀)
+        working_resolution: 작업 해상도 분석 여부
+
+    Returns:
+        numpy.ndarray: 거리 임계값 (픽셀)
+    """
+    return np.where(
+        np.asarray(working_resolution, dtype=bool),
+        ACCESSIBILITY_THRESHOLD_DISTANCE_RATIO * np.asarray(long_side, dtype=float),
+        ACCESSIBILITY_THRESHOLD_DISTANCE
+    )
+
+
+def door_width_category(door_ratio):
+    """
+    문 비율에 따른 너비 분류
+
+    Args:
+        door_ratio: 전체 픽셀 대비 문 픽셀 비율
+
+    Returns:
+        numpy.ndarray: "narrow" / "standard" / "wide"
+    """
+    door_ratio = np.asarray(door_ratio, dtype=float)
+    return np.select([door_ratio < DOOR_NARROW_RATIO, door_ratio < DOOR_WIDE_RATIO], ["narrow", "standard"], "wide")
+
+
+def accessibility_decisions(features):
+    """
+    거리 특징에서 입구 접근성 판정
+
+    Args:
+        features: 기본 접근성 특징 (dict 또는 DataFrame)
+
+    Returns:
+        dict: stairs_at_entrance / disconnected_sidewalk / has_stairs_railing 판정 배열
+    """
+    threshold = get_threshold_distance(_values(features, "analysis_long_side"), _flags(features, "working_resolution"))
+    has_stairs = _flags(features, "has_stairs")
+    has_door = _flags(features, "has_door")
+    return {
+        "stairs_at_entrance": has_door & has_stairs & (_values(features, "stairs_to_door_distance") < threshold),
+        "disconnected_sidewalk": (
+            has_door & _flags(features, "has_sidewalk") & (_values(features, "sidewalk_to_door_distance") > threshold)
+        ),
+        "has_stairs_railing": (
+            has_stairs & _flags(features, "has_railing") & (_values(features, "railing_to_stairs_distance") < threshold)
+        )
+    }
+
+
+def accessibility_score(features, decisions=None):
+    """
+    기본 접근성 점수 (1-10 정수)
+
+    Args:
+        features: 기본 접근성 특징 (dict 또는 DataFrame)
+        decisions: 미리 계산한 accessibility_decisions 결과 (None이면 계산)
+
+    Returns:
+        numpy.ndarray: 점수
+    """
+    if decisions is None:
+        decisions = accessibility_decisions(features)
+    stairs_at_entrance = decisions["stairs_at_entrance"]
+    has_door = _flags(features, "has_door")
+    door_width = door_width_category(_values(features, "door_ratio"))
+
+    score = np.full(stairs_at_entrance.shape, 10)
+    # 입구 바로 앞 계단은 큰 감점 (난간이 있으면 약간 보상), 떨어진 계단은 작은 감점
+    score -= 5 * stairs_at_entrance
+    score += stairs_at_entrance & decisions["has_stairs_railing"]
+    score -= 2 * (~stairs_at_entrance & _flags(features, "has_stairs"))
+    score -= 2 * decisions["disconnected_sidewalk"]
+    score -= 3 * (has_door & (door_width == "narrow"))
+    score += has_door & (door_width == "wide")
+    return np.clip(score, 1, 10)
+
+
+def _enhanced_score_rules(features):
+    """
+    강화된 외부 접근성 점수 규칙 목록 (점수 항목, 적용 여부 배열, 점수 변화, 설명)
+
+    같은 점수 항목의 규칙은 서로 배타적이다.
+    """
+    has_stairs = _values(features, "stair_segment_count") > 0
+    stair_ratio = _values(features, "stair_area_ratio")
+    door_width_ratio = _values(features, "door_width_ratio")
+    texture_variance = _values(features, "texture_variance")
+    obstacle_count = _values(features, "obstacle_count")
+    path_width_ratio = _values(features, "path_width_ratio")
+    mean_slope = _values(features, "mean_slope")
+    return [
+        ("stairs", has_stairs & (stair_ratio > STAIR_AREA_RATIO_HIGH), -4.0, "계단 {stair_count}개"),
+        ("stairs", has_stairs & (stair_ratio > STAIR_AREA_RATIO_MEDIUM) & ~(stair_ratio > STAIR_AREA_RATIO_HIGH),
+         -3.0, "계단 {stair_count}개"),
+        ("stairs", has_stairs & ~(stair_ratio > STAIR_AREA_RATIO_MEDIUM), -2.0, "계단 {stair_count}개"),
+        ("handrail", has_stairs & (_values(features, "vertical_line_count") >= HANDRAIL_MIN_VERTICAL_LINES),
+         0.5, "난간 존재"),
+        ("entrance_width", door_width_ratio > ENTRANCE_WIDE_RATIO, 1.0, "넓은 출입구"),
+        ("entrance_width", door_width_ratio < ENTRANCE_NARROW_RATIO, -2.0, "좁은 출입구"),
+        ("entrance_level", _values(features, "strong_horizontal_pixels")
+         > _values(features, "entrance_height") * ENTRANCE_STEP_EDGE_FRACTION, -1.5, "출입구 턱/계단"),
+        ("surface", texture_variance > ROUGH_TEXTURE_VARIANCE, -1.0, "거친 표면"),
+        ("surface", texture_variance < SMOOTH_TEXTURE_VARIANCE, 0.5, "매우 양호한 표면"),
+        ("tactile", _values(features, "tophat_mean") > TACTILE_TOPHAT_MEAN, 1.0, "점자블록 존재"),
+        ("obstacles", obstacle_count > OBSTACLES_HIGH, -2.5, "심각한 장애물"),
+        ("obstacles", (obstacle_count > OBSTACLES_MEDIUM) & ~(obstacle_count > OBSTACLES_HIGH), -1.0, "일반 장애물"),
+        ("path_width", path_width_ratio > PATH_WIDE_RATIO, 0.5, "넓은 경로"),
+        ("path_width", path_width_ratio < PATH_NARROW_RATIO, -1.5, "좁은 경로"),
+        ("slope", mean_slope > STEEP_SLOPE, -2.0, "급경사"),
+        ("slope", (mean_slope > SLIGHT_SLOPE) & ~(mean_slope > STEEP_SLOPE), -0.5, "약간 경사"),
+    ]
+
+
+def enhanced_external_score(features):
+    """
+    강화된 외부 접근성 점수 (10점에서 시작해 규칙별 가감, 1-10)
+
+    Args:
+        features: 강화된 외부 분석 특징 (dict 또는 DataFrame)
+
+    Returns:
+        dict: score (소수 첫째 자리), rule_count (적용된 점수 항목 수), confidence_level, applied (규칙별 적용 여부 목록)
+    """
+    rules = _enhanced_score_rules(features)
+    shape = np.broadcast_shapes(*(applied.shape for _, applied, _, _ in rules))
+    score = np.full(shape, 10.0)
+    applied_items = {}
+    for item, applied, delta, _ in rules:
+        score = score + np.where(applied, delta, 0.0)
+        applied_items[item] = applied_items.get(item, False) | applied
+    rule_count = sum(np.broadcast_to(applied, shape).astype(int) for applied in applied_items.values())
+    return {
+        "score": np.round(np.clip(score, 1.0, 10.0), 1),
+        "rule_count": rule_count,
+        # 적용된 항목이 3개 미만이면 신뢰도 보통
+        "confidence_level": np.where(rule_count < 3, "보통", "높음"),
+        "applied": rules
+    }
+
+
+def enhanced_score_breakdown(features, scored=None):
+    """
+    이미지 한 장의 점수 항목별 설명 (예: {"stairs": "-2.0점 (계단 3개)"})
+
+    Args:
+        features: 이미지 한 장의 강화된 외부 분석 특징 (스칼라 dict)
+        scored: 미리 계산한 enhanced_external_score 결과
+
+    Returns:
+        dict: 점수 항목 -> 설명
+    """
+    scored = scored or enhanced_external_score(features)
+    stair_count = int(features.get("stair_segment_count") or 0)
+    return {
+        item: f"{delta:+.1f}점 ({description.format(stair_count=stair_count)})"
+        for item, applied, delta, description in scored["applied"] if bool(applied)
+    }
+
+
+def append_feature_record(record, path):
+    """
+    특징 레코드를 JSON Lines 파일에 한 줄 추가
+
+    Args:
+        record: 이미지 한 장의 특징 레코드
+        path: 특징 저장 파일 경로
+    """
+    os.makedirs(os.path.dirname(os.fspath(path)) or ".", exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False, default=float) + "\n"
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def load_feature_table(path, latest_only=True):
+    """
+    저장된 특징 레코드를 열 기반 표로 로드 (중첩 특징은 "accessibility.has_stairs" 형식의 열)
+
+    Args:
+        path: 특징 저장 파일 경로
+        latest_only: True이면 이미지별 마지막 레코드만 사용
+
+    Returns:
+        pandas.DataFrame: 특징 표
+    """
+    import pandas as pd
+
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    # 특징 그룹별로 표를 만들어 붙임 (레코드마다 중첩 dict를 평탄화하는 json_normalize보다 빠름)
+    top = pd.DataFrame([{key: value for key, value in record.items() if key not in FEATURE_GROUPS} for record in records])
+    table = pd.concat(
+        [top] + [
+            pd.DataFrame([record.get(group) or {} for record in records]).add_prefix(f"{group}.")
+            for group in FEATURE_GROUPS
+        ],
+        axis=1
+    )
+    if latest_only and len(table):
+        table = table.drop_duplicates("image_path", keep="last").reset_index(drop=True)
+    return table
+
+
+def _feature_columns(table, prefix):
+    columns = [column for column in table.columns if column.startswith(prefix)]
+    return table[columns].rename(columns=lambda column: column[len(prefix):])
+
+
+def rescore_features(path):
+    """
+    저장된 특징 전체에 현재 점수 규칙을 적용 (표 전체를 열 단위로 한 번에 계산)
+
+    Args:
+        path: 특징 저장 파일 경로
+
+    Returns:
+        tuple: (점수 표 DataFrame, 요약 dict)
+    """
+    import pandas as pd
+
+    start_time = time.perf_counter()
+    table = load_feature_table(path)
+    load_seconds = time.perf_counter() - start_time
+
+    if table.empty:
+        # 빈 특징 파일 (기록된 이미지 없음)
+        summary = {
+            "records": 0, "with_external_features": 0, "accessibility_score_changed": 0, "external_score_changed": 0,
+            "load_ms": round(load_seconds * 1000, 1), "score_ms": 0.0
+        }
+        return pd.DataFrame(columns=RESCORE_COLUMNS), summary
+
+    start_time = time.perf_counter()
+    scores = table[["image_path", "timestamp"]].copy()
+    accessibility = _feature_columns(table, "accessibility.")
+    scores["previous_accessibility_score"] = table.get("accessibility_score")
+    scores["accessibility_score"] = accessibility_score(accessibility)
+
+    external = _feature_columns(table, "external.")
+    has_external = external.notna().any(axis=1).to_numpy() if len(external.columns) else np.zeros(len(table), bool)
+    scored = enhanced_external_score(external) if len(external.columns) else None
+    scores["previous_external_accessibility_score"] = table.get("external_accessibility_score")
+    scores["external_accessibility_score"] = np.where(has_external, scored["score"], np.nan) if scored else np.nan
+    scores["external_confidence_level"] = np.where(has_external, scored["confidence_level"], None) if scored else None
+    score_seconds = time.perf_counter() - start_time
+
+    changed = scores["accessibility_score"] != scores["previous_accessibility_score"]
+    external_changed = has_external & (
+        scores["external_accessibility_score"] != scores["previous_external_accessibility_score"]
+    )
+    summary = {
+        "records": len(scores),
+        "with_external_features": int(np.count_nonzero(has_external)),
+        "accessibility_score_changed": int(changed.sum()),
+        "external_score_changed": int(np.count_nonzero(external_changed)),
+        "load_ms": round(load_seconds * 1000, 1),
+        "score_ms": round(score_seconds * 1000, 1)
+    }
+    return scores, summary
@@ -0,0 +1,363 @@
+"""
+세그멘테이션 맵 클래스 통계 - 클래스별 픽셀 수를 bincount 한 번으로 계산하고 마스크/바운딩 박스는 필요할 때 생성
+"""
+import threading
+
+import cv2
+import numpy as np
+from scipy.ndimage import distance_transform_edt, label
+
+
+def get_working_shape(shape, working_size):
+    """
+    긴 변이 working_size가 되도록 비율을 유지한 작업 해상도 계산
+
+    Args:
+        shape: 원본 (높이, 너비)
+        working_size: 작업 해상도 긴 변 (픽셀)
+
+    Returns:
+        tuple: 작업 해상도 (높이, 너비)
+    """
+    height, width = shape[:2]
+    scale = working_size / max(height, width)
+    return max(1, round(height * scale)), max(1, round(width * scale))
+
+
+def to_working_resolution(seg_map, working_size, shape=None):
+    """
+    세그멘테이션 맵을 작업 해상도로 최근접 보간 (촬영 해상도와 관계없이 같은 크기에서 분석)
+
+    Args:
+        seg_map: 세그멘테이션 맵
+        working_size: 작업 해상도 긴 변 (0 또는 None이면 그대로 반환)
+        shape: 작업 해상도 비율의 기준이 되는 원본 이미지 (높이, 너비)
+            (None이면 맵 크기 - 저해상도 맵은 이미지 크기를 넘겨야 축소 이미지와 크기가 같아짐)
+
+    Returns:
+        numpy.ndarray: 작업 해상도 세그멘테이션 맵
+    """
+    if not working_size:
+        return seg_map
+    height, width = get_working_shape(seg_map.shape if shape is None else shape, working_size)
+    if seg_map.shape[:2] == (height, width):
+        return seg_map
+    return cv2.resize(seg_map.astype(np.uint8, copy=False), (width, height), interpolation=cv2.INTER_NEAREST)
+
+
+def scale_segments(segments, from_shape, to_shape):
+    """
+    세그먼트 레코드의 bbox/면적/중심점을 다른 해상도의 좌표로 환산
+
+    Args:
+        segments: segments()가 반환한 세그먼트 목록
+        from_shape: 세그먼트 좌표의 기준 (높이, 너비)
+        to_shape: 환산할 (높이, 너비)
+
+    Returns:
+        list: 환산한 세그먼트 목록 (크기가 같으면 입력 그대로)
+    """
+    if not segments or tuple(from_shape[:2]) == tuple(to_shape[:2]):
+        return segments
+    scale_y = to_shape[0] / from_shape[0]
+    scale_x = to_shape[1] / from_shape[1]
+    scaled = []
+    for segment in segments:
+        segment = dict(segment)
+        if 'bbox' in segment:
+            x, y, w, h = segment['bbox']
+            x0, y0 = round(x * scale_x), round(y * scale_y)
+            segment['bbox'] = [x0, y0, round((x + w) * scale_x) - x0, round((y + h) * scale_y) - y0]
+        if 'area' in segment:
+            segment['area'] = round(segment['area'] * scale_x * scale_y)
+        if 'centroid' in segment:
+            # 픽셀 중심 좌표 기준으로 환산
+            cx, cy = segment['centroid']
+            segment['centroid'] = [round((cx + 0.5) * scale_x - 0.5, 1), round((cy + 0.5) * scale_y - 0.5, 1)]
+        scaled.append(segment)
+    return scaled
+
+
+class ComponentStatistics:
+    def __init__(self, mask, structure=None):
+        """
+        마스크의 연결 요소를 라벨링하고 모든 요소의 크기/바운딩 박스/중심점을 한 번에 계산
+
+        요소마다 마스크 전체를 다시 훑지 않으므로 작은 조각이 수백 개인 마스크에서도
+        비용이 픽셀 수에 비례한다.
+
+        Args:
+            mask: bool 마스크
+            structure: ndimage.label 연결 구조 (None이면 4-연결)
+        """
+        self.labeled, self.count = label(mask, structure)
+        self.shape = mask.shape
+
+        flat = self.labeled.ravel()
+        indices = np.flatnonzero(flat)
+        labels = flat[indices]
+        rows, cols = np.divmod(indices, self.shape[1])
+
+        # 라벨 0(배경)을 제외한 요소별 값 (배열 인덱스 i는 라벨 i + 1)
+        self.sizes = np.bincount(labels, minlength=self.count + 1)[1:]
+        if self.count:
+            self.centroids = np.column_stack([
+                np.bincount(labels, weights=cols, minlength=self.count + 1)[1:] / self.sizes,
+                np.bincount(labels, weights=rows, minlength=self.count + 1)[1:] / self.sizes
+            ])
+            # 요소별 최소/최대 행/열을 한 번에 집계 (요소마다 슬라이스 객체를 만들지 않음)
+            lows = np.full((2, self.count + 1), np.iinfo(np.int64).max)
+            highs = np.full((2, self.count + 1), -1)
+            for axis, positions in enumerate((cols, rows)):
+                np.minimum.at(lows[axis], labels, positions)
+                np.maximum.at(highs[axis], labels, positions)
+            self.bboxes = np.column_stack([
+                lows[0, 1:], lows[1, 1:], highs[0, 1:] - lows[0, 1:] + 1, highs[1, 1:] - lows[1, 1:] + 1
+            ])
+        else:
+            self.centroids = np.zeros((0, 2))
+            self.bboxes = np.zeros((0, 4), dtype=np.int64)
+
+    def largest(self):
+        """
+        가장 큰 요소의 인덱스 (크기가 같으면 라벨 번호가 작은 요소)
+
+        Returns:
+            int: 요소 인덱스 (요소가 없으면 None)
+        """
+        return int(np.argmax(self.sizes)) if self.count else None
+
+    def component_mask(self, index):
+        """
+        요소 하나의 마스크
+
+        Args:
+            index: 요소 인덱스
+
+        Returns:
+            numpy.ndarray: bool 마스크
+        """
+        return self.labeled == index + 1
+
+
+class SegMapStatistics:
+    def __init__(self, seg_map, counters=None, counter_suffix="", lock=None):
+        """
+        세그멘테이션 맵 통계 초기화 (클래스별 픽셀 수를 한 번에 계산)
+
+        Args:
+            seg_map: 세그멘테이션 맵 (클래스 ID 2차원 배열)
+            counters: 마스크/연결 요소 조회 hits/misses를 집계할 dict (None이면 집계 안 함)
+            counter_suffix: 집계 이름 뒤에 붙일 문자열 (예: 작업 해상도 "@512")
+            lock: counters를 함께 쓰는 쪽과 공유할 잠금 (None이면 새로 생성)
+        """
+        self.seg_map = seg_map
+        self.counters = counters
+        self.counter_suffix = counter_suffix
+        self.shape = seg_map.shape
+        self.total_pixels = seg_map.size
+        self.counts = np.bincount(seg_map.ravel(), minlength=256)
+        self._masks = {}
+        self._bboxes = None
+        self._distances = {}
+        self._components = {}
+        # 여러 스레드가 같은 마스크/연결 요소를 요청해도 한 번만 계산
+        self._lock = lock or threading.Lock()
+        self._compute_locks = {}
+
+    def count(self, class_id):
+        """
+        클래스 픽셀 수
+
+        Args:
+            class_id: 클래스 ID
+
+        Returns:
+            int: 픽셀 수
+        """
+        return int(self.counts[class_id]) if class_id < len(self.counts) else 0
+
+    def ratio(self, class_id):
+        """
+        클래스 픽셀 비율
+
+        Args:
+            class_id: 클래스 ID
+
+        Returns:
+            float: 전체 픽셀 대비 비율
+        """
+        return self.count(class_id) / self.total_pixels
+
+    def present(self, class_id):
+        """
+        클래스가 맵에 한 픽셀이라도 있는지 여부
+
+        Args:
+            class_id: 클래스 ID
+
+        Returns:
+            bool: 존재 여부
+        """
+        return self.count(class_id) > 0
+
+    def mask(self, class_id):
+        """
+        클래스 마스크 (존재하는 클래스만 실제로 생성하고, 처음 요청할 때 한 번만 계산)
+
+        Args:
+            class_id: 클래스 ID
+
+        Returns:
+            numpy.ndarray: bool 마스크 (없는 클래스는 메모리를 쓰지 않는 읽기 전용 False 배열)
+        """
+        if not self.present(class_id):
+            return np.broadcast_to(False, self.shape)
+        return self._cached("mask", self._masks, class_id, lambda: self.seg_map == class_id)
+
+    def bbox(self, class_id):
+        """
+        클래스 바운딩 박스
+
+        Args:
+            class_id: 클래스 ID
+
+        Returns:
+            tuple: (x, y, 너비, 높이) (없는 클래스는 None)
+        """
+        if not self.present(class_id):
+            return None
+        if self._bboxes is None:
+            self._bboxes = self._compute_bboxes()
+        return self._bboxes[class_id]
+
+    def components(self, class_id):
+        """
+        클래스 마스크의 연결 요소 통계 (처음 요청할 때 한 번만 계산)
+
+        Args:
+            class_id: 클래스 ID
+
+        Returns:
+            ComponentStatistics: 연결 요소 크기/바운딩 박스/중심점
+        """
+        return self._cached(
+            "components", self._components, class_id, lambda: ComponentStatistics(self.mask(class_id))
+        )
+
+    def segments(self, class_id, min_pixels=1, shape=None):
+        """
+        클래스 영역을 연결 요소별 세그먼트 레코드로 변환 (라벨링 한 번으로 모든 요소의 값 계산)
+
+        Args:
+            class_id: 클래스 ID
+            min_pixels: 세그먼트로 포함할 최소 픽셀 수 (반환 좌표 기준, 이보다 작은 조각은 제외)
+            shape: 좌표를 환산할 (높이, 너비) (None이면 맵 픽셀 좌표, 맵이 이미지보다 작으면 이미지 크기 전달)
+
+        Returns:
+            list: 세그먼트 목록 (id, bbox [x, y, 너비, 높이], area 픽셀 수, centroid [x, y])
+        """
+        if not self.present(class_id):
+            return []
+        components = self.components(class_id)
+        if shape is not None:
+            # 최소 크기도 반환 좌표 기준이므로 맵 픽셀 수로 환산
+            min_pixels = min_pixels * self.total_pixels / (shape[0] * shape[1])
+        kept = np.flatnonzero(components.sizes >= min_pixels)
+        segments = [
+            {
+                "id": segment_id,
+                "bbox": components.bboxes[index].tolist(),
+                "area": int(components.sizes[index]),
+                "centroid": [round(float(x), 1), round(float(y), 1)]
+            }
+            for segment_id, (index, (x, y)) in enumerate(zip(kept, components.centroids[kept]))
+        ]
+        return scale_segments(segments, self.shape, shape) if shape is not None else segments
+
+    def min_distances(self, target_id, source_ids):
+        """
+        여러 source 클래스에서 target 클래스까지의 정확한 최소 유클리드 거리
+
+        target 마스크의 거리 변환을 한 번만 계산하여 모든 source 클래스가 공유한다.
+        거리 변환은 target과 source 클래스들의 바운딩 박스를 합친 영역에서만 수행한다.
+
+        Args:
+            target_id: 거리를 잴 대상 클래스 ID
+            source_ids: 출발 클래스 ID 목록
+
+        Returns:
+            dict: source 클래스 ID -> 최소 거리 (어느 한쪽이 없으면 inf)
+        """
+        pending = [source_id for source_id in source_ids if (source_id, target_id) not in self._distances]
+        present_sources = [source_id for source_id in pending if self.present(source_id)]
+        if not self.present(target_id) or not present_sources:
+            for source_id in pending:
+                self._distances[(source_id, target_id)] = float('inf')
+        elif pending:
+            boxes = [self.bbox(class_id) for class_id in [target_id] + present_sources]
+            x0 = min(x for x, _, _, _ in boxes)
+            y0 = min(y for _, y, _, _ in boxes)
+            x1 = max(x + w for x, _, w, _ in boxes)
+            y1 = max(y + h for _, y, _, h in boxes)
+            region = self.seg_map[y0:y1, x0:x1]
+            distance = distance_transform_edt(region != target_id)
+            for source_id in pending:
+                self._distances[(source_id, target_id)] = (
+                    float(distance[region == source_id].min()) if source_id in present_sources else float('inf')
+                )
+        return {source_id: self._distances[(source_id, target_id)] for source_id in source_ids}
+
+    def min_distance(self, source_id, target_id):
+        """
+        source 클래스에서 target 클래스까지의 정확한 최소 유클리드 거리 (결과는 캐시)
+
+        Args:
+            source_id: 출발 클래스 ID
+            target_id: 대상 클래스 ID
+
+        Returns:
+            float: 최소 거리 (어느 한쪽이 없으면 inf)
+        """
+        return self.min_distances(target_id, [source_id])[source_id]
+
+    def _cached(self, name, cache, class_id, compute):
+        """캐시 조회 (없으면 계산, 같은 값을 동시에 요청한 스레드는 계산이 끝나기를 기다림)"""
+        with self._lock:
+            value = cache.get(class_id)
+            if value is not None:
+                self._count(name, True)
+                return value
+            compute_lock = self._compute_locks.setdefault((name, class_id), threading.Lock())
+        with compute_lock:
+            with self._lock:
+                value = cache.get(class_id)
+                self._count(name, value is not None)
+            if value is None:
+                value = compute()
+                cache[class_id] = value
+        return value
+
+    def _count(self, name, hit):
+        if self.counters is None:
+            return
+        counter = self.counters.setdefault(name + self.counter_suffix, {"hits": 0, "misses": 0})
+        counter["hits" if hit else "misses"] += 1
+
+    def _compute_bboxes(self):
+        """모든 클래스의 바운딩 박스를 맵 한 번 순회로 계산 (클래스별 행/열 존재 표시)"""
+        height, width = self.shape
+        num_classes = len(self.counts)
+        rows_present = np.zeros((num_classes, height), dtype=bool)
+        cols_present = np.zeros((num_classes, width), dtype=bool)
+        rows_present[self.seg_map, np.arange(height)[:, None]] = True
+        cols_present[self.seg_map, np.arange(width)[None, :]] = True
+
+        bboxes = {}
+        for class_id in np.flatnonzero(self.counts):
+            rows = np.flatnonzero(rows_present[class_id])
+            cols = np.flatnonzero(cols_present[class_id])
+            bboxes[int(class_id)] = (
+                int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1)
+            )
+        return bboxes
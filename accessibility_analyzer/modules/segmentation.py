@@ -1,27 +1,347 @@
 """
 이미지 세그멘테이션을 수행하는 모듈
 """
+import os
+import re
+import inspect
+import hashlib
+import threading
 import torch
 import numpy as np
 import cv2
 from PIL import Image
 from transformers import SegformerImageProcessor, SegformerForSemanticSegmentation
 
-from config import SEGFORMER_MODEL, DEVICE, COLOR_MAP, CLASS_MAP
+from config import (
+    SEGFORMER_MODEL, DEVICE, COLOR_MAP, CLASS_MAP, SEGMENTATION_BATCH_SIZE,
+    SEGMENTATION_BACKEND, SEGMENTATION_NATIVE_RESOLUTION, ONNX_MODEL_DIR, MODEL_OFFLINE,
+    SEGMENTATION_TILED_MIN_PIXELS, SEGMENTATION_TILE_SIZE, SEGMENTATION_TILE_OVERLAP,
+    SEGMENTATION_TILE_MAX_MEMORY_MB, ONNX_OPSET_VERSION,
+    SEGMENTATION_QUANTIZATION, QUANTIZATION_CALIBRATION_DIR, QUANTIZATION_CALIBRATION_LIMIT,
+    CASCADE_CLASSES, CASCADE_CONFIDENCE_THRESHOLD, CASCADE_THRESHOLD_MARGIN, CASCADE_DECISION_THRESHOLDS,
+    OVERLAY_QUALITY
+)
+from modules.utils import logger, get_image_files_in_directory
+from modules.model_store import (
+    ModelStoreError, has_local_model, load_local_model, load_local_processor
+)
+
+SUPPORTED_BACKENDS = ("torch", "onnx")
+SUPPORTED_QUANTIZATION = ("dynamic", "static")
+
+
+# 세그멘테이션 맵 자료형 (ADE20K 150개 클래스는 uint8 범위)
+SEG_MAP_DTYPE = np.uint8
+
+# 오버레이 확장자별 OpenCV 인코딩 옵션
+OVERLAY_ENCODE_PARAMS = {
+    ".jpg": [cv2.IMWRITE_JPEG_QUALITY, OVERLAY_QUALITY],
+    ".jpeg": [cv2.IMWRITE_JPEG_QUALITY, OVERLAY_QUALITY],
+    ".webp": [cv2.IMWRITE_WEBP_QUALITY, OVERLAY_QUALITY],
+}
+
+
+def build_palette(class_map=CLASS_MAP, color_map=COLOR_MAP):
+    """
+    클래스 ID로 인덱싱하는 256색 팔레트(LUT) 생성
+    
+    Args:
+        class_map: 클래스 이름 -> 클래스 ID
+        color_map: 클래스 이름 -> RGB 색상
+        
+    Returns:
+        numpy array: (256, 3) uint8 팔레트 (색상이 없는 클래스는 검정)
+    """
+    palette = np.zeros((256, 3), dtype=np.uint8)
+    for class_name, class_id in class_map.items():
+        if class_name in color_map:
+            palette[class_id] = color_map[class_name]
+    return palette
+
+
+def resize_seg_map(seg_map, size):
+    """
+    세그멘테이션 맵을 지정한 해상도로 최근접 보간
+    
+    Args:
+        seg_map: 세그멘테이션 맵
+        size: 목표 (높이, 너비)
+        
+    Returns:
+        numpy array: 크기가 조정된 세그멘테이션 맵
+    """
+    if seg_map.shape[:2] == tuple(size):
+        return seg_map
+    return cv2.resize(seg_map, (size[1], size[0]), interpolation=cv2.INTER_NEAREST)
+
+
+def class_mask(seg_map, class_id, size=None):
+    """
+    클래스 마스크 생성 (필요한 경우에만 목표 해상도로 업샘플링)
+    
+    저해상도 맵에서는 전체 맵 대신 해당 클래스의 이진 마스크만 업샘플링한다.
+    
+    Args:
+        seg_map: 세그멘테이션 맵
+        class_id: 클래스 ID
+        size: 목표 (높이, 너비) (None이면 맵 해상도 그대로)
+        
+    Returns:
+        numpy array: bool 마스크
+    """
+    mask = seg_map == class_id
+    if size is None or mask.shape == tuple(size):
+        return mask
+    if not mask.any():
+        return np.zeros(size, dtype=bool)
+    return resize_seg_map(mask.view(np.uint8), size).astype(bool)
+
+
+def get_onnx_model_path(model_name):
+    """
+    모델 이름에 해당하는 ONNX 캐시 파일 경로 반환
+    
+    Args:
+        model_name: SegFormer 모델 이름
+        
+    Returns:
+        Path: ONNX 파일 경로
+    """
+    safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", model_name).strip("_")
+    return ONNX_MODEL_DIR / f"{safe_name}.onnx"
+
+
+class _LogitsOnly(torch.nn.Module):
+    """ONNX 변환용 래퍼 - 로짓 텐서만 반환"""
+    
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+    
+    def forward(self, pixel_values):
+        return self.model(pixel_values=pixel_values).logits
+
+
+def export_onnx_model(model_name, model=None, processor=None, output_path=None):
+    """
+    SegFormer 모델을 ONNX로 변환하여 캐시 (이미 존재하면 재사용)
+    
+    Args:
+        model_name: SegFormer 모델 이름
+        model: 이미 로드된 PyTorch 모델 (None이면 새로 로드)
+        processor: 이미 로드된 이미지 프로세서 (None이면 새로 로드)
+        output_path: 저장 경로 (None이면 MODEL_DIR 하위 기본 경로)
+        
+    Returns:
+        Path: ONNX 파일 경로
+    """
+    output_path = output_path or get_onnx_model_path(model_name)
+    if os.path.exists(output_path):
+        return output_path
+    
+    logger.info(f"ONNX 모델 변환 중: {model_name} -> {output_path}")
+    model = model or SegformerForSemanticSegmentation.from_pretrained(model_name)
+    processor = processor or SegformerImageProcessor.from_pretrained(model_name)
+    model.eval()
+    
+    size = processor.size
+    dummy_input = torch.zeros(1, 3, size["height"], size["width"])
+    
+    # 다른 프로세스와 동시에 변환하더라도 완성된 파일만 보이도록 임시 파일에 쓴 뒤 교체
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # 동적 배치 축을 유지하기 위해 TorchScript 기반 변환기 사용
+        export_kwargs["dynamo"] = False
+    # export는 끝난 뒤 래퍼의 원래 train 모드를 하위 모델까지 복원하므로 래퍼도 eval 모드로 생성
+    torch.onnx.export(
+        _LogitsOnly(model).cpu().eval(),
+        (dummy_input,),
+        tmp_path,
+        input_names=["pixel_values"],
+        output_names=["logits"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=ONNX_OPSET_VERSION,
+        **export_kwargs
+    )
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def quantize_onnx_model(fp32_path, mode, processor=None, calibration_dir=None):
+    """
+    ONNX 모델을 int8로 양자화하여 캐시 (이미 존재하면 재사용)
+    
+    Args:
+        fp32_path: 원본 ONNX 파일 경로
+        mode: "dynamic" 또는 "static"
+        processor: static 보정용 이미지 프로세서
+        calibration_dir: static 보정 이미지 디렉토리
+        
+    Returns:
+        Path: 양자화된 ONNX 파일 경로
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic, quantize_static
+    
+    if mode == "static":
+        calibration_files = get_image_files_in_directory(calibration_dir)[:QUANTIZATION_CALIBRATION_LIMIT]
+        if not calibration_files:
+            raise ValueError(f"static 양자화 보정 이미지가 없습니다: {calibration_dir}")
+        # 보정 데이터셋이 바뀌면 다른 캐시 파일을 사용
+        calibration_key = hashlib.sha1(
+            "\n".join(sorted(os.path.basename(f) for f in calibration_files)).encode("utf-8")
+        ).hexdigest()[:8]
+        output_path = fp32_path.with_name(f"{fp32_path.stem}.int8-static-{calibration_key}.onnx")
+    else:
+        output_path = fp32_path.with_name(f"{fp32_path.stem}.int8-dynamic.onnx")
+    
+    if output_path.exists():
+        return output_path
+    
+    logger.info(f"ONNX 모델 int8 {mode} 양자화 중: {output_path}")
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    if mode == "static":
+        quantize_static(
+            str(fp32_path), tmp_path,
+            _make_calibration_reader(processor, calibration_files),
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8
+        )
+    else:
+        quantize_dynamic(str(fp32_path), tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def _make_calibration_reader(processor, image_files):
+    """static 양자화용 보정 데이터 리더 생성 (매장 사진 디렉토리 기반)"""
+    from onnxruntime.quantization import CalibrationDataReader
+    
+    class _ImageCalibrationReader(CalibrationDataReader):
+        def __init__(self):
+            self._files = iter(image_files)
+        
+        def get_next(self):
+            image_file = next(self._files, None)
+            if image_file is None:
+                return None
+            image = Image.open(image_file).convert("RGB")
+            return {"pixel_values": processor(images=image, return_tensors="np")["pixel_values"]}
+    
+    return _ImageCalibrationReader()
+
+
+class TorchBackend:
+    """PyTorch eager 추론 백엔드"""
+    name = "torch"
+    
+    def __init__(self, model, device=DEVICE):
+        self.model = model
+        self.device = device
+        self.num_labels = model.config.num_labels
+    
+    def __call__(self, pixel_values):
+        with torch.no_grad():
+            return self.model(pixel_values=pixel_values.to(self.device)).logits
+
+
+class OnnxBackend:
+    """ONNX Runtime 추론 백엔드 (그래프 최적화 적용)"""
+    name = "onnx"
+    
+    def __init__(self, onnx_path):
+        import onnxruntime as ort
+        
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(onnx_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.num_labels = self.session.get_outputs()[0].shape[1]
+    
+    def __call__(self, pixel_values):
+        logits = self.session.run(["logits"], {"pixel_values": pixel_values.cpu().numpy()})[0]
+        return torch.from_numpy(logits)
 
 
 class SegmentationModel:
-    def __init__(self, model_name=SEGFORMER_MODEL):
+    def __init__(self, model_name=SEGFORMER_MODEL, batch_size=SEGMENTATION_BATCH_SIZE,
+                 backend=SEGMENTATION_BACKEND, quantization=SEGMENTATION_QUANTIZATION,
+                 calibration_dir=QUANTIZATION_CALIBRATION_DIR,
+                 native_resolution=SEGMENTATION_NATIVE_RESOLUTION,
+                 tiled_min_pixels=SEGMENTATION_TILED_MIN_PIXELS):
         """
         세그멘테이션 모델 초기화
+        
+        Args:
+            model_name: SegFormer 모델 이름
+            batch_size: process_batch의 forward 1회당 이미지 수
+            backend: 추론 백엔드 ("torch" 또는 "onnx")
+            quantization: int8 양자화 모드 (None, "dynamic", "static")
+            calibration_dir: static 양자화 보정 이미지 디렉토리
+            native_resolution: True이면 세그멘테이션 맵을 모델 출력 해상도(1/4)로 유지
+            tiled_min_pixels: 이 픽셀 수 이상인 이미지는 타일 단위로 처리 (0이면 사용 안 함)
         """
-        self.processor = SegformerImageProcessor.from_pretrained(model_name)
-        self.model = SegformerForSemanticSegmentation.from_pretrained(model_name)
-        self.model.eval()
-        self.model.to(DEVICE)
+        if backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"지원하지 않는 백엔드: {backend} (지원: {', '.join(SUPPORTED_BACKENDS)})")
+        if quantization is not None and quantization not in SUPPORTED_QUANTIZATION:
+            raise ValueError(f"지원하지 않는 양자화 모드: {quantization} (지원: {', '.join(SUPPORTED_QUANTIZATION)})")
+        if quantization == "static" and (backend != "onnx" or not calibration_dir):
+            raise ValueError("static 양자화는 onnx 백엔드와 보정 이미지 디렉토리(calibration_dir)가 필요합니다")
+        
+        self.model_name = model_name
+        self.quantization = quantization
+        self.native_resolution = native_resolution
+        self.tiled_min_pixels = tiled_min_pixels
+        self.tile_size = SEGMENTATION_TILE_SIZE
+        self.tile_overlap = SEGMENTATION_TILE_OVERLAP
+        self.tile_max_memory_mb = SEGMENTATION_TILE_MAX_MEMORY_MB
+        
+        # --prepare-models로 만든 로컬 저장소가 있으면 허브를 거치지 않고 로드
+        self.local_store = has_local_model(model_name)
+        if not self.local_store and MODEL_OFFLINE:
+            raise ModelStoreError(
+                f"오프라인 모드이지만 로컬 모델 저장소가 없습니다: {model_name} - "
+                f"'python main.py --prepare-models'를 먼저 실행하세요"
+            )
+        if self.local_store:
+            self.processor = load_local_processor(model_name)
+        else:
+            self.processor = SegformerImageProcessor.from_pretrained(model_name)
+        self.model = None
         self.device = DEVICE
+        
+        if backend == "onnx":
+            # 캐시된 ONNX 파일이 없을 때만 PyTorch 모델을 로드하여 변환
+            onnx_path = get_onnx_model_path(model_name)
+            if not onnx_path.exists():
+                export_onnx_model(model_name, self._load_torch_model(), self.processor, onnx_path)
+            if quantization:
+                onnx_path = quantize_onnx_model(onnx_path, quantization, self.processor, calibration_dir)
+            self.backend = OnnxBackend(onnx_path)
+        else:
+            self.model = self._load_torch_model()
+            if quantization == "dynamic":
+                # Linear 레이어 가중치를 int8로 동적 양자화 (CPU 전용)
+                self.model = torch.ao.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            self.model.to(DEVICE)
+            self.backend = TorchBackend(self.model, DEVICE)
+        
+        self.batch_size = max(1, batch_size)
         self.class_map = CLASS_MAP
         self.color_map = COLOR_MAP
+        self.palette = build_palette(self.class_map, self.color_map)
+    
+    def _load_torch_model(self):
+        if self.local_store:
+            # mmap된 safetensors 가중치 (프로세스 간 페이지 공유)
+            return load_local_model(self.model_name)
+        model = SegformerForSemanticSegmentation.from_pretrained(self.model_name)
+        model.eval()
+        return model
     
     def process_image(self, image_path):
         """
@@ -33,20 +353,7 @@ class SegmentationModel:
         Returns:
             tuple: (원본 이미지, numpy 이미지, 세그멘테이션 결과)
         """
-        # 이미지 로드
-        image = Image.open(image_path).convert("RGB")
-        image_np = np.array(image)
-        
-        # 세그멘테이션 수행
-        inputs = self.processor(images=image, return_tensors="pt").to(self.device)
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-        
-        # 결과 처리
-        logits = outputs.logits
-        seg_map = logits.argmax(dim=1)[0].cpu().numpy()
-        
-        return image, image_np, seg_map
+        return self.process_batch([image_path])[0]
     
     def process_image_from_array(self, image_np):
         """
@@ -58,23 +365,374 @@ class SegmentationModel:
         Returns:
             tuple: (PIL 이미지, numpy 이미지, 세그멘테이션 결과)
         """
-        # PIL 이미지로 변환
-        if image_np.shape[2] == 3:  # RGB
-            image = Image.fromarray(image_np)
-        else:  # BGR -> RGB 변환 필요
-            image = Image.fromarray(cv2.cvtColor(image_np, cv2.COLOR_BGR2RGB))
+        return self.process_batch([image_np])[0]
+    
+    def process_batch(self, images, batch_size=None, return_confidence=False):
+        """
+        여러 이미지를 배치 단위로 세그멘테이션 처리
         
-        # 세그멘테이션 수행
-        inputs = self.processor(images=image, return_tensors="pt").to(self.device)
-        with torch.no_grad():
-            outputs = self.model(**inputs)
+        전처리는 전체 이미지에 대해 한 번 수행하고, 모델 forward는
+        batch_size 단위로 수행한다. 세그멘테이션 결과는 uint8 맵으로
+        각 이미지의 원본 해상도로 복원된다 (native_resolution이면 모델 출력 해상도).
+        tiled_min_pixels 이상인 고해상도 이미지는 타일 단위로 따로 처리한다.
+        
+        Args:
+            images: 이미지 파일 경로 또는 numpy 배열 이미지 목록
+            batch_size: forward 1회당 이미지 수 (None이면 설정값 사용)
+            return_confidence: True이면 픽셀별 최대 softmax 확률 맵을 함께 반환
+            
+        Returns:
+            list: 이미지별 (PIL 이미지, numpy 이미지, 세그멘테이션 결과[, 신뢰도 맵]) 목록
+        """
+        if not images:
+            return []
+        return self.run_prepared(self.prepare_batch(images), batch_size, return_confidence)
+    
+    def prepare_batch(self, images):
+        """
+        이미지 로드 및 전처리 (모델 forward 이전 단계 - 별도 스레드에서 미리 실행 가능)
+        
+        Args:
+            images: 이미지 파일 경로 또는 numpy 배열 이미지 목록
+            
+        Returns:
+            dict: 로드된 이미지, 일반(비타일) 처리 대상 인덱스, 전처리된 입력 텐서
+        """
+        # 이미지 로드
+        loaded = [self._load_image(image) for image in images]
+        
+        # 고해상도 이미지는 타일 처리 단계에서 타일별로 전처리
+        regular_indices = [
+            index for index, (_, image_np) in enumerate(loaded)
+            if not self._use_tiling(image_np)
+        ]
+        
+        # 전처리 (일반 이미지 전체 1회)
+        pixel_values = None
+        if regular_indices:
+            inputs = self.processor(images=[loaded[index][0] for index in regular_indices], return_tensors="pt")
+            pixel_values = inputs["pixel_values"]
+        
+        return {"loaded": loaded, "regular_indices": regular_indices, "pixel_values": pixel_values}
+    
+    def run_prepared(self, prepared, batch_size=None, return_confidence=False):
+        """
+        prepare_batch 결과로 모델 forward 및 후처리 수행
+        
+        Args:
+            prepared: prepare_batch 반환값
+            batch_size: forward 1회당 이미지 수 (None이면 설정값 사용)
+            return_confidence: True이면 픽셀별 최대 softmax 확률 맵을 함께 반환
+            
+        Returns:
+            list: 이미지별 (PIL 이미지, numpy 이미지, 세그멘테이션 결과[, 신뢰도 맵]) 목록
+        """
+        batch_size = batch_size or self.batch_size
+        loaded = prepared["loaded"]
+        regular_indices = prepared["regular_indices"]
+        pixel_values = prepared["pixel_values"]
+        results = [None] * len(loaded)
         
-        # 결과 처리
-        logits = outputs.logits
-        seg_map = logits.argmax(dim=1)[0].cpu().numpy()
+        # 고해상도 이미지는 타일 처리
+        regular_set = set(regular_indices)
+        for index, (image, image_np) in enumerate(loaded):
+            if index not in regular_set:
+                results[index] = self._segment_tiled(image, image_np, return_confidence=return_confidence)
         
+        for start in range(0, len(regular_indices), batch_size):
+            # 세그멘테이션 수행
+            logits = self.backend(pixel_values[start:start + batch_size])
+            
+            # 결과 처리 (이미지별 원본 해상도로 복원)
+            for index, image_logits in zip(regular_indices[start:start + batch_size], logits):
+                image, image_np = loaded[index]
+                seg_map = self._logits_to_seg_map(image_logits, image_np.shape[:2])
+                if return_confidence:
+                    confidence = self._confidence_map(image_logits, image_np.shape[:2])
+                    results[index] = (image, image_np, seg_map, confidence)
+                else:
+                    results[index] = (image, image_np, seg_map)
+        
+        return results
+    
+    def process_batch_with_info(self, images, batch_size=None, prepared=None):
+        """
+        process_batch 결과와 함께 이미지별 세그멘테이션 메타데이터 반환
+        
+        Args:
+            images: 이미지 파일 경로 또는 numpy 배열 이미지 목록
+            batch_size: forward 1회당 이미지 수
+            prepared: 미리 실행한 prepare_batch(images) 결과 (None이면 여기서 전처리)
+            
+        Returns:
+            list: 이미지별 ((PIL 이미지, numpy 이미지, 세그멘테이션 결과), 메타데이터) 목록
+        """
+        info = {
+            "tier": "single",
+            "model": self.model_name,
+            "backend": self.backend.name,
+            "quantization": self.quantization,
+            "native_resolution": self.native_resolution
+        }
+        if prepared is None:
+            prepared = self.prepare_batch(images)
+        return [
+            (result, dict(info, tiled=self._use_tiling(result[1])))
+            for result in self.run_prepared(prepared, batch_size)
+        ]
+    
+    def process_image_tiled(self, image, tile_size=None, overlap=None, max_memory_mb=None,
+                            return_confidence=False):
+        """
+        고해상도/파노라마 이미지를 겹치는 타일 단위로 세그멘테이션
+        
+        Args:
+            image: 이미지 파일 경로 또는 numpy 배열 이미지
+            tile_size: 원본 해상도 기준 타일 한 변 (None이면 설정값)
+            overlap: 인접 타일 겹침 폭 (None이면 설정값)
+            max_memory_mb: 로짓 누적 버퍼 최대 크기 (None이면 설정값)
+            return_confidence: True이면 픽셀별 최대 softmax 확률 맵을 함께 반환
+            
+        Returns:
+            tuple: (PIL 이미지, numpy 이미지, 세그멘테이션 결과[, 신뢰도 맵])
+        """
+        image, image_np = self._load_image(image)
+        return self._segment_tiled(image, image_np, tile_size, overlap, max_memory_mb, return_confidence)
+    
+    def _use_tiling(self, image_np):
+        return bool(self.tiled_min_pixels) and image_np.shape[0] * image_np.shape[1] >= self.tiled_min_pixels
+    
+    def _segment_tiled(self, image, image_np, tile_size=None, overlap=None, max_memory_mb=None,
+                       return_confidence=False):
+        """
+        타일 세그멘테이션 본체
+        
+        타일을 행 단위로 스트리밍하며, 현재 타일 행이 덮는 밴드 영역의 로짓만
+        모델 출력 해상도로 누적한다. 다음 타일 행과 겹치지 않는 줄은 즉시
+        argmax로 확정하여 결과 맵에 기록하므로, 누적 버퍼 크기는 이미지 높이와
+        무관하게 (클래스 수 x 타일 높이 x 이미지 너비)로 제한된다. 버퍼가
+        max_memory_mb를 넘는 초광폭 이미지는 작업 해상도를 낮춰 처리한다.
+        """
+        tile_size = tile_size or self.tile_size
+        overlap = self.tile_overlap if overlap is None else overlap
+        max_memory_mb = max_memory_mb or self.tile_max_memory_mb
+        height, width = image_np.shape[:2]
+        num_labels = self.backend.num_labels
+        
+        # SegFormer 출력은 전처리 입력의 1/4 해상도
+        scale = (self.processor.size["height"] // 4) / tile_size
+        
+        # 밴드 버퍼와 이월분(float32 2개 분량)이 한도를 넘으면 작업 해상도 축소
+        band_bytes = 2 * num_labels * tile_size * scale * width * scale * 4
+        budget_bytes = max_memory_mb * 1024 * 1024
+        work_np = image_np
+        if band_bytes > budget_bytes:
+            shrink = budget_bytes / band_bytes
+            work_size = (max(1, int(width * shrink)), max(1, int(height * shrink)))
+            logger.info(f"타일 누적 버퍼가 {max_memory_mb}MB를 초과하여 작업 해상도 축소: {width}x{height} -> {work_size[0]}x{work_size[1]}")
+            work_np = cv2.resize(image_np, work_size, interpolation=cv2.INTER_AREA)
+        work_height, work_width = work_np.shape[:2]
+        
+        out_height = max(1, round(work_height * scale))
+        out_width = max(1, round(work_width * scale))
+        target_size = (out_height, out_width) if self.native_resolution else (height, width)
+        seg_map = np.empty(target_size, dtype=SEG_MAP_DTYPE)
+        confidence_map = np.empty(target_size, dtype=np.float32) if return_confidence else None
+        
+        stride = max(1, tile_size - overlap)
+        row_starts = self._tile_starts(work_height, tile_size, stride)
+        col_starts = self._tile_starts(work_width, tile_size, stride)
+        ramp = overlap * scale
+        
+        carry, carry_weight = None, None
+        for row_index, y0 in enumerate(row_starts):
+            y1 = min(y0 + tile_size, work_height)
+            band_top, band_bottom = round(y0 * scale), round(y1 * scale)
+            band_height = band_bottom - band_top
+            band = torch.zeros(num_labels, band_height, out_width)
+            band_weight = torch.zeros(band_height, out_width)
+            if carry is not None:
+                band[:, :carry.shape[1]] += carry
+                band_weight[:carry.shape[1]] += carry_weight
+            
+            tiles = [(x0, min(x0 + tile_size, work_width)) for x0 in col_starts]
+            for start in range(0, len(tiles), self.batch_size):
+                chunk = tiles[start:start + self.batch_size]
+                inputs = self.processor(images=[work_np[y0:y1, x0:x1] for x0, x1 in chunk], return_tensors="pt")
+                logits = self.backend(inputs["pixel_values"])
+                
+                for (x0, x1), tile_logits in zip(chunk, logits):
+                    ox0, ox1 = round(x0 * scale), round(x1 * scale)
+                    resized = torch.nn.functional.interpolate(
+                        tile_logits.unsqueeze(0).float(), size=(band_height, ox1 - ox0),
+                        mode="bilinear", align_corners=False
+                    )[0]
+                    weight = self._blend_window(band_height, ox1 - ox0, ramp)
+                    band[:, :, ox0:ox1] += resized * weight
+                    band_weight[:, ox0:ox1] += weight
+            
+            # 다음 타일 행과 겹치지 않는 줄 확정
+            if row_index + 1 < len(row_starts):
+                done = round(row_starts[row_index + 1] * scale) - band_top
+            else:
+                done = band_height
+            self._write_tiled_rows(band[:, :done], band_weight[:done], band_top, out_height,
+                                   seg_map, confidence_map)
+            carry = band[:, done:].clone()
+            carry_weight = band_weight[done:].clone()
+            del band, band_weight
+        
+        if return_confidence:
+            return image, image_np, seg_map, confidence_map
         return image, image_np, seg_map
     
+    @staticmethod
+    def _tile_starts(length, tile_size, stride):
+        """한 축의 타일 시작 위치 (마지막 타일은 경계에 맞춤)"""
+        if length <= tile_size:
+            return [0]
+        starts = list(range(0, length - tile_size, stride))
+        starts.append(length - tile_size)
+        return starts
+    
+    @staticmethod
+    def _blend_window(height, width, ramp):
+        """겹침 영역에서 선형으로 감소하는 타일 가중치 (모든 픽셀에서 양수)"""
+        ramp = max(ramp, 1.0)
+        
+        def ramp_1d(length):
+            positions = torch.arange(length, dtype=torch.float32)
+            return torch.clamp(torch.minimum((positions + 1) / ramp, (length - positions) / ramp), max=1.0)
+        
+        return ramp_1d(height)[:, None] * ramp_1d(width)[None, :]
+    
+    def _write_tiled_rows(self, band_logits, band_weight, out_top, out_height, seg_map, confidence_map):
+        """확정된 밴드 줄을 argmax하여 결과 맵에 기록 (원본 해상도 모드면 해당 줄만 업샘플링)"""
+        rows = band_logits.shape[1]
+        if rows == 0:
+            return
+        
+        # 가중치는 픽셀별 양수 스칼라이므로 가중합의 argmax는 가중 평균의 argmax와 같다
+        labels = band_logits.argmax(dim=0).to(torch.uint8).numpy()
+        confidence = None
+        if confidence_map is not None:
+            averaged = band_logits / band_weight.clamp_min(1e-6)
+            confidence = torch.softmax(averaged, dim=0).max(dim=0).values.numpy()
+        
+        if self.native_resolution:
+            seg_map[out_top:out_top + rows] = labels
+            if confidence is not None:
+                confidence_map[out_top:out_top + rows] = confidence
+            return
+        
+        height, width = seg_map.shape
+        full_top = round(out_top * height / out_height)
+        full_bottom = round((out_top + rows) * height / out_height)
+        if full_bottom <= full_top:
+            return
+        seg_map[full_top:full_bottom] = cv2.resize(
+            labels, (width, full_bottom - full_top), interpolation=cv2.INTER_NEAREST
+        )
+        if confidence is not None:
+            confidence_map[full_top:full_bottom] = cv2.resize(
+                confidence, (width, full_bottom - full_top), interpolation=cv2.INTER_LINEAR
+            )
+    
+    def get_cache_signature(self):
+        """
+        세그멘테이션 결과에 영향을 주는 모델 설정 (결과 캐시 키에 사용)
+        
+        Returns:
+            dict: 모델 이름, 백엔드, 양자화, 해상도/타일 옵션
+        """
+        return {
+            "model": self.model_name,
+            "backend": self.backend.name,
+            "quantization": self.quantization,
+            "native_resolution": self.native_resolution,
+            "tiled_min_pixels": self.tiled_min_pixels,
+            "tile": [self.tile_size, self.tile_overlap, self.tile_max_memory_mb]
+        }
+    
+    def _load_image(self, image):
+        """
+        파일 경로 또는 numpy 배열을 (PIL 이미지, numpy 이미지)로 변환
+        """
+        if isinstance(image, np.ndarray):
+            image_np = image
+            if image_np.shape[2] == 3:  # RGB
+                return Image.fromarray(image_np), image_np
+            # BGR -> RGB 변환 필요
+            return Image.fromarray(cv2.cvtColor(image_np, cv2.COLOR_BGR2RGB)), image_np
+        
+        image = Image.open(image).convert("RGB")
+        return image, np.array(image)
+    
+    def _logits_to_seg_map(self, logits, size):
+        """
+        단일 이미지 로짓을 원본 해상도로 보간한 뒤 클래스 맵으로 변환
+        
+        보간 버퍼가 tile_max_memory_mb를 넘는 고해상도 이미지는 가로 밴드 단위로 처리하여
+        메모리 사용량을 (클래스 수 x 밴드 높이 x 너비)로 제한한다.
+        
+        Args:
+            logits: (클래스 수, H/4, W/4) 로짓 텐서
+            size: 원본 이미지 (높이, 너비)
+            
+        Returns:
+            numpy array: uint8 세그멘테이션 맵 (native_resolution이면 모델 출력 해상도)
+        """
+        if self.native_resolution:
+            return logits.argmax(dim=0).to(torch.uint8).cpu().numpy()
+        
+        # 전체 보간 버퍼(클래스 수 x 높이 x 너비 float32)가 한도 안이면 한 번에 보간
+        num_labels, logit_height, logit_width = logits.shape
+        height, width = size
+        band_rows = max(1, self.tile_max_memory_mb * 1024 * 1024 // (num_labels * width * 4))
+        if band_rows >= height:
+            upsampled = torch.nn.functional.interpolate(
+                logits.unsqueeze(0), size=size, mode="bilinear", align_corners=False
+            )
+            return upsampled.argmax(dim=1)[0].to(torch.uint8).cpu().numpy()
+        
+        # 고해상도 이미지는 가로 밴드 단위로 보간/argmax하여 미리 할당한 uint8 맵에 기록
+        # (12MP 이미지를 한 번에 보간하면 이미지 한 장에 약 7GB)
+        # 세로 보간 좌표는 interpolate(bilinear, align_corners=False)와 같은 규칙으로 계산
+        logits = logits.float()
+        source_rows = ((torch.arange(height, dtype=torch.float32) + 0.5) * (logit_height / height) - 0.5).clamp_min(0)
+        top_rows = source_rows.long().clamp_max(logit_height - 1)
+        bottom_rows = (top_rows + 1).clamp_max(logit_height - 1)
+        bottom_weights = (source_rows - top_rows)[:, None]
+        
+        seg_map = np.empty(size, dtype=SEG_MAP_DTYPE)
+        for start in range(0, height, band_rows):
+            stop = min(start + band_rows, height)
+            weights = bottom_weights[start:stop]
+            rows = logits[:, top_rows[start:stop]] * (1 - weights) + logits[:, bottom_rows[start:stop]] * weights
+            band = torch.nn.functional.interpolate(
+                rows.unsqueeze(0), size=(stop - start, width), mode="bilinear", align_corners=False
+            )
+            seg_map[start:stop] = band.argmax(dim=1)[0].to(torch.uint8).cpu().numpy()
+        return seg_map
+    
+    def _confidence_map(self, logits, size):
+        """
+        픽셀별 최대 softmax 확률 맵 계산
+        
+        softmax는 모델 출력 해상도(1/4)에서 계산하고 결과만 세그멘테이션 맵 해상도로 보간한다.
+        
+        Args:
+            logits: (클래스 수, H/4, W/4) 로짓 텐서
+            size: 원본 이미지 (높이, 너비)
+            
+        Returns:
+            numpy array: float32 신뢰도 맵
+        """
+        confidence = torch.softmax(logits.float(), dim=0).max(dim=0).values.cpu().numpy()
+        if self.native_resolution:
+            return confidence
+        return cv2.resize(confidence, (size[1], size[0]), interpolation=cv2.INTER_LINEAR)
+    
     def create_overlay(self, image_np, seg_map, alpha=0.5):
         """
         세그멘테이션 결과를 오버레이하여 시각화
@@ -87,16 +745,13 @@ class SegmentationModel:
         Returns:
             numpy array: 오버레이된 이미지
         """
-        # 클래스 ID별 색상 매핑
-        color_map_img = np.zeros((seg_map.shape[0], seg_map.shape[1], 3), dtype=np.uint8)
-        
-        for class_name, class_id in self.class_map.items():
-            if class_name in self.color_map:
-                color_map_img[seg_map == class_id] = self.color_map[class_name]
-        
-        # 원본 이미지 크기로 리사이즈
+        # 원본 이미지 크기로 리사이즈 (1채널 클래스 맵에서 최근접 보간)
         h, w = image_np.shape[:2]
-        color_map_resized = cv2.resize(color_map_img, (w, h), interpolation=cv2.INTER_NEAREST)
+        if seg_map.shape[:2] != (h, w):
+            seg_map = cv2.resize(seg_map.astype(SEG_MAP_DTYPE), (w, h), interpolation=cv2.INTER_NEAREST)
+        
+        # 팔레트 조회 한 번으로 클래스 ID별 색상 매핑
+        color_map_resized = self.palette[seg_map]
         
         # 오버레이 적용
         blended = cv2.addWeighted(image_np, 1 - alpha, color_map_resized, alpha, 0)
@@ -109,12 +764,13 @@ class SegmentationModel:
         
         Args:
             blended_image: 오버레이된 이미지
-            output_path: 저장 경로
+            output_path: 저장 경로 (확장자에 따라 PNG/JPEG/WebP로 인코딩)
             
         Returns:
             bool: 저장 성공 여부
         """
-        return cv2.imwrite(output_path, cv2.cvtColor(blended_image, cv2.COLOR_RGB2BGR))
+        params = OVERLAY_ENCODE_PARAMS.get(os.path.splitext(output_path)[1].lower(), [])
+        return cv2.imwrite(output_path, cv2.cvtColor(blended_image, cv2.COLOR_RGB2BGR), params)
     
     def get_class_map(self):
         """
@@ -123,4 +779,261 @@ class SegmentationModel:
         Returns:
             dict: 클래스 매핑 정보
         """
-        return self.class_map
\ No newline at end of file
+        return self.class_map
+
+
+class CascadeSegmentationModel:
+    """
+    캐스케이드 세그멘테이션 - 경량 모델 결과가 애매한 이미지만 정밀 모델로 승급
+    """
+    
+    def __init__(self, fast_model, accurate_model, class_names=CASCADE_CLASSES,
+                 confidence_threshold=CASCADE_CONFIDENCE_THRESHOLD,
+                 threshold_margin=CASCADE_THRESHOLD_MARGIN,
+                 decision_thresholds=CASCADE_DECISION_THRESHOLDS):
+        """
+        캐스케이드 모델 초기화
+        
+        Args:
+            fast_model: 1단계 경량 SegmentationModel (예: SegFormer-B0)
+            accurate_model: 2단계 정밀 SegmentationModel (SEGFORMER_MODEL)
+            class_names: 승급 여부를 판단할 클래스 이름 목록
+            confidence_threshold: 클래스 평균 신뢰도 하한
+            threshold_margin: 판정 임계값 근접 여부를 판단할 상대 오차
+            decision_thresholds: 클래스별 면적 비율 판정 임계값
+        """
+        self.fast_model = fast_model
+        self.accurate_model = accurate_model
+        self.class_map = accurate_model.class_map
+        self.color_map = accurate_model.color_map
+        self.batch_size = accurate_model.batch_size
+        self.class_names = [name for name in class_names if name in self.class_map]
+        self.confidence_threshold = confidence_threshold
+        self.threshold_margin = threshold_margin
+        self.decision_thresholds = decision_thresholds
+        self.total_count = 0
+        self.escalated_count = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def escalation_rate(self):
+        """지금까지 처리한 이미지 중 정밀 모델로 승급된 비율"""
+        return self.escalated_count / self.total_count if self.total_count else 0.0
+    
+    def process_image(self, image_path):
+        """
+        단일 이미지 캐스케이드 세그멘테이션
+        
+        Returns:
+            tuple: (원본 이미지, numpy 이미지, 세그멘테이션 결과)
+        """
+        return self.process_batch([image_path])[0]
+    
+    def process_image_from_array(self, image_np):
+        """
+        numpy 배열 이미지 캐스케이드 세그멘테이션
+        
+        Returns:
+            tuple: (PIL 이미지, numpy 이미지, 세그멘테이션 결과)
+        """
+        return self.process_batch([image_np])[0]
+    
+    def process_batch(self, images, batch_size=None):
+        """
+        캐스케이드 세그멘테이션 (SegmentationModel.process_batch와 동일한 반환 형식)
+        """
+        return [result for result, _ in self.process_batch_with_info(images, batch_size)]
+    
+    def prepare_batch(self, images):
+        """
+        1단계 경량 모델 기준 이미지 로드 및 전처리 (별도 스레드에서 미리 실행 가능)
+        
+        Args:
+            images: 이미지 파일 경로 또는 numpy 배열 이미지 목록
+            
+        Returns:
+            dict: 경량 모델의 prepare_batch 결과
+        """
+        return self.fast_model.prepare_batch(images)
+    
+    def process_batch_with_info(self, images, batch_size=None, prepared=None):
+        """
+        캐스케이드 세그멘테이션 수행 후 이미지별 처리 단계(tier) 정보 반환
+        
+        Args:
+            images: 이미지 파일 경로 또는 numpy 배열 이미지 목록
+            batch_size: forward 1회당 이미지 수
+            prepared: 미리 실행한 prepare_batch(images) 결과 (None이면 여기서 전처리)
+            
+        Returns:
+            list: 이미지별 ((PIL 이미지, numpy 이미지, 세그멘테이션 결과), 메타데이터) 목록
+        """
+        if prepared is None:
+            prepared = self.fast_model.prepare_batch(images)
+        fast_results = self.fast_model.run_prepared(prepared, batch_size, return_confidence=True)
+        
+        outputs = []
+        escalate_indices = []
+        for index, (image, image_np, seg_map, confidence) in enumerate(fast_results):
+            reasons = self._escalation_reasons(seg_map, confidence)
+            info = {
+                "tier": "fast",
+                "model": self.fast_model.model_name,
+                "backend": self.fast_model.backend.name,
+                "quantization": self.fast_model.quantization,
+                "native_resolution": self.fast_model.native_resolution,
+                "escalation_reasons": reasons
+            }
+            outputs.append(((image, image_np, seg_map), info))
+            if reasons:
+                escalate_indices.append(index)
+        
+        if escalate_indices:
+            # 이미 디코딩한 이미지 배열을 재사용하여 정밀 모델 실행
+            accurate_results = self.accurate_model.process_batch(
+                [outputs[index][0][1] for index in escalate_indices], batch_size
+            )
+            for index, (_, _, seg_map) in zip(escalate_indices, accurate_results):
+                (image, image_np, _), info = outputs[index]
+                info.update({
+                    "tier": "accurate",
+                    "model": self.accurate_model.model_name,
+                    "backend": self.accurate_model.backend.name,
+                    "quantization": self.accurate_model.quantization,
+                    "native_resolution": self.accurate_model.native_resolution
+                })
+                outputs[index] = ((image, image_np, seg_map), info)
+        
+        self.record_tiers([info for _, info in outputs])
+        return outputs
+    
+    def record_tiers(self, infos):
+        """
+        처리 단계(tier)를 승급 통계에 반영하고 현재 승급 비율을 메타데이터에 기록
+        
+        캐시에서 읽은 결과도 같은 통계에 포함되도록 캐시 적중 시에도 호출한다.
+        
+        Args:
+            infos: 이미지별 메타데이터 목록 ("tier" 포함, escalation_rate가 갱신됨)
+            
+        Returns:
+            float: 갱신된 승급 비율
+        """
+        with self._lock:
+            self.total_count += len(infos)
+            self.escalated_count += sum(info.get("tier") == "accurate" for info in infos)
+            escalation_rate = self.escalation_rate
+        for info in infos:
+            info["escalation_rate"] = round(escalation_rate, 4)
+        return escalation_rate
+    
+    def get_cache_signature(self):
+        """
+        캐스케이드 결과에 영향을 주는 설정 (두 모델 설정과 승급 기준)
+        
+        Returns:
+            dict: 결과 캐시 키에 사용할 설정
+        """
+        return {
+            "cascade": [self.fast_model.get_cache_signature(), self.accurate_model.get_cache_signature()],
+            "class_names": self.class_names,
+            "confidence_threshold": self.confidence_threshold,
+            "threshold_margin": self.threshold_margin,
+            "decision_thresholds": self.decision_thresholds
+        }
+    
+    def _escalation_reasons(self, seg_map, confidence):
+        """
+        경량 모델 결과에서 정밀 모델 승급 사유 판단
+        
+        접근성 클래스가 존재하지만 평균 신뢰도가 낮거나, 면적 비율이
+        AccessibilityAnalyzer 판정 임계값에 가까운 경우 승급한다.
+        
+        Returns:
+            list: 승급 사유 목록 (비어 있으면 경량 모델 결과 사용)
+        """
+        reasons = []
+        total_pixels = seg_map.size
+        for class_name in self.class_names:
+            class_mask = seg_map == self.class_map[class_name]
+            pixel_count = np.count_nonzero(class_mask)
+            if pixel_count == 0:
+                continue
+            
+            if float(confidence[class_mask].mean()) < self.confidence_threshold:
+                reasons.append(f"{class_name}_low_confidence")
+            
+            ratio = pixel_count / total_pixels
+            for threshold in self.decision_thresholds.get(class_name, []):
+                if abs(ratio - threshold) <= threshold * self.threshold_margin:
+                    reasons.append(f"{class_name}_near_threshold")
+                    break
+        
+        return reasons
+    
+    def create_overlay(self, image_np, seg_map, alpha=0.5):
+        """세그멘테이션 결과 오버레이 (두 단계 모두 ADE20K 클래스 체계를 공유)"""
+        return self.accurate_model.create_overlay(image_np, seg_map, alpha)
+    
+    def save_overlay(self, blended_image, output_path):
+        """오버레이 이미지 저장"""
+        return self.accurate_model.save_overlay(blended_image, output_path)
+    
+    def get_class_map(self):
+        """클래스 매핑 정보 반환"""
+        return self.class_map
+
+
+class LazyOverlay:
+    """
+    필요할 때만 렌더링되는 오버레이 이미지
+    
+    os.fspath()나 path 속성으로 경로를 요청하는 시점(LLM 분석, API 전송 등)에
+    처음 한 번만 오버레이를 생성하여 저장한다.
+    """
+    
+    def __init__(self, segmentation_model, image_np, seg_map, output_path, alpha=0.5):
+        """
+        Args:
+            segmentation_model: create_overlay/save_overlay를 제공하는 세그멘테이션 모델
+            image_np: numpy 형식의 원본 이미지
+            seg_map: 세그멘테이션 맵
+            output_path: 오버레이 저장 경로 (확장자로 인코딩 형식 결정)
+            alpha: 오버레이 투명도 (0-1)
+        """
+        self.segmentation_model = segmentation_model
+        self.image_np = image_np
+        self.seg_map = seg_map
+        self.output_path = output_path
+        self.alpha = alpha
+        self.rendered = False
+        self._lock = threading.Lock()
+    
+    def render(self):
+        """
+        오버레이를 생성하여 저장 (이미 저장된 경우 생략)
+        
+        Returns:
+            str: 오버레이 이미지 경로
+        """
+        with self._lock:
+            if not self.rendered:
+                logger.info("Creating overlay image...")
+                blended, _ = self.segmentation_model.create_overlay(self.image_np, self.seg_map, self.alpha)
+                if not self.segmentation_model.save_overlay(blended, self.output_path):
+                    raise IOError(f"오버레이 저장 실패: {self.output_path}")
+                self.rendered = True
+                # 렌더링 후에는 원본 배열을 붙잡고 있을 필요가 없음
+                self.image_np = None
+                self.seg_map = None
+        return self.output_path
+    
+    @property
+    def path(self):
+        return self.render()
+    
+    def __fspath__(self):
+        return self.render()
+    
+    def __repr__(self):
+        return f"LazyOverlay({self.output_path!r}, rendered={self.rendered})"
@@ -0,0 +1,327 @@
+"""
+세그멘테이션 결과 캐시 - 이미지 내용 해시와 모델 설정을 키로 세그멘테이션 맵을 디스크에 저장
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from config import (
+    SEGMENTATION_CACHE_ENABLED, SEGMENTATION_CACHE_DIR, SEGMENTATION_CACHE_MAX_MB,
+    CACHE_EXPIRY_SECONDS
+)
+from modules.utils import logger
+
+CACHE_FILE_SUFFIX = ".npz"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 처리 시점의 누적 통계라서 캐시에 저장하지 않는 메타데이터 항목
+RUNTIME_INFO_KEYS = ("escalation_rate",)
+
+
+def hash_image_file(image_path):
+    """
+    이미지 파일 내용의 SHA-256 해시 계산
+
+    Args:
+        image_path: 이미지 파일 경로
+
+    Returns:
+        str: 16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SegmentationCache:
+    def __init__(self, cache_dir=SEGMENTATION_CACHE_DIR, max_mb=SEGMENTATION_CACHE_MAX_MB,
+                 expiry_seconds=CACHE_EXPIRY_SECONDS):
+        """
+        세그멘테이션 결과 캐시 초기화
+
+        Args:
+            cache_dir: 캐시 파일 저장 디렉토리
+            max_mb: 캐시 전체 최대 크기 (MB, 초과 시 LRU 삭제)
+            expiry_seconds: 항목 만료 시간 (초, None이면 만료 없음)
+        """
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_mb * 1024 * 1024
+        self.expiry_seconds = expiry_seconds
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0}
+        self._lock = threading.Lock()
+        self._entries = None  # 키 -> 파일 크기 (마지막 사용 순서)
+        self._total_bytes = 0
+
+    def make_key(self, image_path, signature):
+        """
+        캐시 키 생성 (이미지 내용 해시 + 모델 설정)
+
+        Args:
+            image_path: 이미지 파일 경로
+            signature: 모델의 get_cache_signature() 결과
+
+        Returns:
+            str: 캐시 키
+        """
+        digest = hashlib.sha256(hash_image_file(image_path).encode())
+        digest.update(json.dumps(signature, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_FILE_SUFFIX)
+
+    def _load_index(self):
+        """디스크의 캐시 파일을 마지막 사용 시각 순으로 색인 (최초 1회)"""
+        if self._entries is not None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(CACHE_FILE_SUFFIX):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-len(CACHE_FILE_SUFFIX)], stat.st_size))
+        files.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in files)
+        self._total_bytes = sum(self._entries.values())
+
+    def _remove(self, key):
+        size = self._entries.pop(key, 0)
+        self._total_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def get(self, key):
+        """
+        캐시된 세그멘테이션 맵 조회
+
+        Args:
+            key: 캐시 키
+
+        Returns:
+            tuple: (세그멘테이션 맵, 메타데이터) 또는 None (캐시 미스)
+        """
+        with self._lock:
+            self._load_index()
+            if key not in self._entries:
+                self.stats["misses"] += 1
+                return None
+
+            try:
+                with np.load(self._path(key)) as data:
+                    seg_map = data["seg_map"]
+                    info = json.loads(str(data["info"]))
+                    created_at = float(data["created_at"])
+            except (OSError, KeyError, ValueError) as e:
+                # 다른 프로세스가 삭제했거나 손상된 파일
+                logger.warning(f"세그멘테이션 캐시 항목 읽기 실패: {key} - {str(e)}")
+                self._remove(key)
+                self.stats["misses"] += 1
+                return None
+
+            if self.expiry_seconds is not None and time.time() - created_at > self.expiry_seconds:
+                self._remove(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            # LRU 순서 갱신 (재시작 후에도 유지되도록 파일 수정 시각도 갱신)
+            self._entries.move_to_end(key)
+            os.utime(self._path(key))
+            self.stats["hits"] += 1
+            return seg_map, info
+
+    def put(self, key, seg_map, info=None):
+        """
+        세그멘테이션 맵을 압축하여 저장하고 크기 한도를 넘으면 LRU 삭제
+
+        Args:
+            key: 캐시 키
+            seg_map: 세그멘테이션 맵
+            info: 세그멘테이션 메타데이터
+        """
+        with self._lock:
+            self._load_index()
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(
+                    f, seg_map=seg_map, info=json.dumps(info or {}, ensure_ascii=False),
+                    created_at=time.time()
+                )
+            os.replace(tmp_path, path)
+
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = os.path.getsize(path)
+            self._total_bytes += self._entries[key]
+            self.stats["writes"] += 1
+
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.stats["evictions"] += 1
+
+    def get_stats(self):
+        """
+        캐시 적중/미스 통계 반환
+
+        Returns:
+            dict: 적중률, 항목 수, 디스크 사용량 등
+        """
+        with self._lock:
+            self._load_index()
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(
+                self.stats,
+                hit_rate=round(self.stats["hits"] / lookups, 4) if lookups else None,
+                entries=len(self._entries),
+                size_mb=round(self._total_bytes / (1024 * 1024), 2)
+            )
+
+    def clear(self):
+        """
+        캐시 전체 삭제
+
+        Returns:
+            int: 삭제된 항목 수
+        """
+        with self._lock:
+            self._load_index()
+            keys = list(self._entries)
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+
+def segment_with_cache(segmentation_model, image_files, cache=None):
+    """
+    캐시를 먼저 조회하고, 캐시에 없는 이미지만 모아서 배치 세그멘테이션
+
+    Args:
+        segmentation_model: SegmentationModel 또는 CascadeSegmentationModel
+        image_files: 이미지 파일 경로 목록
+        cache: SegmentationCache (None이면 전역 캐시, 비활성화 시 캐시 없이 처리)
+
+    Returns:
+        list: process_batch_with_info와 같은 형식의 ((이미지, numpy 이미지, 세그멘테이션 맵), 메타데이터) 목록
+    """
+    return complete_with_cache(segmentation_model, prepare_with_cache(segmentation_model, image_files, cache))
+
+
+def prepare_with_cache(segmentation_model, image_files, cache=None):
+    """
+    캐시 조회 후 캐시에 없는 이미지만 로드/전처리 (모델 forward 이전 단계 - prefetch 스레드에서 실행 가능)
+
+    Args:
+        segmentation_model: SegmentationModel 또는 CascadeSegmentationModel
+        image_files: 이미지 파일 경로 목록
+        cache: SegmentationCache (None이면 전역 캐시, 비활성화 시 캐시 없이 처리)
+
+    Returns:
+        dict: 캐시 적중 결과와 캐시 미스 이미지의 prepare_batch 결과
+    """
+    cache = cache or get_segmentation_cache()
+    results = [None] * len(image_files)
+    keys = [None] * len(image_files)
+    missed = list(range(len(image_files)))
+
+    if cache is not None:
+        signature = segmentation_model.get_cache_signature()
+        keys = [cache.make_key(image_file, signature) for image_file in image_files]
+        missed = []
+        for index, (image_file, key) in enumerate(zip(image_files, keys)):
+            cached = cache.get(key)
+            if cached is None:
+                missed.append(index)
+                continue
+            seg_map, info = cached
+            image = Image.open(image_file).convert("RGB")
+            results[index] = ((image, np.array(image), seg_map), dict(info, cache="hit"))
+
+        # 캐스케이드 모델은 캐시 적중 결과도 단계별 통계에 반영하고 현재 승급 비율을 기록
+        hit_infos = [result[1] for result in results if result is not None]
+        if hit_infos and hasattr(segmentation_model, "record_tiers"):
+            segmentation_model.record_tiers(hit_infos)
+
+    missed_files = [image_files[index] for index in missed]
+    return {
+        "cache": cache,
+        "image_files": image_files,
+        "results": results,
+        "keys": keys,
+        "missed": missed,
+        "prepared": segmentation_model.prepare_batch(missed_files) if missed_files else None
+    }
+
+
+def complete_with_cache(segmentation_model, pending):
+    """
+    prepare_with_cache 결과 중 캐시 미스 이미지를 세그멘테이션하고 캐시에 저장
+
+    Args:
+        segmentation_model: prepare_with_cache에 사용한 모델
+        pending: prepare_with_cache 반환값
+
+    Returns:
+        list: ((이미지, numpy 이미지, 세그멘테이션 맵), 메타데이터) 목록
+    """
+    cache = pending["cache"]
+    results = pending["results"]
+    missed = pending["missed"]
+    if not missed:
+        return results
+
+    segmented = segmentation_model.process_batch_with_info(
+        [pending["image_files"][index] for index in missed], prepared=pending["prepared"]
+    )
+    for index, (segmentation, info) in zip(missed, segmented):
+        if cache is None:
+            results[index] = (segmentation, info)
+            continue
+        cache.put(pending["keys"][index], segmentation[2], _cacheable_info(info))
+        results[index] = (segmentation, dict(info, cache="miss"))
+
+    return results
+
+
+def _cacheable_info(info):
+    """
+    실행 시점마다 달라지는 항목을 뺀 캐시 저장용 메타데이터
+
+    Args:
+        info: 세그멘테이션 메타데이터
+
+    Returns:
+        dict: RUNTIME_INFO_KEYS를 제외한 메타데이터
+    """
+    return {key: value for key, value in info.items() if key not in RUNTIME_INFO_KEYS}
+
+
+# 프로세스 전역 캐시
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_segmentation_cache():
+    """
+    프로세스 전역 세그멘테이션 캐시 반환
+
+    Returns:
+        SegmentationCache: 캐시 인스턴스 (SEGMENTATION_CACHE_ENABLED가 False이면 None)
+    """
+    global _cache
+    if not SEGMENTATION_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SegmentationCache()
+        return _cache
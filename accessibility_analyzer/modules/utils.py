@@ -8,15 +8,8 @@ import time
 import logging
 from datetime import datetime
 from pathlib import Path
-import cv2
-import numpy as np
-from PIL import Image
-try:
-    from PIL.ExifTags import TAGS, GPSTAGS
-except ImportError:
-    TAGS, GPSTAGS = {}, {}
 
-from config import REPORTS_DIR, OVERLAY_DIR
+from config import REPORTS_DIR, OVERLAY_DIR, OVERLAY_FORMAT
 
 # 로깅 설정
 logging.basicConfig(
@@ -62,7 +55,7 @@ def generate_output_paths(image_path, base_dir=None):
     os.makedirs(report_dir, exist_ok=True)
     
     return {
-        "overlay": os.path.join(overlay_dir, f"{file_name}_overlay_{timestamp}.png"),
+        "overlay": os.path.join(overlay_dir, f"{file_name}_overlay_{timestamp}.{OVERLAY_FORMAT}"),
         "report": os.path.join(report_dir, f"{file_name}_report_{timestamp}.json")
     }
 
@@ -105,6 +98,12 @@ def extract_location_from_image(image_path):
         "faclNm": None
     }
     
+    from PIL import Image
+    try:
+        from PIL.ExifTags import TAGS, GPSTAGS
+    except ImportError:
+        TAGS, GPSTAGS = {}, {}
+    
     try:
         # 이미지 메타데이터에서 GPS 정보 추출 시도
         image = Image.open(image_path)
@@ -189,6 +188,8 @@ def resize_image(image_path, max_size=1024):
     Returns:
         numpy.ndarray: 크기 조정된 이미지
     """
+    import cv2
+    
     img = cv2.imread(image_path)
     
     if img is None:
@@ -255,6 +256,8 @@ def validate_image(image_path):
     Returns:
         bool: 유효한 이미지 파일 여부
     """
+    from PIL import Image
+    
     try:
         img = Image.open(image_path)
         img.verify()
@@ -273,6 +276,8 @@ def get_image_dimensions(image_path):
     Returns:
         tuple: (너비, 높이) 또는 None (에러 시)
     """
+    from PIL import Image
+    
     try:
         with Image.open(image_path) as img:
             return img.size
@@ -0,0 +1,294 @@
+"""
+동영상/프레임 시퀀스 분석 - 입구 접근로 촬영 영상을 프레임 단위로 스트리밍하며 키프레임만 세그멘테이션
+
+직전 키프레임과 비교한 화면 변화가 임계값보다 작은 프레임은 모델을 실행하지 않고,
+키프레임의 세그멘테이션 맵을 그대로 쓰거나(reuse) 카메라 이동만큼 평행 이동하여(shift) 사용한다.
+접근성 분석은 키프레임마다 한 번 수행하고, 각 키프레임이 대표하는 프레임 수를 가중치로
+장소 단위 결과 하나로 합친다.
+"""
+import os
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from config import (
+    VIDEO_CHANGE_THRESHOLD, VIDEO_MAX_KEYFRAME_GAP, VIDEO_PROPAGATION, VIDEO_FRAME_STEP,
+    VIDEO_THUMBNAIL_WIDTH, VIDEO_MAX_SHIFT_FRACTION, VIDEO_DETECTION_MIN_FRACTION
+)
+from modules.utils import get_image_files_in_directory, logger
+
+SUPPORTED_PROPAGATION = ("reuse", "shift")
+SEVERITY_ORDER = ["none", "mild", "moderate", "severe"]
+# 장소 단위로 "감지됨" 여부를 판단할 플래그 (가중 프레임 비율이 VIDEO_DETECTION_MIN_FRACTION 이상)
+DETECTION_FLAGS = ["has_stairs", "has_ramp", "has_door", "has_sidewalk", "has_building", "has_railing", "has_stairs_railing"]
+
+
+def iter_frames(source, frame_step=VIDEO_FRAME_STEP):
+    """
+    동영상 파일 또는 이미지 프레임 디렉토리에서 프레임을 하나씩 읽기 (전체를 메모리에 올리지 않음)
+
+    Args:
+        source: 동영상 파일 경로 또는 프레임 이미지 디렉토리 (파일명 순서)
+        frame_step: N프레임마다 하나씩 사용
+
+    Yields:
+        tuple: (프레임 번호, 시각(초, 디렉토리는 None), RGB numpy 이미지)
+    """
+    frame_step = max(1, frame_step)
+
+    if os.path.isdir(source):
+        for index, frame_path in enumerate(sorted(get_image_files_in_directory(source))):
+            if index % frame_step:
+                continue
+            frame = cv2.imread(frame_path, cv2.IMREAD_COLOR)
+            if frame is None:
+                logger.warning(f"프레임 읽기 실패, 건너뜀: {frame_path}")
+                continue
+            yield index, None, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return
+
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError(f"동영상을 열 수 없습니다: {source}")
+    try:
+        index = 0
+        while True:
+            # 사용하지 않는 프레임은 디코딩 없이 건너뜀
+            if index % frame_step:
+                if not capture.grab():
+                    break
+                index += 1
+                continue
+            ok, frame = capture.read()
+            if not ok:
+                break
+            timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+            yield index, round(timestamp, 3), cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            index += 1
+    finally:
+        capture.release()
+
+
+class VideoAnalyzer:
+    def __init__(self, segmentation_model, analyzer, change_threshold=VIDEO_CHANGE_THRESHOLD,
+                 max_keyframe_gap=VIDEO_MAX_KEYFRAME_GAP, propagation=VIDEO_PROPAGATION,
+                 frame_step=VIDEO_FRAME_STEP):
+        """
+        프레임 시퀀스 분석기 초기화
+
+        Args:
+            segmentation_model: SegmentationModel 또는 CascadeSegmentationModel
+            analyzer: AccessibilityAnalyzer
+            change_threshold: 키프레임 대비 평균 밝기 변화(0~1)가 이 값 이상이면 새 키프레임
+            max_keyframe_gap: 변화가 작아도 이 프레임 수마다 새 키프레임
+            propagation: "reuse" (키프레임 맵 그대로) 또는 "shift" (카메라 이동만큼 평행 이동)
+            frame_step: N프레임마다 하나씩 사용
+        """
+        if propagation not in SUPPORTED_PROPAGATION:
+            raise ValueError(f"Unsupported propagation: {propagation} (supported: {SUPPORTED_PROPAGATION})")
+        self.segmentation_model = segmentation_model
+        self.analyzer = analyzer
+        self.change_threshold = change_threshold
+        self.max_keyframe_gap = max(1, max_keyframe_gap)
+        self.propagation = propagation
+        self.frame_step = frame_step
+
+    @staticmethod
+    def _thumbnail(frame):
+        """변화량 계산용 축소 흑백 이미지"""
+        height, width = frame.shape[:2]
+        thumb_height = max(1, round(height * VIDEO_THUMBNAIL_WIDTH / width))
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        return cv2.resize(gray, (VIDEO_THUMBNAIL_WIDTH, thumb_height), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+    def _measure_change(self, key_thumb, thumb):
+        """
+        키프레임 대비 변화량과 카메라 이동량 계산
+
+        Returns:
+            tuple: (평균 밝기 변화 0~1, (dx, dy) 축소 이미지 기준 이동량)
+        """
+        # 카메라가 크게 움직이면 두 방식 모두 새 키프레임
+        (dx, dy), _ = cv2.phaseCorrelate(key_thumb, thumb)
+        height, width = thumb.shape
+        if abs(dx) > width * VIDEO_MAX_SHIFT_FRACTION or abs(dy) > height * VIDEO_MAX_SHIFT_FRACTION:
+            return 1.0, (dx, dy)
+        if self.propagation == "reuse":
+            return float(np.mean(np.abs(thumb - key_thumb))) / 255, (0.0, 0.0)
+
+        # 이동을 보정한 뒤 겹치는 영역에서만 변화량 측정
+        aligned = cv2.warpAffine(key_thumb, np.float32([[1, 0, dx], [0, 1, dy]]), (width, height))
+        x0, x1 = int(np.ceil(max(0, dx))), int(np.floor(min(width, width + dx)))
+        y0, y1 = int(np.ceil(max(0, dy))), int(np.floor(min(height, height + dy)))
+        if x1 <= x0 or y1 <= y0:
+            return 1.0, (dx, dy)
+        change = np.mean(np.abs(thumb[y0:y1, x0:x1] - aligned[y0:y1, x0:x1])) / 255
+        return float(change), (dx, dy)
+
+    @staticmethod
+    def _shift_seg_map(seg_map, shift, scale):
+        """키프레임 세그멘테이션 맵을 카메라 이동량만큼 평행 이동 (가장자리는 복제, scale은 축별 (x, y) 배율)"""
+        dx, dy = shift[0] * scale[0], shift[1] * scale[1]
+        if abs(dx) < 0.5 and abs(dy) < 0.5:
+            return seg_map
+        height, width = seg_map.shape
+        return cv2.warpAffine(
+            seg_map, np.float32([[1, 0, dx], [0, 1, dy]]), (width, height),
+            flags=cv2.INTER_NEAREST, borderMode=cv2.BORDER_REPLICATE
+        )
+
+    def iter_segmentations(self, source):
+        """
+        프레임마다 세그멘테이션 맵 반환 (키프레임만 모델 실행)
+
+        Args:
+            source: 동영상 파일 경로 또는 프레임 이미지 디렉토리
+
+        Yields:
+            dict: frame_index, timestamp, frame, seg_map, keyframe_index, is_keyframe, change
+        """
+        key_thumb = None
+        key_seg_map = None
+        key_index = None
+        frames_since_key = 0
+
+        for frame_index, timestamp, frame in iter_frames(source, self.frame_step):
+            thumb = self._thumbnail(frame)
+            if key_thumb is not None and thumb.shape == key_thumb.shape:
+                change, shift = self._measure_change(key_thumb, thumb)
+            else:
+                change, shift = 1.0, (0.0, 0.0)
+
+            is_keyframe = (
+                key_seg_map is None or change >= self.change_threshold
+                or frames_since_key >= self.max_keyframe_gap
+            )
+            if is_keyframe:
+                _, _, seg_map = self.segmentation_model.process_image_from_array(frame)
+                key_thumb, key_seg_map, key_index = thumb, seg_map, frame_index
+                frames_since_key = 0
+            else:
+                # 저해상도 맵(SEGMENTATION_NATIVE_RESOLUTION)도 맵 크기 기준으로 이동량 환산
+                # (축소 이미지 높이는 반올림되므로 가로/세로 배율을 따로 계산)
+                scale = (key_seg_map.shape[1] / key_thumb.shape[1], key_seg_map.shape[0] / key_thumb.shape[0])
+                seg_map = self._shift_seg_map(key_seg_map, shift, scale)
+            frames_since_key += 1
+
+            yield {
+                "frame_index": frame_index,
+                "timestamp": timestamp,
+                "frame": frame,
+                "seg_map": seg_map,
+                "keyframe_index": key_index,
+                "is_keyframe": is_keyframe,
+                "change": round(change, 4)
+            }
+
+    def analyze(self, source):
+        """
+        동영상/프레임 시퀀스를 분석하여 장소 단위 접근성 결과 생성
+
+        Args:
+            source: 동영상 파일 경로 또는 프레임 이미지 디렉토리
+
+        Returns:
+            dict: 장소 단위 접근성 정보, 키프레임별 요약, 처리 통계
+        """
+        start_time = time.perf_counter()
+        keyframes = []
+        frame_count = 0
+
+        for frame_result in self.iter_segmentations(source):
+            frame_count += 1
+            if frame_result["is_keyframe"]:
+                keyframes.append({
+                    "frame_index": frame_result["frame_index"],
+                    "timestamp": frame_result["timestamp"],
+                    "frames_covered": 0,
+                    "accessibility_info": self.analyzer.analyze(frame_result["seg_map"])
+                })
+            keyframes[-1]["frames_covered"] += 1
+
+        if not keyframes:
+            raise ValueError(f"읽을 수 있는 프레임이 없습니다: {source}")
+
+        elapsed = time.perf_counter() - start_time
+        logger.info(
+            f"프레임 시퀀스 분석 완료: {frame_count}프레임 중 키프레임 {len(keyframes)}개 "
+            f"({elapsed:.2f}초, {frame_count / elapsed:.1f} fps)"
+        )
+        return {
+            "source": source,
+            "accessibility_info": aggregate_accessibility(keyframes),
+            "keyframes": [
+                {
+                    "frame_index": keyframe["frame_index"],
+                    "timestamp": keyframe["timestamp"],
+                    "frames_covered": keyframe["frames_covered"],
+                    "accessibility_score": keyframe["accessibility_info"]["accessibility_score"],
+                    "obstacles": keyframe["accessibility_info"]["obstacles"]
+                }
+                for keyframe in keyframes
+            ],
+            "video_info": {
+                "frames": frame_count,
+                "keyframes": len(keyframes),
+                "keyframe_ratio": round(len(keyframes) / frame_count, 4),
+                "frame_step": self.frame_step,
+                "change_threshold": self.change_threshold,
+                "max_keyframe_gap": self.max_keyframe_gap,
+                "propagation": self.propagation,
+                "elapsed_seconds": round(elapsed, 3),
+                "frames_per_second": round(frame_count / elapsed, 2)
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+
+
+def aggregate_accessibility(keyframes, min_fraction=VIDEO_DETECTION_MIN_FRACTION):
+    """
+    키프레임별 접근성 정보를 프레임 수 가중치로 합쳐 장소 단위 결과 생성
+
+    한두 프레임에만 잠깐 보인 검출은 무시하도록, 가중 프레임 비율이 min_fraction 이상인
+    플래그/장애물만 장소 단위로 인정한다.
+
+    Args:
+        keyframes: frames_covered, accessibility_info를 가진 키프레임 목록
+        min_fraction: 장소 단위 검출로 인정할 최소 프레임 비율
+
+    Returns:
+        dict: AccessibilityAnalyzer.analyze와 같은 키의 장소 단위 접근성 정보 + 프레임 비율
+    """
+    total_frames = sum(keyframe["frames_covered"] for keyframe in keyframes)
+
+    def fraction(predicate):
+        return sum(keyframe["frames_covered"] for keyframe in keyframes
+                   if predicate(keyframe["accessibility_info"])) / total_frames
+
+    detection_fractions = {flag: round(fraction(lambda info: info.get(flag, False)), 4) for flag in DETECTION_FLAGS}
+    obstacle_names = sorted({name for keyframe in keyframes for name in keyframe["accessibility_info"]["obstacles"]})
+    obstacle_fractions = {name: round(fraction(lambda info: name in info["obstacles"]), 4) for name in obstacle_names}
+
+    accessibility_info = {flag: value >= min_fraction for flag, value in detection_fractions.items()}
+    accessibility_info["obstacles"] = [name for name, value in obstacle_fractions.items() if value >= min_fraction]
+    accessibility_info["additional_obstacles"] = sorted({
+        name for keyframe in keyframes for name in keyframe["accessibility_info"]["additional_obstacles"]
+        if name in accessibility_info["obstacles"]
+    })
+    accessibility_info["entrance_accessible"] = "stairs_at_entrance" not in accessibility_info["obstacles"]
+
+    # 계단이 장소 단위로 인정된 경우, 계단이 보인 키프레임 중 가장 심한 수준
+    severities = [keyframe["accessibility_info"].get("stair_severity", "none") for keyframe in keyframes]
+    accessibility_info["stair_severity"] = (
+        max(severities, key=SEVERITY_ORDER.index) if accessibility_info["has_stairs"] else "none"
+    )
+
+    scores = [keyframe["accessibility_info"]["accessibility_score"] for keyframe in keyframes]
+    weights = [keyframe["frames_covered"] for keyframe in keyframes]
+    accessibility_info["accessibility_score"] = round(float(np.average(scores, weights=weights)), 2)
+    accessibility_info["score_range"] = [min(scores), max(scores)]
+    accessibility_info["detection_fractions"] = detection_fractions
+    accessibility_info["obstacle_fractions"] = obstacle_fractions
+    return accessibility_info
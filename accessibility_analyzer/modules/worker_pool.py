@@ -0,0 +1,145 @@
+"""
+멀티프로세스 추론 워커 풀 - 워커마다 모델을 한 번 로드하고 CPU 코어를 나누어 사용
+"""
+import os
+import multiprocessing
+
+from config import INFERENCE_CPU_BUDGET
+from modules.utils import logger
+
+# 워커 프로세스 내부 상태 (initializer에서 설정)
+_worker_model = None
+_worker_threads = None
+_worker_error = None
+
+
+def get_cpu_budget():
+    """
+    추론에 사용할 CPU 코어 수 (설정값이 없으면 이 프로세스가 사용할 수 있는 코어 수)
+
+    Returns:
+        int: 코어 수
+    """
+    if INFERENCE_CPU_BUDGET:
+        return INFERENCE_CPU_BUDGET
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def plan_threads_per_worker(workers, cpu_budget=None):
+    """
+    코어 예산을 워커 수로 나누어 워커당 스레드 수 결정
+
+    Args:
+        workers: 워커 프로세스 수
+        cpu_budget: 전체 코어 예산 (None이면 get_cpu_budget())
+
+    Returns:
+        int: 워커당 스레드 수 (최소 1)
+    """
+    cpu_budget = cpu_budget or get_cpu_budget()
+    return max(1, cpu_budget // max(1, workers))
+
+
+def _init_worker(threads, model_name=None, model_options=None):
+    """
+    워커 프로세스 초기화 - 스레드 수 제한 후 모델 미리 로드
+    """
+    global _worker_model, _worker_threads, _worker_error
+
+    # torch 이전에 로드되는 BLAS/OpenMP 런타임용
+    for env_name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[env_name] = str(threads)
+
+    import cv2
+    import torch
+    from modules.model_registry import get_active_segmentation_model, get_segmentation_model
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # 이미 병렬 작업이 시작된 프로세스에서는 변경 불가
+        pass
+    cv2.setNumThreads(threads)
+
+    _worker_threads = threads
+    # initializer가 예외를 내면 Pool이 워커를 무한히 재시작하므로, 오류는 기록만 하고 작업 실행 시 보고
+    try:
+        if model_name is None:
+            _worker_model = get_active_segmentation_model()
+        else:
+            _worker_model = get_segmentation_model(model_name, **(model_options or {}))
+    except Exception as e:
+        _worker_error = f"{type(e).__name__}: {str(e)}"
+        logger.error(f"추론 워커 모델 로드 실패 (pid={os.getpid()}): {_worker_error}")
+        return
+    logger.info(f"추론 워커 준비 완료 (pid={os.getpid()}, threads={threads})")
+
+
+def segment_files(image_files):
+    """
+    워커에 로드된 모델로 이미지 목록을 세그멘테이션 (벤치마크용)
+
+    Args:
+        image_files: 이미지 파일 경로 목록
+
+    Returns:
+        int: 처리한 이미지 수
+    """
+    if _worker_model is None:
+        raise RuntimeError(f"워커 모델이 로드되지 않았습니다: {_worker_error}")
+    return len(_worker_model.process_batch(image_files))
+
+
+class InferenceWorkerPool:
+    def __init__(self, workers, threads_per_worker=None, cpu_budget=None,
+                 model_name=None, model_options=None):
+        """
+        추론 워커 풀 초기화
+
+        Args:
+            workers: 워커 프로세스 수
+            threads_per_worker: 워커당 torch/OpenCV 스레드 수 (None이면 코어 예산에서 계산)
+            cpu_budget: 전체 코어 예산 (None이면 설정값 또는 사용 가능한 코어 수)
+            model_name: 워커가 미리 로드할 모델 (None이면 SEGMENTATION_MODE에 따른 기본 모델)
+            model_options: SegmentationModel 생성 옵션
+        """
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or plan_threads_per_worker(workers, cpu_budget)
+        self.model_name = model_name
+        self.model_options = model_options
+        self._pool = None
+
+    def __enter__(self):
+        # fork는 부모의 torch 스레드 풀 상태를 물려받아 교착될 수 있으므로 spawn 사용
+        context = multiprocessing.get_context("spawn")
+        logger.info(f"추론 워커 풀 시작: {self.workers}개 x {self.threads_per_worker}스레드")
+        self._pool = context.Pool(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker, self.model_name, self.model_options)
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self._pool.close()
+        else:
+            self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+
+    def imap(self, func, iterable):
+        """
+        작업을 워커에 분배하고 입력 순서대로 결과 반환
+
+        Args:
+            func: 모듈 최상위 함수 (워커에서 import 가능해야 함)
+            iterable: 작업 인자 목록
+
+        Returns:
+            iterator: 작업 결과
+        """
+        return self._pool.imap(func, iterable)
@@ -0,0 +1,407 @@
+"""
+접근성 분석 테스트 (세그멘테이션 맵 통계와 분석기 결과를 단순 구현과 비교)
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+from scipy import ndimage
+
+from config import CLASS_MAP
+from modules.accessibility_analysis import AccessibilityAnalyzer
+import modules.enhanced_external_analysis as enhanced_external_analysis
+from modules.enhanced_external_analysis import EnhancedExternalAnalyzer, get_sub_analysis_executor
+from modules.feature_context import ImageFeatureContext
+from modules.llm_interface import StairDetectionValidator
+from modules.scoring import append_feature_record, rescore_features
+from modules.segmap_statistics import ComponentStatistics, SegMapStatistics, scale_segments
+
+
+def random_seg_map(seed, shape=(48, 64), class_ids=(0, 6, 11, 14, 38, 53, 95)):
+    """몇 개 클래스만 블록/잡음으로 섞은 작은 세그멘테이션 맵"""
+    rng = np.random.default_rng(seed)
+    coarse = rng.choice(class_ids, size=(shape[0] // 8, shape[1] // 8)).astype(np.uint8)
+    seg_map = np.kron(coarse, np.ones((8, 8), dtype=np.uint8))
+    noise = rng.random(shape) < 0.05
+    seg_map[noise] = rng.choice(class_ids, size=int(noise.sum()))
+    return seg_map
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_segmap_statistics_match_naive(seed):
+    seg_map = random_seg_map(seed)
+    stats = SegMapStatistics(seg_map)
+
+    for class_id in (0, 6, 11, 14, 38, 53, 95, 200):
+        mask = seg_map == class_id
+        assert stats.count(class_id) == int(mask.sum())
+        assert stats.ratio(class_id) == pytest.approx(mask.mean())
+        assert stats.present(class_id) == bool(mask.any())
+        assert np.array_equal(stats.mask(class_id), mask)
+        if mask.any():
+            rows, cols = np.where(mask)
+            expected = (cols.min(), rows.min(), cols.max() - cols.min() + 1, rows.max() - rows.min() + 1)
+            assert stats.bbox(class_id) == expected
+        else:
+            assert stats.bbox(class_id) is None
+
+
+def brute_force_min_distance(seg_map, source_id, target_id):
+    source = np.argwhere(seg_map == source_id)
+    target = np.argwhere(seg_map == target_id)
+    if not len(source) or not len(target):
+        return float('inf')
+    return float(np.sqrt(((source[:, None, :] - target[None, :, :]) ** 2).sum(axis=2)).min())
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_min_distances_match_brute_force(seed):
+    seg_map = random_seg_map(seed, shape=(32, 40))
+    stats = SegMapStatistics(seg_map)
+    source_ids = [6, 11, 38, 53, 200]
+
+    for target_id in (14, 53, 200):
+        distances = stats.min_distances(target_id, source_ids)
+        for source_id in source_ids:
+            expected = brute_force_min_distance(seg_map, source_id, target_id)
+            assert distances[source_id] == pytest.approx(expected)
+            assert stats.min_distance(source_id, target_id) == distances[source_id]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("structure", [None, np.ones((3, 3), dtype=bool)])
+def test_component_statistics_match_scipy(seed, structure):
+    mask = random_seg_map(seed) == 53
+    components = ComponentStatistics(mask, structure)
+    labeled, count = ndimage.label(mask, structure)
+
+    assert components.count == count
+    assert np.array_equal(components.labeled, labeled)
+    labels = np.arange(1, count + 1)
+    assert np.array_equal(components.sizes, ndimage.sum_labels(mask, labeled, labels).astype(int))
+    for index, object_slice in enumerate(ndimage.find_objects(labeled)):
+        rows, cols = object_slice
+        assert components.bboxes[index].tolist() == [
+            cols.start, rows.start, cols.stop - cols.start, rows.stop - rows.start
+        ]
+    if count:
+        # center_of_mass는 (행, 열), ComponentStatistics 중심점은 (x, y)
+        centers = np.array(ndimage.center_of_mass(mask, labeled, labels))
+        assert np.allclose(components.centroids, centers[:, ::-1])
+        assert components.largest() == int(np.argmax(components.sizes))
+    else:
+        assert components.largest() is None
+
+
+def test_component_statistics_empty_mask():
+    components = ComponentStatistics(np.zeros((8, 8), dtype=bool))
+    assert components.count == 0
+    assert components.bboxes.shape == (0, 4)
+    assert components.centroids.shape == (0, 2)
+
+
+def stair_scene(scale=4):
+    """
+    가로줄 무늬 계단이 있는 320x256 이미지와 모델 출력 해상도(1/scale) 세그멘테이션 맵
+
+    Returns:
+        tuple: (BGR 이미지, 저해상도 맵, 원본 해상도 맵)
+    """
+    image = np.full((256, 320, 3), 90, dtype=np.uint8)
+    image[160:240, 96:224] = np.where((np.arange(160, 240) // 8) % 2, 40, 200)[:, None, None]
+    native_map = np.zeros((256 // scale, 320 // scale), dtype=np.uint8)
+    native_map[160 // scale:240 // scale, 96 // scale:224 // scale] = CLASS_MAP['stairs']
+    full_map = np.kron(native_map, np.ones((scale, scale), dtype=np.uint8))
+    return image, native_map, full_map
+
+
+def test_segments_scaled_to_image_coordinates():
+    image, native_map, full_map = stair_scene()
+    native = SegMapStatistics(native_map).segments(CLASS_MAP['stairs'], shape=image.shape[:2])
+    full = SegMapStatistics(full_map).segments(CLASS_MAP['stairs'])
+
+    assert native == full == [{"id": 0, "bbox": [96, 160, 128, 80], "area": 128 * 80, "centroid": [159.5, 199.5]}]
+    # 같은 크기면 환산하지 않음
+    assert scale_segments(full, full_map.shape, image.shape) is full
+
+
+def test_native_resolution_segments_through_consumers():
+    image, native_map, full_map = stair_scene()
+    results = []
+    for seg_map in (native_map, full_map):
+        context = ImageFeatureContext(seg_map=seg_map, image=image)
+        segments = context.stats.segments(CLASS_MAP['stairs'], shape=context.shape)
+        validation = StairDetectionValidator.validate_stair_segments(None, segments, context=context)
+        enhanced = EnhancedExternalAnalyzer(working_size=0, concurrent=False).analyze_enhanced_external_accessibility(
+            None, seg_map, segments, context=context
+        )
+        results.append((validation, enhanced))
+
+    (native_validation, native_enhanced), (full_validation, full_enhanced) = results
+    # 계단 검증기는 원본 이미지에서 같은 영역을 잘라 같은 판정
+    assert native_validation["validation_details"] == full_validation["validation_details"]
+    assert native_validation["filtered_count"] == 1
+    assert native_validation["validation_details"][0]["area"] == 128 * 80
+    # 강화된 외부 분석의 계단 면적 비율도 원본 해상도 맵과 같음
+    expected_ratio = 128 * 80 / (256 * 320)
+    assert native_enhanced["features"]["stair_area_ratio"] == pytest.approx(expected_ratio)
+    assert full_enhanced["features"]["stair_area_ratio"] == pytest.approx(expected_ratio)
+
+
+def test_segment_min_pixels_in_image_pixels():
+    native_map = np.zeros((64, 80), dtype=np.uint8)
+    native_map[10:12, 10:12] = CLASS_MAP['stairs']  # 맵 4픽셀 = 이미지 64픽셀
+    native_map[30, 30] = CLASS_MAP['stairs']  # 맵 1픽셀 = 이미지 16픽셀
+    segments = SegMapStatistics(native_map).segments(CLASS_MAP['stairs'], 20, shape=(256, 320))
+    assert [segment["area"] for segment in segments] == [64]
+
+
+@pytest.mark.parametrize("map_index", [0, 1])
+def test_working_resolution_stair_area_ratio(map_index):
+    image, *seg_maps = stair_scene()
+    context = ImageFeatureContext(seg_map=seg_maps[map_index], image=image)
+    segments = context.stats.segments(CLASS_MAP['stairs'], shape=context.shape)
+
+    result = EnhancedExternalAnalyzer(working_size=160, concurrent=False).analyze_enhanced_external_accessibility(
+        None, seg_maps[map_index], segments, context=context
+    )
+
+    # 작업 해상도(128x160)로 환산해도 이미지 대비 계단 면적 비율은 같음
+    assert result["analysis_resolution"] == [128, 160]
+    assert result["features"]["stair_area_ratio"] == pytest.approx(128 * 80 / (256 * 320))
+
+
+@pytest.mark.parametrize("image_shape, map_shape, working_shape", [
+    ((200, 400), (160, 160), (128, 256)),
+    # 저해상도 맵의 반올림으로 맵 비율만 따르면 172x256이 됨
+    ((333, 500), (84, 125), (170, 256)),
+])
+def test_working_context_follows_image_shape(image_shape, map_shape, working_shape):
+    context = ImageFeatureContext(seg_map=np.zeros(map_shape, dtype=np.uint8),
+                                  image=np.zeros(image_shape + (3,), dtype=np.uint8))
+    working = context.at_working_size(256)
+
+    assert working.seg_map.shape == working.image.shape[:2] == working.shape == working_shape
+
+
+def test_rescore_reproduces_stored_scores(tmp_path):
+    feature_path = tmp_path / "features.jsonl"
+    analyzer = AccessibilityAnalyzer()
+    enhanced_analyzer = EnhancedExternalAnalyzer(working_size=0, concurrent=False)
+    image, _, full_map = stair_scene()
+    seg_maps = [random_seg_map(seed, shape=(256, 320)) for seed in range(6)] + [full_map]
+    for index, seg_map in enumerate(seg_maps):
+        info = analyzer.analyze(seg_map)
+        record = {
+            "image_path": f"image_{index}.png",
+            "timestamp": f"2026-01-01T00:00:{index:02d}",
+            "accessibility_score": info["accessibility_score"],
+            "accessibility": analyzer.extract_features(info, seg_map.shape)
+        }
+        # 강화된 외부 분석 특징은 일부 레코드에만 있음
+        if index % 2:
+            context = ImageFeatureContext(seg_map=seg_map, image=image)
+            segments = context.stats.segments(CLASS_MAP['stairs'], shape=context.shape)
+            enhanced = enhanced_analyzer.analyze_enhanced_external_accessibility(
+                None, seg_map, segments, context=context
+            )
+            record["external_accessibility_score"] = enhanced["external_accessibility_score"]
+            record["external"] = enhanced["features"]
+        append_feature_record(record, feature_path)
+
+    scores, summary = rescore_features(feature_path)
+
+    assert summary["records"] == len(seg_maps)
+    assert summary["with_external_features"] == 3
+    assert summary["accessibility_score_changed"] == 0
+    assert summary["external_score_changed"] == 0
+    assert np.allclose(scores["accessibility_score"], scores["previous_accessibility_score"])
+
+
+def test_rescore_keeps_latest_record_per_image(tmp_path):
+    feature_path = tmp_path / "features.jsonl"
+    analyzer = AccessibilityAnalyzer()
+    for seed in (0, 1):
+        seg_map = random_seg_map(seed)
+        info = analyzer.analyze(seg_map)
+        append_feature_record({
+            "image_path": "same.png", "timestamp": str(seed),
+            "accessibility_score": info["accessibility_score"],
+            "accessibility": analyzer.extract_features(info, seg_map.shape)
+        }, feature_path)
+
+    scores, _ = rescore_features(feature_path)
+    assert scores["timestamp"].tolist() == ["1"]
+
+
+def test_rescore_empty_feature_file(tmp_path):
+    feature_path = tmp_path / "features.jsonl"
+    feature_path.write_text("\n", encoding="utf-8")
+
+    scores, summary = rescore_features(feature_path)
+
+    assert scores.empty
+    assert "accessibility_score" in scores.columns
+    assert summary["records"] == 0
+
+
+@pytest.mark.parametrize("working_size", [0, 32])
+def test_analyze_many_matches_analyze(working_size):
+    analyzer = AccessibilityAnalyzer(working_size=working_size)
+    seg_maps = [random_seg_map(seed) for seed in range(6)]
+    seg_maps += [random_seg_map(6, shape=(40, 24)), np.zeros((16, 16), dtype=np.uint8), stair_scene()[1]]
+
+    batched = analyzer.analyze_many(seg_maps)
+
+    assert batched == [analyzer.analyze(seg_map) for seg_map in seg_maps]
+    # 같은 크기 맵을 쌓은 3차원 배열 입력
+    assert analyzer.analyze_many(np.stack(seg_maps[:6])) == batched[:6]
+
+
+def test_sub_analysis_executor_keyed_by_size():
+    assert get_sub_analysis_executor(2) is get_sub_analysis_executor(2)
+    assert get_sub_analysis_executor(3) is not get_sub_analysis_executor(2)
+    assert get_sub_analysis_executor(3)._max_workers == 3
+
+
+def run_concurrently(function, threads=4):
+    barrier = threading.Barrier(threads)
+    results = [None] * threads
+
+    def worker(index):
+        barrier.wait()
+        results[index] = function()
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    return results
+
+
+def test_feature_context_computes_each_feature_once():
+    image, native_map, _ = stair_scene()
+    context = ImageFeatureContext(seg_map=native_map, image=image)
+    calls = []
+
+    def slow_feature():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = run_concurrently(lambda: context._get("slow", slow_feature))
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert context.get_counters()["slow"] == {"hits": 3, "misses": 1}
+
+    stats = run_concurrently(lambda: context.stats)
+    masks = run_concurrently(lambda: context.mask(CLASS_MAP['stairs']))
+    components = run_concurrently(lambda: context.components(CLASS_MAP['stairs']))
+    assert all(value is stats[0] for value in stats)
+    assert all(value is masks[0] for value in masks)
+    assert all(value is components[0] for value in components)
+    counters = context.get_counters()
+    assert counters["stats"]["misses"] == counters["mask"]["misses"] == counters["components"]["misses"] == 1
+
+
+def test_concurrent_sub_analyses_match_sequential():
+    image, _, full_map = stair_scene()
+    results = []
+    for concurrent in (False, True):
+        context = ImageFeatureContext(seg_map=full_map, image=image)
+        segments = context.stats.segments(CLASS_MAP['stairs'], shape=context.shape)
+        result = EnhancedExternalAnalyzer(working_size=0, concurrent=concurrent, threads=3) \
+            .analyze_enhanced_external_accessibility(None, full_map, segments, context=context)
+        results.append(result)
+
+    sequential, concurrent = results
+    assert sequential["timing"]["mode"] == "sequential"
+    assert concurrent["timing"]["mode"] != "sequential"
+    volatile = {"timing", "analysis_timestamp"}
+    assert {key: value for key, value in sequential.items() if key not in volatile} == \
+        {key: value for key, value in concurrent.items() if key not in volatile}
+
+
+def select_regions(seg_map, image):
+    context = ImageFeatureContext(seg_map=seg_map, image=image)
+    regions = EnhancedExternalAnalyzer(working_size=0, concurrent=False)._select_analysis_regions(context)
+    return {name: (region["bbox"], region["source"]) for name, region in regions.items()}
+
+
+def test_analysis_regions_scaled_from_native_map():
+    image, native_map, full_map = stair_scene()
+
+    regions = select_regions(native_map, image)
+
+    # 계단 바운딩 박스 [96, 160, 128, 80] (이미지 좌표)에 여백을 더한 영역, 이미지 경계에서 잘림
+    assert regions["path"] == ([83, 152, 154, 96], ["stairs"])
+    assert regions["obstacles"] == ([64, 140, 192, 116], ["stairs"])
+    # 문이 없으면 고정 이미지 비율 영역
+    assert regions["entrance"] == ([64, 102, 192, 154], "fallback")
+    assert select_regions(full_map, image) == regions
+
+
+def test_analysis_regions_fallback(monkeypatch):
+    image, native_map, _ = stair_scene()
+    tiny_door = np.zeros_like(native_map)
+    tiny_door[10, 10] = CLASS_MAP['door']  # 여백을 더해도 이미지 8x8 픽셀 < 최소 크기 16
+
+    assert select_regions(tiny_door, image)["entrance"] == ([64, 102, 192, 154], "fallback")
+    monkeypatch.setattr(enhanced_external_analysis, "ENHANCED_SEGMAP_ROI", False)
+    assert all(source == "fallback" for _, source in select_regions(native_map, image).values())
+
+
+def analyze_regions_scene(image, seg_map):
+    context = ImageFeatureContext(seg_map=seg_map, image=image)
+    return EnhancedExternalAnalyzer(working_size=0, concurrent=False).analyze_enhanced_external_accessibility(
+        None, seg_map, [], context=context
+    )
+
+
+def box_scene(class_name, top, bottom, left, right, color=40):
+    """회색 배경에 한 클래스 영역을 어둡게 칠한 320x256 이미지와 세그멘테이션 맵"""
+    image = np.full((256, 320, 3), 120, dtype=np.uint8)
+    image[top:bottom, left:right] = color
+    seg_map = np.zeros((256, 320), dtype=np.uint8)
+    seg_map[top:bottom, left:right] = CLASS_MAP[class_name]
+    return image, seg_map
+
+
+@pytest.mark.parametrize("door_width, expected", [(160, "넓음"), (40, "좁음")])
+def test_entrance_width_from_door_region(door_width, expected):
+    result = analyze_regions_scene(*box_scene("door", 60, 220, 160 - door_width // 2, 160 + door_width // 2))
+
+    # 문 주변으로 좁힌 분석 영역이 아니라 고정 출입구 영역 폭(192픽셀) 대비 문 폭으로 판정
+    assert result["analysis_regions"]["entrance"]["source"] == ["door"]
+    assert result["features"]["door_width_ratio"] == pytest.approx(door_width / 192)
+    assert result["entrance_analysis"]["entrance_width"] == expected
+
+
+@pytest.mark.parametrize("sidewalk_width, expected", [(288, "넓음"), (64, "좁음"), (160, "적절함")])
+def test_path_width_from_sidewalk_region(sidewalk_width, expected):
+    result = analyze_regions_scene(*box_scene("sidewalk", 160, 256, 160 - sidewalk_width // 2,
+                                              160 + sidewalk_width // 2, color=100))
+
+    assert result["analysis_regions"]["path"]["source"] == ["sidewalk"]
+    assert result["features"]["path_width_ratio"] == pytest.approx(sidewalk_width / 320)
+    assert result["path_analysis"]["path_width"] == expected
+
+
+def test_obstacle_severity_independent_of_region(monkeypatch):
+    image = np.full((256, 320, 3), 200, dtype=np.uint8)
+    image[150:190, 140:170] = 30  # 기둥 (약 30x40)
+    severities = []
+    for top, bottom, left, right in ((140, 200, 130, 180), (110, 256, 40, 280)):
+        seg_map = np.zeros((256, 320), dtype=np.uint8)
+        seg_map[top:bottom, left:right] = CLASS_MAP['sidewalk']
+        result = analyze_regions_scene(image, seg_map)
+        assert result["analysis_regions"]["obstacles"]["source"] == ["sidewalk"]
+        severities.append(result["obstacle_analysis"]["obstacle_details"]["pole_post"]["severity"])
+    monkeypatch.setattr(enhanced_external_analysis, "ENHANCED_SEGMAP_ROI", False)
+    fallback = analyze_regions_scene(image, np.zeros((256, 320), dtype=np.uint8))
+    severities.append(fallback["obstacle_analysis"]["obstacle_details"]["pole_post"]["severity"])
+
+    # 면적 비율은 고정 장애물 영역(154x256) 기준이므로 분석 영역 크기와 관계없이 같은 심각도
+    assert severities == ["보통"] * 3
@@ -0,0 +1,600 @@
+"""
+세그멘테이션 모듈 테스트 (모델 가중치 없이 후처리 경로만 검증)
+"""
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+import torch
+from transformers import SegformerConfig, SegformerForSemanticSegmentation, SegformerImageProcessor
+
+from config import CLASS_MAP, COLOR_MAP
+import modules.daemon as daemon
+from modules.daemon import AnalysisDaemon, DaemonClient
+import modules.llm_interface as llm_interface
+from modules.llm_interface import LLMAnalyzer
+from modules.model_evaluation import _per_class_iou, compare_segmentation_models
+import modules.model_store as model_store
+from modules.model_store import (WEIGHTS_FILE, ModelStoreError, get_local_model_dir, load_local_model,
+                                 prepare_model, verify_model)
+from modules.segmentation import (CascadeSegmentationModel, LazyOverlay, OnnxBackend, SegmentationModel,
+                                  TorchBackend, build_palette, export_onnx_model)
+import modules.segmentation_cache as segmentation_cache
+from modules.segmentation_cache import SegmentationCache, segment_with_cache
+from modules.video import VideoAnalyzer, aggregate_accessibility
+import modules.worker_pool as worker_pool
+from modules.worker_pool import get_cpu_budget, plan_threads_per_worker
+
+
+def make_model(native_resolution=False, tile_max_memory_mb=512):
+    """모델을 로드하지 않고 후처리 설정만 가진 SegmentationModel"""
+    model = SegmentationModel.__new__(SegmentationModel)
+    model.native_resolution = native_resolution
+    model.tile_max_memory_mb = tile_max_memory_mb
+    model.palette = build_palette()
+    return model
+
+
+def full_upsample_seg_map(logits, size):
+    upsampled = torch.nn.functional.interpolate(
+        logits.unsqueeze(0), size=size, mode="bilinear", align_corners=False
+    )
+    return upsampled.argmax(dim=1)[0].to(torch.uint8).numpy()
+
+
+def test_banded_logits_match_full_upsample():
+    torch.manual_seed(0)
+    for logit_shape, size in [((40, 50), (333, 401)), ((32, 32), (128, 128)), ((17, 23), (250, 90))]:
+        logits = torch.randn(150, *logit_shape) * 3
+        expected = full_upsample_seg_map(logits, size)
+        # 1MB 한도: 너비 401이면 밴드 높이 4줄
+        seg_map = make_model(tile_max_memory_mb=1)._logits_to_seg_map(logits, size)
+
+        assert seg_map.dtype == np.uint8
+        assert seg_map.shape == size
+        # 보간 연산 순서 차이로 값이 거의 같은 클래스끼리만 드물게 뒤바뀔 수 있음
+        assert (seg_map != expected).mean() < 1e-4
+
+
+def test_small_logits_use_single_upsample():
+    torch.manual_seed(1)
+    logits = torch.randn(150, 32, 32)
+    seg_map = make_model()._logits_to_seg_map(logits, (128, 128))
+    assert np.array_equal(seg_map, full_upsample_seg_map(logits, (128, 128)))
+
+
+def test_native_resolution_skips_upsample():
+    torch.manual_seed(2)
+    logits = torch.randn(150, 32, 48)
+    seg_map = make_model(native_resolution=True)._logits_to_seg_map(logits, (128, 192))
+    assert seg_map.shape == (32, 48)
+    assert np.array_equal(seg_map, logits.argmax(dim=0).numpy())
+
+
+class TinyProcessor:
+    size = {"height": 64, "width": 64}
+
+
+def make_tiny_segformer(num_labels=150):
+    """가중치 다운로드 없이 쓸 수 있는 작은 무작위 SegFormer"""
+    torch.manual_seed(3)
+    config = SegformerConfig(num_labels=num_labels, hidden_sizes=[8, 16, 24, 32], depths=[1, 1, 1, 1],
+                             num_attention_heads=[1, 1, 1, 1], decoder_hidden_size=16)
+    return SegformerForSemanticSegmentation(config).eval()
+
+
+def test_onnx_export_matches_torch_argmax(tmp_path):
+    model = make_tiny_segformer()
+    onnx_path = export_onnx_model("tiny", model, TinyProcessor(), str(tmp_path / "onnx" / "tiny.onnx"))
+    torch_backend, onnx_backend = TorchBackend(model, "cpu"), OnnxBackend(onnx_path)
+
+    assert onnx_backend.num_labels == 150
+    # 변환 후에도 공유 PyTorch 모델은 eval 모드 유지 (dropout 비활성)
+    assert not model.training
+    # 배치 축은 동적이어야 함
+    for batch_size in (1, 3):
+        pixel_values = torch.randn(batch_size, 3, 64, 64)
+        expected, logits = torch_backend(pixel_values), onnx_backend(pixel_values)
+        assert logits.shape == expected.shape
+        assert torch.allclose(logits, expected, atol=1e-4)
+        assert torch.equal(logits.argmax(dim=1), expected.argmax(dim=1))
+
+    # 이미 변환된 파일은 다시 변환하지 않음
+    assert export_onnx_model("tiny", None, None, onnx_path) == onnx_path
+
+
+class StubSegmentationModel:
+    """미리 정한 맵을 돌려주는 세그멘테이션 모델 대역"""
+
+    def __init__(self, seg_maps, batch_size=2):
+        self.seg_maps = seg_maps
+        self.batch_size = batch_size
+
+    def process_batch(self, images, batch_size=None):
+        return [(None, None, self.seg_maps[image]) for image in images]
+
+
+def mask_iou(reference_map, candidate_map, class_id):
+    reference_mask, candidate_mask = reference_map == class_id, candidate_map == class_id
+    return (reference_mask & candidate_mask).sum() / (reference_mask | candidate_mask).sum()
+
+
+def test_per_class_iou_from_confusion():
+    # 기준 클래스 11 픽셀 4개 중 1개를 6으로 예측, 클래스 53은 후보에만 등장
+    confusion = np.zeros((256, 256), dtype=np.int64)
+    confusion[11, 11], confusion[11, 6], confusion[6, 6], confusion[0, 53] = 3, 1, 2, 5
+
+    report = _per_class_iou(confusion)
+
+    assert report["classes"]["sidewalk"] == 0.75
+    assert report["classes"]["road"] == round(2 / 3, 4)
+    assert report["classes"]["stairs"] == 0.0
+    assert report["classes"]["door"] is None
+    assert report["evaluated_class_count"] == 4
+    assert report["mean_iou"] == round((0.75 + 2 / 3 + 0.0 + 0.0) / 4, 4)
+
+
+def test_compare_segmentation_models_reports_iou_and_decisions():
+    rng = np.random.default_rng(4)
+    reference_maps, candidate_maps = {}, {}
+    for index in range(3):
+        reference_map = rng.choice(np.array([0, 6, 11], dtype=np.uint8), (40, 50))
+        reference_map[20:36, 10:40] = 53
+        candidate_map = reference_map.copy()
+        candidate_map[rng.random((40, 50)) < 0.1] = 6
+        reference_maps[f"image{index}"], candidate_maps[f"image{index}"] = reference_map, candidate_map
+    # 마지막 이미지는 후보 모델이 계단을 놓침
+    candidate_maps["image2"][candidate_maps["image2"] == 53] = 11
+
+    report = compare_segmentation_models(StubSegmentationModel(reference_maps),
+                                         StubSegmentationModel(candidate_maps), list(reference_maps))
+
+    reference_all = np.concatenate(list(reference_maps.values()))
+    candidate_all = np.concatenate(list(candidate_maps.values()))
+    for class_name, class_id in (("road", 6), ("sidewalk", 11), ("stairs", 53)):
+        expected = round(float(mask_iou(reference_all, candidate_all, class_id)), 4)
+        assert report["per_class_iou"]["classes"][class_name] == expected
+    assert report["per_class_iou"]["classes"]["door"] is None
+    assert report["image_count"] == 3
+    assert report["decision_agreement"]["has_stairs"] == round(2 / 3, 4)
+    assert report["decision_disagreements"] == [{"image_path": "image2", "mismatched": ["has_stairs"]}]
+
+
+class StubTierModel:
+    """캐스케이드 단계별 모델 대역 - 이미지 경로별로 정한 맵과 신뢰도를 돌려줌"""
+
+    def __init__(self, model_name, seg_maps, confidence=0.9):
+        self.model_name = model_name
+        self.seg_maps = seg_maps
+        self.confidence = confidence
+        self.class_map, self.color_map = CLASS_MAP, COLOR_MAP
+        self.batch_size = 2
+        self.backend = SimpleNamespace(name="stub")
+        self.quantization = None
+        self.native_resolution = False
+
+    def prepare_batch(self, images):
+        return list(images)
+
+    def run_prepared(self, prepared, batch_size=None, return_confidence=False):
+        return [(None, image, self.seg_maps[image], np.full(self.seg_maps[image].shape, self.confidence))
+                for image in prepared]
+
+    def process_batch(self, images, batch_size=None):
+        return [(None, image, self.seg_maps[image]) for image in images]
+
+    def get_cache_signature(self):
+        return {"model": self.model_name}
+
+
+def stairs_map(ratio, shape=(100, 100), class_id=CLASS_MAP["stairs"]):
+    seg_map = np.zeros(shape, dtype=np.uint8)
+    seg_map.ravel()[:int(round(ratio * seg_map.size))] = class_id
+    return seg_map
+
+
+def test_escalation_reasons():
+    cascade = CascadeSegmentationModel(StubTierModel("fast", {}), StubTierModel("accurate", {}))
+    confident = np.full((100, 100), 0.9)
+
+    assert cascade._escalation_reasons(stairs_map(0), confident) == []
+    # 계단 면적 5%는 판정 임계값(0.05) 근처
+    assert cascade._escalation_reasons(stairs_map(0.05), confident) == ["stairs_near_threshold"]
+    # 임계값에서 먼 면적이라도 평균 신뢰도가 낮으면 승급
+    assert cascade._escalation_reasons(stairs_map(0.3), np.full((100, 100), 0.5)) == ["stairs_low_confidence"]
+    # 문 면적 2%는 임계값(0.01, 0.03)의 ±20% 밖
+    assert cascade._escalation_reasons(stairs_map(0.02, class_id=CLASS_MAP["door"]), confident) == []
+    # 승급 판단 대상이 아닌 클래스는 무시
+    assert cascade._escalation_reasons(stairs_map(0.05, class_id=CLASS_MAP["road"]), np.zeros((100, 100))) == []
+
+
+def test_cascade_cache_stores_tier_and_counts_hits(tmp_path):
+    image_files = []
+    for name in ("plain", "stairs"):
+        image_path = tmp_path / f"{name}.png"
+        cv2.imwrite(str(image_path), np.full((8, 8, 3), len(image_files) * 50, dtype=np.uint8))
+        image_files.append(str(image_path))
+    fast_maps = {image_files[0]: stairs_map(0), image_files[1]: stairs_map(0.05)}
+    accurate_maps = {image_files[1]: stairs_map(0.2)}
+    cascade = CascadeSegmentationModel(StubTierModel("fast", fast_maps), StubTierModel("accurate", accurate_maps))
+    cache = SegmentationCache(cache_dir=tmp_path / "segmentation", expiry_seconds=None)
+
+    missed = segment_with_cache(cascade, image_files, cache)
+    hits = segment_with_cache(cascade, image_files, cache)
+
+    assert [info["tier"] for _, info in missed] == ["fast", "accurate"]
+    assert [info["cache"] for _, info in hits] == ["hit", "hit"]
+    assert [info["tier"] for _, info in hits] == ["fast", "accurate"]
+    assert np.array_equal(hits[1][0][2], accurate_maps[image_files[1]])
+    # 누적 승급 비율은 캐시에 저장하지 않고, 적중 결과도 단계별 통계에 포함
+    cache_signature = cascade.get_cache_signature()
+    for image_file in image_files:
+        assert "escalation_rate" not in cache.get(cache.make_key(image_file, cache_signature))[1]
+    assert (cascade.total_count, cascade.escalated_count) == (4, 2)
+    assert [info["escalation_rate"] for _, info in hits] == [0.5, 0.5]
+
+
+def make_tiled_model(native_resolution, tile_size=64, overlap=16):
+    """작은 무작위 SegFormer로 타일 처리 경로를 실행하는 SegmentationModel"""
+    model = make_model(native_resolution=native_resolution)
+    model.processor = SegformerImageProcessor(size={"height": 64, "width": 64})
+    model.backend = TorchBackend(make_tiny_segformer(num_labels=8), "cpu")
+    model.batch_size = 2
+    model.tile_size, model.tile_overlap = tile_size, overlap
+    model.tiled_min_pixels = 0
+    return model
+
+
+def random_image(shape, seed=5):
+    # 타일 경계에서도 클래스가 섞이도록 거친 무늬를 확대한 이미지
+    coarse = np.random.default_rng(seed).integers(0, 256, (shape[0] // 8, shape[1] // 8, 3), dtype=np.uint8)
+    return cv2.resize(coarse, (shape[1], shape[0]), interpolation=cv2.INTER_LINEAR)
+
+
+def test_tile_starts_cover_axis():
+    assert SegmentationModel._tile_starts(50, 64, 48) == [0]
+    assert SegmentationModel._tile_starts(64, 64, 48) == [0]
+    assert SegmentationModel._tile_starts(160, 64, 48) == [0, 48, 96]
+    for length in (65, 100, 1000, 1333):
+        starts = SegmentationModel._tile_starts(length, 64, 48)
+        # 간격은 stride 이하이고 마지막 타일은 경계에 맞춤
+        assert starts[0] == 0 and starts[-1] == length - 64
+        assert all(0 < later - earlier <= 48 for earlier, later in zip(starts, starts[1:]))
+
+
+def test_blend_window_ramps_in_overlap():
+    window = SegmentationModel._blend_window(10, 12, 4)
+
+    assert window.shape == (10, 12)
+    assert bool((window > 0).all()) and float(window.max()) == 1.0
+    assert torch.allclose(window[0, 3:9], torch.full((6,), 0.25))
+    assert torch.allclose(window[:, 5], torch.tensor([0.25, 0.5, 0.75, 1, 1, 1, 1, 0.75, 0.5, 0.25]))
+    # 겹침 폭이 1픽셀 미만이면 모든 가중치가 1
+    assert bool((SegmentationModel._blend_window(3, 3, 0.5) == 1).all())
+
+
+def test_single_tile_matches_untiled():
+    image_np = random_image((64, 64))
+    native_model = make_tiled_model(native_resolution=True)
+    prepared = native_model.prepare_batch([image_np])
+    _, _, expected_map, expected_confidence = native_model.run_prepared(prepared, return_confidence=True)[0]
+
+    # 타일 하나면 로짓이 그대로 쓰이므로 일반 경로와 동일
+    _, _, seg_map, confidence = native_model._segment_tiled(None, image_np, return_confidence=True)
+    assert np.array_equal(seg_map, expected_map)
+    assert np.allclose(confidence, expected_confidence, atol=1e-5)
+
+    # 원본 해상도 모드는 출력 해상도에서 확정한 줄을 원본 크기로 확대
+    _, _, seg_map = make_tiled_model(native_resolution=False)._segment_tiled(None, image_np)
+    assert np.array_equal(seg_map, cv2.resize(expected_map, (64, 64), interpolation=cv2.INTER_NEAREST))
+
+
+def test_tiled_rows_carry_matches_full_canvas_blend():
+    image_np = random_image((160, 176))
+    model = make_tiled_model(native_resolution=True)
+    scale = 16 / model.tile_size
+    canvas = torch.zeros(8, round(160 * scale), round(176 * scale))
+    for y0 in model._tile_starts(160, 64, 48):
+        for x0 in model._tile_starts(176, 64, 48):
+            tile = model.processor(images=[image_np[y0:y0 + 64, x0:x0 + 64]], return_tensors="pt")
+            oy0, ox0 = round(y0 * scale), round(x0 * scale)
+            canvas[:, oy0:oy0 + 16, ox0:ox0 + 16] += (
+                model.backend(tile["pixel_values"])[0] * model._blend_window(16, 16, model.tile_overlap * scale)
+            )
+
+    # 행 단위 스트리밍 + 이월 누적 결과가 전체 캔버스 가중합의 argmax와 같아야 함
+    _, _, seg_map = model._segment_tiled(None, image_np)
+    assert np.array_equal(seg_map, canvas.argmax(dim=0).numpy())
+
+
+def make_cache(tmp_path, **kwargs):
+    return SegmentationCache(cache_dir=tmp_path / "segmentation", **kwargs)
+
+
+def test_cache_miss_then_hit(tmp_path):
+    cache = make_cache(tmp_path, max_mb=16, expiry_seconds=None)
+    seg_map = np.random.default_rng(0).integers(0, 150, (60, 80), dtype=np.uint8)
+
+    assert cache.get("key") is None
+    cache.put("key", seg_map, {"tier": "fast"})
+    cached_map, info = cache.get("key")
+
+    assert np.array_equal(cached_map, seg_map)
+    assert info == {"tier": "fast"}
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["entries"]) == (1, 1, 1, 1)
+
+
+def test_cache_key_depends_on_content_and_signature(tmp_path):
+    cache = make_cache(tmp_path)
+    first, second = tmp_path / "a.png", tmp_path / "b.png"
+    first.write_bytes(b"image-a")
+    second.write_bytes(b"image-a")
+
+    # 경로가 달라도 내용이 같으면 같은 키, 모델 설정이 다르면 다른 키
+    assert cache.make_key(str(first), {"model": "b5"}) == cache.make_key(str(second), {"model": "b5"})
+    assert cache.make_key(str(first), {"model": "b5"}) != cache.make_key(str(first), {"model": "b0"})
+    second.write_bytes(b"image-b")
+    assert cache.make_key(str(first), {"model": "b5"}) != cache.make_key(str(second), {"model": "b5"})
+
+
+def test_cache_expiry(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, expiry_seconds=60)
+    cache.put("key", np.zeros((4, 4), dtype=np.uint8))
+
+    now = segmentation_cache.time.time()
+    monkeypatch.setattr(segmentation_cache.time, "time", lambda: now + 61)
+
+    assert cache.get("key") is None
+    stats = cache.get_stats()
+    assert (stats["expired"], stats["misses"], stats["entries"]) == (1, 1, 0)
+    assert not list((tmp_path / "segmentation").iterdir())
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, max_mb=1, expiry_seconds=None)
+    rng = np.random.default_rng(1)
+    # 압축해도 줄지 않는 약 0.4MB 맵 3개 -> 1MB 한도를 넘으면 가장 오래 사용하지 않은 항목 삭제
+    maps = {key: rng.integers(0, 256, (640, 640), dtype=np.uint8) for key in ("a", "b", "c")}
+    cache.put("a", maps["a"])
+    cache.put("b", maps["b"])
+    cache.get("a")
+    cache.put("c", maps["c"])
+
+    assert cache.get("b") is None
+    assert np.array_equal(cache.get("a")[0], maps["a"])
+    assert cache.get_stats()["evictions"] == 1
+
+
+class FakeLLMResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"content": [{"text": '{"accessibility_score": 7}'}]}
+
+
+def make_overlay_inputs(tmp_path):
+    image_np = np.full((48, 64, 3), 120, dtype=np.uint8)
+    seg_map = np.zeros((12, 16), dtype=np.uint8)
+    seg_map[6:, 4:12] = 53  # stairs
+    image_path = tmp_path / "image.png"
+    cv2.imwrite(str(image_path), image_np)
+    overlay = LazyOverlay(make_model(), image_np, seg_map, str(tmp_path / "overlay.png"))
+    accessibility_info = {"has_stairs": True, "accessibility_score": 6, "obstacles": []}
+    return str(image_path), overlay, accessibility_info
+
+
+def test_llm_request_renders_lazy_overlay(tmp_path, monkeypatch):
+    image_path, overlay, accessibility_info = make_overlay_inputs(tmp_path)
+    requests_sent = []
+    monkeypatch.setattr(llm_interface.requests, "post",
+                        lambda url, **kwargs: requests_sent.append(kwargs["json"]) or FakeLLMResponse())
+
+    analyzer = LLMAnalyzer(api_key="test-key", api_url="http://llm.test/v1/messages", model="test-model")
+    result = analyzer.analyze_image(image_path, overlay, accessibility_info)
+
+    assert result == {"accessibility_score": 7}
+    # os.fspath(overlay)에서 처음 렌더링되어 요청에 포함됨
+    assert overlay.rendered
+    assert (tmp_path / "overlay.png").exists()
+    images = [part for part in requests_sent[0]["messages"][0]["content"] if part["type"] == "image"]
+    assert len(images) == 2
+
+
+def test_unconfigured_llm_skips_overlay(tmp_path):
+    image_path, overlay, accessibility_info = make_overlay_inputs(tmp_path)
+
+    result = LLMAnalyzer(api_key="test-key", api_url="").analyze_image(image_path, overlay, accessibility_info)
+
+    assert "error" in result
+    assert not overlay.rendered
+    assert not (tmp_path / "overlay.png").exists()
+
+
+def test_plan_threads_per_worker_splits_budget():
+    assert plan_threads_per_worker(1, cpu_budget=8) == 8
+    assert plan_threads_per_worker(3, cpu_budget=8) == 2
+    assert plan_threads_per_worker(0, cpu_budget=8) == 8
+    # 워커가 코어보다 많아도 최소 1스레드
+    assert plan_threads_per_worker(16, cpu_budget=8) == 1
+    for workers in range(1, 9):
+        assert workers * plan_threads_per_worker(workers, cpu_budget=8) <= 8
+
+
+def test_cpu_budget_from_config_or_affinity(monkeypatch):
+    monkeypatch.setattr(worker_pool, "INFERENCE_CPU_BUDGET", 6)
+    assert get_cpu_budget() == 6
+    assert plan_threads_per_worker(2) == 3
+
+    monkeypatch.setattr(worker_pool, "INFERENCE_CPU_BUDGET", 0)
+    monkeypatch.setattr(worker_pool.os, "sched_getaffinity", lambda pid: {0, 1, 2, 3}, raising=False)
+    assert get_cpu_budget() == 4
+    assert plan_threads_per_worker(3) == 1
+
+
+def prepare_tiny_store(tmp_path, monkeypatch):
+    """작은 SegFormer를 허브 대신 로컬 경로에 저장하고 로컬 모델 저장소로 고정"""
+    monkeypatch.setattr(model_store, "MODEL_STORE_DIR", tmp_path / "store")
+    monkeypatch.setattr(model_store, "MODEL_STORE_VERIFY", "sha256")
+    model = make_tiny_segformer(num_labels=8)
+    source_dir = str(tmp_path / "source")
+    model.save_pretrained(source_dir)
+    SegformerImageProcessor(size={"height": 64, "width": 64}).save_pretrained(source_dir)
+    prepare_model(source_dir)
+    return model, source_dir, get_local_model_dir(source_dir)
+
+
+def test_local_model_store_round_trip(tmp_path, monkeypatch):
+    model, source_dir, model_dir = prepare_tiny_store(tmp_path, monkeypatch)
+
+    assert verify_model(model_dir) == []
+    pixel_values = torch.randn(1, 3, 64, 64)
+    with torch.no_grad():
+        expected = model(pixel_values=pixel_values).logits
+        logits = load_local_model(source_dir)(pixel_values=pixel_values).logits
+    assert torch.equal(logits, expected)
+
+
+def test_verify_model_detects_tampered_weights(tmp_path, monkeypatch):
+    _, source_dir, model_dir = prepare_tiny_store(tmp_path, monkeypatch)
+    weights_path = model_dir / WEIGHTS_FILE
+
+    # 크기는 그대로 두고 가중치 바이트 하나만 변경
+    data = bytearray(weights_path.read_bytes())
+    data[-1] ^= 0xFF
+    weights_path.write_bytes(bytes(data))
+    assert verify_model(model_dir) == [f"{WEIGHTS_FILE} 체크섬 불일치"]
+    assert verify_model(model_dir, mode="size") == []
+    with pytest.raises(ModelStoreError):
+        load_local_model(source_dir)
+
+    weights_path.write_bytes(bytes(data[:-8]))
+    assert verify_model(model_dir, mode="size") == [f"{WEIGHTS_FILE} 크기 불일치"]
+    weights_path.unlink()
+    assert verify_model(model_dir, mode="none") == []
+    assert verify_model(model_dir) == [f"{WEIGHTS_FILE} 없음"]
+
+    # 검증에 실패한 저장소는 force 없이도 다시 생성
+    prepare_model(source_dir)
+    assert verify_model(model_dir) == []
+
+
+def test_daemon_request_response_round_trip(tmp_path, monkeypatch):
+    # SIGTERM 핸들러는 메인 스레드에서만 등록할 수 있으므로 테스트 스레드에서는 생략
+    monkeypatch.setattr(daemon.signal, "signal", lambda signum, handler: None)
+    warmed_up = []
+    handlers = {
+        "echo": lambda text, repeat=1: {"text": text * repeat, "cwd": os.getcwd()},
+        "fail": lambda: 1 / 0
+    }
+    socket_path = tmp_path / "daemon.sock"
+    server = AnalysisDaemon(handlers, socket_path=socket_path, warmup=lambda: warmed_up.append(True))
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    client = DaemonClient(socket_path, connect_timeout=1)
+    deadline = time.time() + 10
+    while not client.is_running() and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert warmed_up == [True]
+    previous_cwd = os.getcwd()
+    response = client.request("echo", text="계단", repeat=2, cwd=str(tmp_path))
+    assert response["status"] == "ok"
+    # 상대 경로는 클라이언트 작업 디렉토리 기준으로 해석하고, 처리 후 원래 디렉토리로 복귀
+    assert response["result"] == {"text": "계단계단", "cwd": str(tmp_path)}
+    assert response["server_ms"] >= 0 and response["roundtrip_ms"] >= response["server_ms"]
+    assert os.getcwd() == previous_cwd
+
+    failed = client.request("fail")
+    assert failed["status"] == "error" and failed["error"].startswith("ZeroDivisionError")
+    unknown = client.request("unknown")
+    assert (unknown["status"], unknown["error"]) == ("error", "Unknown command: unknown")
+    latency = client.request("status")["result"]["latency"]
+    assert (latency["echo"]["count"], latency["fail"]["count"]) == (1, 1)
+
+    assert client.request("shutdown")["result"] == "stopping"
+    server_thread.join(timeout=10)
+    assert not server_thread.is_alive()
+    assert not socket_path.exists() and not client.is_running()
+
+
+def test_shift_seg_map_scales_each_axis():
+    seg_map = np.zeros((40, 60), dtype=np.uint8)
+    seg_map[10:20, 10:20] = 53
+
+    # 축소 이미지 기준 (2, 1) 이동 -> 맵 기준 x는 3배, y는 4배
+    shifted = VideoAnalyzer._shift_seg_map(seg_map, (2.0, 1.0), (3.0, 4.0))
+    assert np.array_equal(np.argwhere(shifted == 53).min(axis=0), [14, 16])
+    assert np.array_equal(np.argwhere(shifted == 53).max(axis=0), [23, 25])
+    # 0.5픽셀 미만 이동은 원본 맵 그대로
+    assert VideoAnalyzer._shift_seg_map(seg_map, (0.1, 0.1), (3.0, 4.0)) is seg_map
+
+
+class StubFrameModel:
+    """프레임의 1/4 해상도 맵을 돌려주는 세그멘테이션 모델 대역"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def process_image_from_array(self, image_np):
+        self.calls += 1
+        return None, image_np, np.zeros((image_np.shape[0] // 4, image_np.shape[1] // 4), dtype=np.uint8)
+
+
+def test_video_shift_uses_per_axis_map_scale(tmp_path, monkeypatch):
+    # 1000x130 프레임의 축소 이미지는 96x12 (높이 12.48에서 반올림)
+    frame = random_image((130, 1000))
+    for index in range(2):
+        cv2.imwrite(str(tmp_path / f"frame{index}.png"), frame)
+    scales = []
+    monkeypatch.setattr(VideoAnalyzer, "_shift_seg_map",
+                        staticmethod(lambda seg_map, shift, scale: scales.append(scale) or seg_map))
+    model = StubFrameModel()
+
+    results = list(VideoAnalyzer(model, analyzer=None, propagation="shift").iter_segmentations(str(tmp_path)))
+
+    assert [result["is_keyframe"] for result in results] == [True, False]
+    assert model.calls == 1
+    assert scales == [(250 / 96, 32 / 12)]
+
+
+def keyframe(frames_covered, score, obstacles=(), additional_obstacles=(), stair_severity="none", **flags):
+    return {"frames_covered": frames_covered, "accessibility_info": dict(
+        flags, accessibility_score=score, obstacles=list(obstacles),
+        additional_obstacles=list(additional_obstacles), stair_severity=stair_severity
+    )}
+
+
+def test_aggregate_accessibility_weights_by_frames():
+    keyframes = [
+        keyframe(6, 8, has_door=True, has_sidewalk=True),
+        keyframe(3, 4, ["stairs_at_entrance", "narrow_path"], ["narrow_path"], "moderate",
+                 has_stairs=True, has_door=True),
+        # 전체 프레임의 10%에만 보인 검출은 장소 단위로 인정하지 않음
+        keyframe(1, 2, ["obstacle_on_path"], ["obstacle_on_path"], "severe", has_stairs=True, has_railing=True)
+    ]
+
+    info = aggregate_accessibility(keyframes, min_fraction=0.2)
+
+    assert info["detection_fractions"]["has_door"] == 0.9
+    assert info["detection_fractions"]["has_stairs"] == 0.4
+    assert info["detection_fractions"]["has_railing"] == 0.1
+    assert (info["has_door"], info["has_stairs"], info["has_sidewalk"], info["has_railing"]) == (True, True, True, False)
+    assert info["obstacle_fractions"] == {"narrow_path": 0.3, "obstacle_on_path": 0.1, "stairs_at_entrance": 0.3}
+    assert info["obstacles"] == ["narrow_path", "stairs_at_entrance"]
+    assert info["additional_obstacles"] == ["narrow_path"]
+    assert info["entrance_accessible"] is False
+    # 계단이 인정되면 계단이 보인 키프레임 중 가장 심한 수준
+    assert info["stair_severity"] == "severe"
+    assert info["accessibility_score"] == round((6 * 8 + 3 * 4 + 1 * 2) / 10, 2)
+    assert info["score_range"] == [2, 8]
+
+    # 임계값을 올리면 계단도 장소 단위 검출에서 빠짐
+    strict = aggregate_accessibility(keyframes, min_fraction=0.5)
+    assert (strict["has_stairs"], strict["stair_severity"], strict["obstacles"]) == (False, "none", [])
+    assert strict["entrance_accessible"] is True